@@ -4,7 +4,6 @@ from __future__ import annotations
 import json
 from pathlib import Path
 import logging
-from typing import Optional
 
 __all__ = [
     "app",
@@ -29,15 +28,11 @@ try:
 except Exception:
     __version__ = "0.0.0"
 
-# Expose the FastAPI `app` instance if available
-try:
-    from .app.main import app as app_instance  # type: ignore
-except Exception:
-    app_instance: Optional[object] = None
+# Subpackages and the FastAPI app are resolved on first attribute access
+# (PEP 562), so importing one module such as backend.utils.keyword_matcher
+# does not build the whole application or pull in optional dependencies.
+_SUBPACKAGES = ("app", "ai_ml", "models", "routes", "utils")
 
-# Re-export common subpackages for convenience, but avoid import-time errors
-# if optional dependencies are missing (use lazy import to keep test collection
-# and simple imports lightweight).
 
 def _import_optional(name: str):
     try:
@@ -46,8 +41,15 @@ def _import_optional(name: str):
         module = None
     return module
 
-app = _import_optional("app")
-ai_ml = _import_optional("ai_ml")
-models = _import_optional("models")
-routes = _import_optional("routes")
-utils = _import_optional("utils")
+
+def __getattr__(name: str):
+    if name in _SUBPACKAGES:
+        return _import_optional(name)
+    if name == "app_instance":
+        try:
+            from .app.main import app as app_instance  # type: ignore
+        except Exception:
+            app_instance = None
+        globals()["app_instance"] = app_instance
+        return app_instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
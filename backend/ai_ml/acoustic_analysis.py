@@ -9,6 +9,9 @@ import librosa
 from typing import Dict, List, Tuple
 import logging
 
+from .pitch import PitchTracker, pitch_summary
+from ..app.metrics import timer
+
 logger = logging.getLogger(__name__)
 
 class AcousticAnalyzer:
@@ -21,6 +24,8 @@ class AcousticAnalyzer:
         self.mfcc_features = 13
         self.n_fft = 2048
         self.hop_length = 512
+        self._mel_basis = None
+        self.pitch_tracker = PitchTracker(sample_rate, self.n_fft)
 
     def extract_mfcc(self, audio_data: np.ndarray) -> np.ndarray:
         """
@@ -57,24 +62,71 @@ class AcousticAnalyzer:
         """
         try:
             # Simple noise reduction using spectral gating
-            stft = librosa.stft(audio_data)
+            stft = librosa.stft(audio_data, n_fft=self.n_fft, hop_length=self.hop_length)
             magnitude, phase = librosa.magphase(stft)
-
-            # Estimate noise from first few frames
-            noise_frames = min(10, magnitude.shape[1] // 4)
-            noise_profile = np.mean(magnitude[:, :noise_frames], axis=1, keepdims=True)
-
-            # Apply spectral subtraction
-            enhanced_magnitude = np.maximum(magnitude - noise_profile, 0)
+            enhanced_magnitude = self._spectral_subtract(magnitude)
             enhanced_stft = enhanced_magnitude * phase
 
             # Inverse STFT
-            enhanced_audio = librosa.istft(enhanced_stft)
+            enhanced_audio = librosa.istft(enhanced_stft, hop_length=self.hop_length)
             return enhanced_audio
         except Exception as e:
             logger.error(f"Noise normalization failed: {e}")
             return audio_data
 
+    def _spectral_subtract(self, magnitude: np.ndarray) -> np.ndarray:
+        """
+        Subtract a noise profile estimated from the first few frames, in place.
+
+        Args:
+            magnitude: Magnitude spectrogram (n_bins, n_frames)
+
+        Returns:
+            The enhanced magnitude spectrogram
+        """
+        noise_frames = max(1, min(10, magnitude.shape[1] // 4))
+        noise_profile = np.mean(magnitude[:, :noise_frames], axis=1, keepdims=True)
+        np.subtract(magnitude, noise_profile, out=magnitude)
+        np.maximum(magnitude, 0, out=magnitude)
+        return magnitude
+
+    def compute_spectrogram(self, audio_data: np.ndarray) -> np.ndarray:
+        """
+        Compute the noise-reduced magnitude spectrogram in a single STFT pass.
+
+        Args:
+            audio_data: Raw audio waveform
+
+        Returns:
+            Magnitude spectrogram (n_bins, n_frames) after spectral subtraction
+        """
+        with timer("acoustic.stft"):
+            stft = librosa.stft(audio_data, n_fft=self.n_fft, hop_length=self.hop_length)
+        with timer("acoustic.noise_reduction"):
+            return self._spectral_subtract(np.abs(stft))
+
+    @property
+    def mel_basis(self) -> np.ndarray:
+        """Mel filterbank for the configured sample rate, built once."""
+        if self._mel_basis is None:
+            self._mel_basis = librosa.filters.mel(sr=self.sample_rate, n_fft=self.n_fft)
+        return self._mel_basis
+
+    def mfcc_from_spectrogram(self, magnitude: np.ndarray) -> np.ndarray:
+        """
+        Derive MFCC features from a magnitude spectrogram.
+
+        Args:
+            magnitude: Magnitude spectrogram (n_bins, n_frames)
+
+        Returns:
+            MFCC coefficients (n_frames, n_mfcc)
+        """
+        with timer("acoustic.mfcc"):
+            mel = np.dot(self.mel_basis, magnitude ** 2)
+            mfcc = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=self.mfcc_features)
+        return mfcc.T
+
     def detect_vocoder_artifacts(self, audio_data: np.ndarray) -> Dict[str, float]:
         """
         Detect synthetic speech artifacts (vocoder artifacts).
@@ -86,49 +138,99 @@ class AcousticAnalyzer:
             Dictionary with artifact detection scores
         """
         try:
-            # Calculate spectral features
-            spectral_centroid = librosa.feature.spectral_centroid(
-                y=audio_data, sr=self.sample_rate
-            )[0]
-
-            spectral_rolloff = librosa.feature.spectral_rolloff(
-                y=audio_data, sr=self.sample_rate
-            )[0]
-
-            # Calculate zero-crossing rate
-            zero_crossing_rate = librosa.feature.zero_crossing_rate(audio_data)[0]
-
-            # Calculate spectral flatness
-            spectral_flatness = librosa.feature.spectral_flatness(
-                y=audio_data
-            )[0]
-
-            # Artifact detection heuristics
-            centroid_variation = np.std(spectral_centroid) / np.mean(spectral_centroid)
-            rolloff_consistency = 1 - np.std(spectral_rolloff) / np.mean(spectral_rolloff)
-            flatness_uniformity = np.mean(spectral_flatness)
-
-            # Combine features for artifact score (0-1, higher = more likely synthetic)
-            artifact_score = (
-                centroid_variation * 0.3 +
-                (1 - rolloff_consistency) * 0.3 +
-                flatness_uniformity * 0.4
-            )
-
-            return {
-                "artifact_score": min(max(artifact_score, 0), 1),
-                "centroid_variation": centroid_variation,
-                "rolloff_consistency": rolloff_consistency,
-                "flatness_uniformity": flatness_uniformity
-            }
+            magnitude = np.abs(librosa.stft(audio_data, n_fft=self.n_fft, hop_length=self.hop_length))
+            return self._artifacts_from_spectrogram(magnitude)
         except Exception as e:
             logger.error(f"Vocoder artifact detection failed: {e}")
             return {"artifact_score": 0.0}
 
+    def _artifacts_from_spectrogram(self, magnitude: np.ndarray) -> Dict[str, float]:
+        return self._artifacts_from_frames(self.spectral_frame_features(magnitude))
+
+    def spectral_frame_features(self, magnitude: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Per-frame spectral centroid, rolloff and flatness.
+
+        Args:
+            magnitude: Magnitude spectrogram (n_bins, n_frames)
+
+        Returns:
+            Dictionary of arrays with one value per frame
+        """
+        return {
+            "centroid": librosa.feature.spectral_centroid(S=magnitude, sr=self.sample_rate, n_fft=self.n_fft)[0],
+            "rolloff": librosa.feature.spectral_rolloff(S=magnitude, sr=self.sample_rate, n_fft=self.n_fft)[0],
+            "flatness": librosa.feature.spectral_flatness(S=magnitude)[0],
+        }
+
+    def frame_features(self, magnitude: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        All per-frame features used by the chunk summary.
+
+        Each value depends only on its own frame, so spectrograms of several
+        chunks can be concatenated along time, processed in one call and
+        split again (see batch_acoustic).
+
+        Args:
+            magnitude: Noise-reduced magnitude spectrogram (n_bins, n_frames)
+
+        Returns:
+            Dictionary of per-frame arrays; "pitch" is f0 in Hz (0 if unvoiced)
+        """
+        with timer("acoustic.frame_features"):
+            return {
+                **self.spectral_frame_features(magnitude),
+                "rms": librosa.feature.rms(S=magnitude, frame_length=self.n_fft)[0],
+                "pitch": self.pitch_tracker.track(magnitude),
+            }
+
+    def _artifacts_from_frames(self, frames: Dict[str, np.ndarray]) -> Dict[str, float]:
+        # Artifact detection heuristics
+        spectral_centroid = frames["centroid"]
+        spectral_rolloff = frames["rolloff"]
+        centroid_variation = np.std(spectral_centroid) / np.mean(spectral_centroid)
+        rolloff_consistency = 1 - np.std(spectral_rolloff) / np.mean(spectral_rolloff)
+        flatness_uniformity = np.mean(frames["flatness"])
+
+        # Combine features for artifact score (0-1, higher = more likely synthetic)
+        artifact_score = (
+            centroid_variation * 0.3 +
+            (1 - rolloff_consistency) * 0.3 +
+            flatness_uniformity * 0.4
+        )
+
+        return {
+            "artifact_score": min(max(artifact_score, 0), 1),
+            "centroid_variation": centroid_variation,
+            "rolloff_consistency": rolloff_consistency,
+            "flatness_uniformity": flatness_uniformity
+        }
+
+    def summarize_frames(self, frames: Dict[str, np.ndarray]) -> Dict[str, any]:
+        """
+        Chunk-level energy, pitch and artifact features from frame_features.
+
+        Args:
+            frames: Output of frame_features for one chunk
+
+        Returns:
+            Dictionary with rms_energy, pitch_mean and artifact scores
+        """
+        pitch = frames["pitch"]
+        voiced = pitch[pitch > 0]
+        return {
+            "rms_energy": np.mean(frames["rms"]),
+            "pitch_mean": np.mean(voiced) if voiced.size else 0,
+            **self._artifacts_from_frames(frames),
+        }
+
     def analyze_audio_chunk(self, audio_data: np.ndarray) -> Dict[str, any]:
         """
         Complete acoustic analysis for an audio chunk.
 
+        The chunk is transformed once; MFCC, spectral, energy and pitch
+        features are all derived from the same noise-reduced spectrogram.
+
         Args:
             audio_data: Raw audio waveform
 
@@ -136,25 +238,14 @@ class AcousticAnalyzer:
             Dictionary with all acoustic features
         """
         try:
-            # Normalize audio
-            normalized_audio = self.normalize_noise(audio_data)
-
-            # Extract MFCC
-            mfcc_features = self.extract_mfcc(normalized_audio)
-
-            # Detect artifacts
-            artifact_analysis = self.detect_vocoder_artifacts(normalized_audio)
-
-            # Calculate additional features
-            rms_energy = librosa.feature.rms(y=normalized_audio)[0]
-            pitch, _ = librosa.piptrack(y=normalized_audio, sr=self.sample_rate)
+            magnitude = self.compute_spectrogram(audio_data)
+            frames = self.frame_features(magnitude)
 
             return {
-                "mfcc": mfcc_features,
-                "rms_energy": np.mean(rms_energy),
-                "pitch_mean": np.mean(pitch[pitch > 0]) if np.any(pitch > 0) else 0,
+                "mfcc": self.mfcc_from_spectrogram(magnitude),
                 "duration": len(audio_data) / self.sample_rate,
-                **artifact_analysis
+                **self.summarize_frames(frames),
+                **pitch_summary(frames["pitch"]),
             }
         except Exception as e:
             logger.error(f"Audio chunk analysis failed: {e}")
@@ -10,17 +10,100 @@ from collections import deque, Counter
 import logging
 import time
 
+from ..app.metrics import timer
+
 logger = logging.getLogger(__name__)
 
+
+class RollingNGramIndex:
+    """
+    Word n-gram counts over a sliding window of text chunks.
+
+    N-grams are stored as integer hashes. Adding a chunk costs O(words in the
+    chunk) and retires the n-grams of the chunk that falls out of the window,
+    so repetition statistics never need a full rebuild.
+    """
+
+    def __init__(self, window: int = 10, n: int = 3):
+        self.window = window
+        self.n = n
+        self.chunks = deque()  # (text, n-gram hashes) per chunk in the window
+        self.counts: Dict[int, int] = {}
+        self._count_freq: Dict[int, int] = {}  # count -> number of n-grams with it
+        self.max_count = 0
+        self.total = 0
+        self.exact_repeats = 0  # n-grams seen more than twice
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def texts(self) -> List[str]:
+        return [text for text, _ in self.chunks]
+
+    def add(self, text: str) -> None:
+        words = text.lower().split()
+        n = self.n
+        hashes = [hash(tuple(words[i:i + n])) for i in range(len(words) - n + 1)]
+        for h in hashes:
+            self._increment(h)
+        self.chunks.append((text, hashes))
+        while len(self.chunks) > self.window:
+            _, retired = self.chunks.popleft()
+            for h in retired:
+                self._decrement(h)
+
+    def _increment(self, h: int) -> None:
+        freq = self._count_freq
+        count = self.counts.get(h, 0)
+        if count:
+            freq[count] -= 1
+        count += 1
+        self.counts[h] = count
+        freq[count] = freq.get(count, 0) + 1
+        if count > self.max_count:
+            self.max_count = count
+        if count == 3:
+            self.exact_repeats += 1
+        self.total += 1
+
+    def _decrement(self, h: int) -> None:
+        freq = self._count_freq
+        count = self.counts[h]
+        freq[count] -= 1
+        if count == 3:
+            self.exact_repeats -= 1
+        if count == self.max_count and freq[count] == 0:
+            self.max_count -= 1
+        count -= 1
+        if count:
+            self.counts[h] = count
+            freq[count] = freq.get(count, 0) + 1
+        else:
+            del self.counts[h]
+        self.total -= 1
+
+    def stats(self) -> Dict[str, any]:
+        total = self.total
+        return {
+            "repetition_score": min(self.max_count / total * 10, 1.0) if total else 0,
+            "exact_repeats": self.exact_repeats,
+            "unique_phrases": len(self.counts),
+            "total_phrases": total
+        }
+
+
 class BehavioralAnalyzer:
     """
     Behavioral analysis for detecting manipulative patterns in calls.
     """
 
-    def __init__(self, window_size: int = 100):
+    def __init__(self, window_size: int = 100, history_size: int = 256, text_window: int = 10):
         self.window_size = window_size
         self.recent_patterns = deque(maxlen=window_size)
-        self.call_history = []
+        # Bounded so a long-lived analyzer never grows without limit
+        self.call_history = deque(maxlen=history_size)
+        self.text_window = text_window
+        self.ngram_index = RollingNGramIndex(window=text_window)
         self.pattern_thresholds = {
             'repetition_threshold': 0.7,
             'script_consistency': 0.8,
@@ -38,17 +121,24 @@ class BehavioralAnalyzer:
             Dictionary with behavioral analysis results
         """
         try:
-            # Extract behavioral features
-            speaking_patterns = self._analyze_speaking_patterns(call_data)
-            repetition_analysis = self._detect_repetition(call_data)
-            script_detection = self._detect_script_patterns(call_data)
-            manipulation_indicators = self._detect_manipulation(call_data)
-
-            # Calculate overall behavioral score
-            behavioral_score = self._calculate_behavioral_score(
-                speaking_patterns, repetition_analysis,
-                script_detection, manipulation_indicators
-            )
+            # Fall back to the text observed on this analyzer's call
+            ngram_index = None
+            if 'text_chunks' not in call_data and len(self.ngram_index):
+                ngram_index = self.ngram_index
+                call_data = {**call_data, 'text_chunks': ngram_index.texts()}
+
+            with timer("behavioral.analyze"):
+                # Extract behavioral features
+                speaking_patterns = self._analyze_speaking_patterns(call_data)
+                repetition_analysis = self._detect_repetition(call_data, ngram_index)
+                script_detection = self._detect_script_patterns(call_data)
+                manipulation_indicators = self._detect_manipulation(call_data)
+
+                # Calculate overall behavioral score
+                behavioral_score = self._calculate_behavioral_score(
+                    speaking_patterns, repetition_analysis,
+                    script_detection, manipulation_indicators
+                )
 
             # Update call history
             self.call_history.append({
@@ -69,6 +159,15 @@ class BehavioralAnalyzer:
             logger.error(f"Behavioral analysis failed: {e}")
             return {"error": str(e)}
 
+    def observe_text(self, text_chunk: str) -> None:
+        """
+        Record a transcript chunk of the call this analyzer is tracking.
+
+        Args:
+            text_chunk: Newly transcribed text
+        """
+        self.ngram_index.add(text_chunk)
+
     def _analyze_speaking_patterns(self, call_data: Dict[str, any]) -> Dict[str, any]:
         """
         Analyze speaking patterns and pacing.
@@ -107,47 +206,31 @@ class BehavioralAnalyzer:
             logger.error(f"Speaking pattern analysis failed: {e}")
             return {"error": str(e)}
 
-    def _detect_repetition(self, call_data: Dict[str, any]) -> Dict[str, any]:
+    def _detect_repetition(self, call_data: Dict[str, any],
+                           ngram_index: Optional[RollingNGramIndex] = None) -> Dict[str, any]:
         """
         Detect repetitive phrases or patterns.
 
         Args:
             call_data: Call data dictionary
+            ngram_index: Incrementally maintained index of the call's recent
+                chunks; built from call_data['text_chunks'] when omitted
 
         Returns:
             Repetition analysis results
         """
         try:
-            text_chunks = call_data.get('text_chunks', [])
-            if not text_chunks:
-                return {"repetition_score": 0.0}
-
-            # Analyze phrase repetition
-            phrases = []
-            for chunk in text_chunks[-10:]:  # Last 10 chunks
-                # Extract 3-5 word phrases
-                words = chunk.split()
-                for i in range(len(words) - 2):
-                    phrase = ' '.join(words[i:i+3])
-                    phrases.append(phrase.lower())
-
-            # Count phrase frequencies
-            phrase_counts = Counter(phrases)
-            max_repetition = max(phrase_counts.values()) if phrase_counts else 1
-            unique_phrases = len(phrase_counts)
-
-            # Calculate repetition score
-            repetition_score = min(max_repetition / len(phrases) * 10 if phrases else 0, 1.0)
-
-            # Detect exact repetition patterns
-            exact_repeats = sum(1 for count in phrase_counts.values() if count > 2)
+            if ngram_index is None:
+                text_chunks = call_data.get('text_chunks', [])
+                if not text_chunks:
+                    return {"repetition_score": 0.0}
 
-            return {
-                "repetition_score": repetition_score,
-                "exact_repeats": exact_repeats,
-                "unique_phrases": unique_phrases,
-                "total_phrases": len(phrases)
-            }
+                # Analyze 3-word phrase repetition over the last 10 chunks
+                ngram_index = RollingNGramIndex(window=self.text_window)
+                for chunk in text_chunks[-self.text_window:]:
+                    ngram_index.add(chunk)
+
+            return ngram_index.stats()
         except Exception as e:
             logger.error(f"Repetition detection failed: {e}")
             return {"repetition_score": 0.0}
@@ -0,0 +1,152 @@
+"""
+Pitch Tracking Module for Fraud Detection
+
+A YIN-style fundamental frequency estimator that works on the magnitude
+spectrogram the acoustic tier already computes: each frame's autocorrelation
+is one inverse real FFT of its power spectrum, so pitch costs no extra STFT
+and is vectorized over all frames of a chunk (or of a whole batch). Per-call
+statistics accumulate incrementally across chunks.
+"""
+
+from collections import deque
+from typing import Deque, Dict
+
+import numpy as np
+import scipy.fft
+
+# Avoids division by zero on silent frames
+EPSILON = 1e-10
+
+
+class PitchTracker:
+    """
+    Frame-wise f0 estimation from magnitude spectra.
+
+    The autocorrelation of each windowed frame is divided by the window's own
+    autocorrelation, which undoes the taper, and turned into the YIN
+    cumulative mean normalized difference. The pitch period is the first
+    local minimum below the threshold, refined by parabolic interpolation.
+
+    Args:
+        sample_rate: Audio sample rate in Hz
+        n_fft: FFT size of the spectra passed to track
+        fmin: Lowest pitch searched (Hz)
+        fmax: Highest pitch searched (Hz)
+        threshold: Normalized difference below which a period is accepted
+    """
+
+    def __init__(self, sample_rate: int = 16000, n_fft: int = 2048,
+                 fmin: float = 70.0, fmax: float = 400.0, threshold: float = 0.2):
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.threshold = threshold
+        self.tau_min = max(2, int(sample_rate / fmax))
+        self.tau_max = min(int(np.ceil(sample_rate / fmin)), n_fft // 2 - 2)
+        window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)  # periodic Hann
+        window_acf = np.fft.irfft(np.abs(np.fft.rfft(window)) ** 2, n=n_fft)[:self.tau_max + 2]
+        self._taper = (window_acf / window_acf[0])[:, None]
+        self._lags = np.arange(1, self.tau_max + 2)[:, None]
+
+    def track(self, magnitude: np.ndarray) -> np.ndarray:
+        """
+        Estimate f0 for every frame.
+
+        Args:
+            magnitude: Magnitude spectrogram (n_fft // 2 + 1, n_frames)
+
+        Returns:
+            f0 in Hz per frame, 0 where no pitch was found
+        """
+        n_frames = magnitude.shape[1]
+        if n_frames == 0:
+            return np.zeros(0)
+        acf = scipy.fft.irfft(np.square(magnitude), n=self.n_fft, axis=0)[:self.tau_max + 2]
+        acf = acf / self._taper
+
+        # YIN difference d(tau) = 2 (r(0) - r(tau)) and its cumulative mean normalization
+        diff = 2.0 * (acf[0] - acf[1:])
+        cmnd = diff * self._lags / np.maximum(np.cumsum(diff, axis=0), EPSILON)
+
+        # Rows of cmnd are lags 1..tau_max+1; look for the first dip below threshold
+        search = cmnd[self.tau_min - 1:self.tau_max]
+        following = cmnd[self.tau_min:self.tau_max + 1]
+        candidates = (search < self.threshold) & (search <= following)
+        found = candidates.any(axis=0) & (acf[0] > EPSILON)
+        row = np.argmax(candidates, axis=0) + self.tau_min - 1
+
+        columns = np.arange(n_frames)
+        before = cmnd[np.maximum(row - 1, 0), columns]
+        at = cmnd[row, columns]
+        after = cmnd[row + 1, columns]
+        curvature = before - 2 * at + after
+        shift = np.where(curvature > EPSILON, 0.5 * (before - after) / np.maximum(curvature, EPSILON), 0.0)
+        period = row + 1 + np.clip(shift, -1.0, 1.0)
+        return np.where(found, self.sample_rate / period, 0.0)
+
+
+class PitchStats:
+    """
+    Running pitch statistics for one call.
+
+    Mean and variance cover every voiced frame seen; the range is taken
+    between the 10th and 90th percentile of the most recent voiced frames,
+    so isolated octave errors do not widen it.
+
+    Args:
+        window: Number of recent voiced frames kept for the range
+        min_frames: Voiced frames needed before summary reports anything
+    """
+
+    def __init__(self, window: int = 512, min_frames: int = 20):
+        self.min_frames = min_frames
+        self.count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def update(self, f0: np.ndarray) -> None:
+        """Add the f0 track of new frames (unvoiced frames are 0)."""
+        voiced = f0[f0 > 0]
+        if voiced.size == 0:
+            return
+        self.count += voiced.size
+        self._sum += float(voiced.sum())
+        self._sum_sq += float(np.dot(voiced, voiced))
+        self._recent.extend(voiced.tolist())
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        if not self.count:
+            return 0.0
+        return max(self._sum_sq / self.count - self.mean ** 2, 0.0)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Pitch features for BehavioralAnalyzer._detect_script_patterns.
+
+        Returns:
+            pitch_variance (Hz^2), pitch_range (Hz), pitch_variation (std
+            relative to the mean) and emotional_range (range relative to the
+            mean); empty until min_frames voiced frames were seen
+        """
+        if self.count < self.min_frames:
+            return {}
+        mean = self.mean
+        low, high = np.percentile(np.fromiter(self._recent, dtype=float), [10, 90])
+        return {
+            "pitch_variance": self.variance,
+            "pitch_range": float(high - low),
+            "pitch_variation": float(np.sqrt(self.variance) / mean),
+            "emotional_range": float((high - low) / mean),
+        }
+
+
+def pitch_summary(f0: np.ndarray) -> Dict[str, float]:
+    """PitchStats.summary of a single f0 track (e.g. one standalone chunk)."""
+    stats = PitchStats(min_frames=1)
+    stats.update(f0)
+    return stats.summary()
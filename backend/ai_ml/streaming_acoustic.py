@@ -0,0 +1,239 @@
+"""
+Streaming Acoustic Analysis Module for Fraud Detection
+
+This module keeps per-session state so that consecutive audio chunks of one
+call are analyzed as a continuous signal instead of isolated arrays.
+"""
+
+import numpy as np
+import librosa
+from typing import Dict, Optional
+import logging
+
+from .acoustic_analysis import AcousticAnalyzer
+from .pitch import PitchStats
+from .vad import NO_SPEECH_RESULT
+from ..app.metrics import timer
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingAcousticAnalyzer:
+    """
+    Incremental acoustic analysis for one call session.
+
+    Samples are written into a fixed-size ring buffer. Only STFT frames that
+    become complete with the new samples are transformed; the tail of the
+    previous chunk is carried over as context so no frame at a chunk boundary
+    is lost or recomputed. The noise profile is learned from the first frames
+    of the call and then updated incrementally from low-energy frames.
+    """
+
+    def __init__(self, analyzer: Optional[AcousticAnalyzer] = None,
+                 buffer_seconds: float = 2.0, noise_frames: int = 10,
+                 noise_adapt_rate: float = 0.05, noise_gate: float = 1.5):
+        self.analyzer = analyzer if analyzer is not None else AcousticAnalyzer()
+        self.n_fft = self.analyzer.n_fft
+        self.hop_length = self.analyzer.hop_length
+        self.sample_rate = self.analyzer.sample_rate
+
+        self.capacity = max(int(buffer_seconds * self.sample_rate), 2 * self.n_fft)
+        self._ring = np.zeros(self.capacity, dtype=np.float32)
+        self._window = librosa.filters.get_window("hann", self.n_fft, fftbins=True).astype(np.float32)
+        self._frame_offsets = np.arange(self.n_fft)
+
+        # Absolute sample counters
+        self.samples_written = 0
+        self._next_frame_start = 0
+        self.frames_processed = 0
+
+        # Noise profile state
+        self.noise_frames = noise_frames
+        self.noise_adapt_rate = noise_adapt_rate
+        self.noise_gate = noise_gate
+        self.noise_profile: Optional[np.ndarray] = None
+        self._noise_sum: Optional[np.ndarray] = None
+        self._noise_count = 0
+
+        # Pitch mean/variance/range over the whole call
+        self.pitch_stats = PitchStats()
+        self._last_features: Dict[str, any] = {}
+
+    def _write(self, samples: np.ndarray):
+        """Copy samples into the ring buffer (len(samples) <= capacity)."""
+        start = self.samples_written % self.capacity
+        end = start + len(samples)
+        if end <= self.capacity:
+            self._ring[start:end] = samples
+        else:
+            split = self.capacity - start
+            self._ring[start:] = samples[:split]
+            self._ring[:end - self.capacity] = samples[split:]
+        self.samples_written += len(samples)
+
+    def _complete_frames(self) -> int:
+        available = self.samples_written - self._next_frame_start - self.n_fft
+        return available // self.hop_length + 1 if available >= 0 else 0
+
+    def _take_frames(self) -> np.ndarray:
+        """Return all frames that became complete, shape (n_frames, n_fft)."""
+        n_frames = self._complete_frames()
+        if n_frames == 0:
+            return np.empty((0, self.n_fft), dtype=np.float32)
+        starts = self._next_frame_start + self.hop_length * np.arange(n_frames)
+        frames = self._ring[(starts[:, None] + self._frame_offsets) % self.capacity]
+        self._next_frame_start += n_frames * self.hop_length
+        return frames
+
+    def take(self, audio_data: np.ndarray) -> np.ndarray:
+        """
+        Append a chunk and return its newly completed frames, unwindowed.
+
+        Args:
+            audio_data: Audio samples following the previous chunk
+
+        Returns:
+            Frames (n_new_frames, n_fft)
+        """
+        samples = np.asarray(audio_data, dtype=np.float32).ravel()
+        # Never write more than the ring can hold beyond the carried-over context
+        step = self.capacity - self.n_fft
+        frames = []
+        for offset in range(0, len(samples), step):
+            self._write(samples[offset:offset + step])
+            frames.append(self._take_frames())
+        if not frames:
+            return np.empty((0, self.n_fft), dtype=np.float32)
+        return np.concatenate(frames)
+
+    def push(self, audio_data: np.ndarray) -> np.ndarray:
+        """
+        Append a chunk and return the magnitude of the new frames only.
+
+        Args:
+            audio_data: Audio samples following the previous chunk
+
+        Returns:
+            Magnitude spectrogram (n_bins, n_new_frames), before noise reduction
+        """
+        frames = self.take(audio_data)
+        with timer("acoustic.stft"):
+            return np.abs(np.fft.rfft(frames * self._window, axis=1)).T
+
+    def skip(self, audio_data: np.ndarray) -> Dict[str, any]:
+        """
+        Advance the stream past a chunk without analyzing it.
+
+        The samples still enter the ring buffer, so frame boundaries stay
+        aligned and the next analyzed chunk has its overlap context. The
+        noise profile is left unchanged.
+
+        Args:
+            audio_data: Audio samples following the previous chunk
+
+        Returns:
+            The last computed features, marked as skipped
+        """
+        samples = self._advance(audio_data)
+        return {**self.last_result(samples), "skipped": True}
+
+    def silence(self, audio_data: np.ndarray) -> Dict[str, any]:
+        """
+        Advance the stream past a chunk without speech (see skip).
+
+        Args:
+            audio_data: Audio samples following the previous chunk
+
+        Returns:
+            The no-speech result for the chunk's duration
+        """
+        samples = self._advance(audio_data)
+        return {**NO_SPEECH_RESULT, "duration": len(samples) / self.sample_rate}
+
+    def _advance(self, audio_data: np.ndarray) -> np.ndarray:
+        samples = np.asarray(audio_data, dtype=np.float32).ravel()
+        step = self.capacity - self.n_fft
+        for offset in range(0, len(samples), step):
+            self._write(samples[offset:offset + step])
+            self._next_frame_start += self._complete_frames() * self.hop_length
+        return samples
+
+    def _update_noise_profile(self, magnitude: np.ndarray):
+        if magnitude.shape[1] == 0:
+            return
+        if self.noise_profile is None or self._noise_count < self.noise_frames:
+            # Learning phase: average over the first frames of the call
+            take = magnitude[:, :self.noise_frames - self._noise_count]
+            if self._noise_sum is None:
+                self._noise_sum = np.zeros(magnitude.shape[0], dtype=np.float64)
+            self._noise_sum += take.sum(axis=1)
+            self._noise_count += take.shape[1]
+            self.noise_profile = (self._noise_sum / self._noise_count)[:, None]
+            return
+
+        # Adaptive phase: track the noise floor using frames that look like noise
+        frame_energy = magnitude.sum(axis=0)
+        noise_energy = self.noise_profile.sum()
+        quiet = magnitude[:, frame_energy <= self.noise_gate * noise_energy]
+        if quiet.shape[1]:
+            rate = self.noise_adapt_rate
+            self.noise_profile = (1 - rate) * self.noise_profile + rate * quiet.mean(axis=1, keepdims=True)
+
+    def reduce_noise(self, magnitude: np.ndarray) -> None:
+        """Update the noise profile from new frames and subtract it in place."""
+        with timer("acoustic.noise_reduction"):
+            self._update_noise_profile(magnitude)
+            np.subtract(magnitude, self.noise_profile, out=magnitude, casting="unsafe")
+            np.maximum(magnitude, 0, out=magnitude)
+        self.frames_processed += magnitude.shape[1]
+
+    def features(self, magnitude: np.ndarray, audio_data: np.ndarray,
+                 mfcc: Optional[np.ndarray] = None,
+                 frames: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, any]:
+        """
+        Acoustic features of a chunk from its noise-reduced new frames.
+
+        Args:
+            magnitude: Noise-reduced magnitude of the chunk's new frames
+            audio_data: The chunk's samples
+            mfcc: Precomputed MFCC (n_frames, n_mfcc), e.g. from a batch
+            frames: Precomputed AcousticAnalyzer.frame_features, e.g. from a batch
+
+        Returns:
+            Dictionary with acoustic features (same keys as AcousticAnalyzer)
+        """
+        analyzer = self.analyzer
+        if frames is None:
+            frames = analyzer.frame_features(magnitude)
+        self.pitch_stats.update(frames["pitch"])
+        self._last_features = {
+            "mfcc": mfcc if mfcc is not None else analyzer.mfcc_from_spectrogram(magnitude),
+            **analyzer.summarize_frames(frames),
+            **self.pitch_stats.summary(),
+        }
+        return self.last_result(audio_data, magnitude.shape[1])
+
+    def last_result(self, audio_data: np.ndarray, new_frames: int = 0) -> Dict[str, any]:
+        """The most recent features, reported for this chunk's duration."""
+        return {**self._last_features, "duration": len(audio_data) / self.sample_rate, "new_frames": new_frames}
+
+    def analyze_chunk(self, audio_data: np.ndarray) -> Dict[str, any]:
+        """
+        Analyze the next chunk of the call using only its new frames.
+
+        Args:
+            audio_data: Audio samples following the previous chunk
+
+        Returns:
+            Dictionary with acoustic features (same keys as AcousticAnalyzer)
+        """
+        try:
+            magnitude = self.push(audio_data)
+            if magnitude.shape[1] == 0:
+                # Not enough new samples for a frame yet; report the last state
+                return self.last_result(audio_data)
+            self.reduce_noise(magnitude)
+            return self.features(magnitude, audio_data)
+        except Exception as e:
+            logger.error("Streaming chunk analysis failed: %s", e)
+            return {"error": str(e)}
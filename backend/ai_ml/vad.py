@@ -0,0 +1,158 @@
+"""
+Voice Activity Detection Module for Fraud Detection
+
+Calls carry long stretches of silence and hold music. An energy /
+zero-crossing gate decides per chunk whether anyone is speaking, so the
+acoustic tier is not run on near-zero signal, and it records the pauses
+between speech segments for behavioral analysis.
+"""
+
+from collections import deque
+from typing import Deque, Dict, Optional
+
+import numpy as np
+
+# Result reported by the acoustic tier for a chunk without speech
+NO_SPEECH_RESULT = {"artifact_score": 0.0, "rms_energy": 0.0, "speech": False, "new_frames": 0}
+
+# Keeps log10 finite on digital silence
+ENERGY_EPS = 1e-10
+
+
+class VoiceActivityDetector:
+    """
+    Streaming energy / zero-crossing voice activity detector for one call.
+
+    Audio is cut into short non-overlapping frames (leftover samples carry
+    over to the next chunk). A frame is voiced when its energy is above both
+    an absolute floor and the tracked noise floor plus a margin, and its
+    zero-crossing rate is speech-like; loud frames pass regardless of their
+    zero-crossing rate. The noise floor falls immediately to quiet frames and
+    rises slowly, so steady sounds such as hold music are eventually gated.
+
+    Args:
+        sample_rate: Audio sample rate in Hz
+        frame_seconds: Analysis frame length
+        energy_floor_db: Frames below this level (dBFS) are never voiced
+        margin_db: Required level above the noise floor
+        max_zcr: Zero crossings per sample above which quiet frames count as noise
+        noise_rise_rate: Per-frame rate at which the noise floor rises
+        hangover_seconds: Silence after speech still reported as speech
+        min_pause_seconds: Shorter gaps count as part of the speech segment
+        min_call_seconds: Audio needed before call_data reports timing
+        max_pauses: Number of most recent pauses kept
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_seconds: float = 0.02,
+                 energy_floor_db: float = -50.0, margin_db: float = 10.0,
+                 max_zcr: float = 0.35, noise_rise_rate: float = 0.002,
+                 hangover_seconds: float = 0.2, min_pause_seconds: float = 0.2,
+                 min_call_seconds: float = 5.0, max_pauses: int = 1024):
+        self.sample_rate = sample_rate
+        self.frame_length = max(1, int(round(frame_seconds * sample_rate)))
+        self.frame_seconds = self.frame_length / sample_rate
+        self.energy_floor_db = energy_floor_db
+        self.margin_db = margin_db
+        self.max_zcr = max_zcr
+        self.noise_rise_rate = noise_rise_rate
+        self.hangover_frames = int(round(hangover_seconds / self.frame_seconds))
+        self.min_pause_frames = max(1, int(round(min_pause_seconds / self.frame_seconds)))
+        self.min_call_seconds = min_call_seconds
+
+        self.noise_floor_db = energy_floor_db
+        self.frames = 0
+        self.speech_frames = 0
+        self.pauses: Deque[float] = deque(maxlen=max_pauses)
+        # Frames since the last voiced frame; None until speech is first heard
+        self._silence_run: Optional[int] = None
+        self._remainder = np.empty(0, dtype=np.float32)
+
+    def _frames(self, audio_data: np.ndarray) -> np.ndarray:
+        samples = np.asarray(audio_data, dtype=np.float32).ravel()
+        if len(self._remainder):
+            samples = np.concatenate([self._remainder, samples])
+        n = len(samples) // self.frame_length
+        self._remainder = samples[n * self.frame_length:].copy()
+        return samples[:n * self.frame_length].reshape(n, self.frame_length)
+
+    def voiced_frames(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Classify frames against the current noise floor and update it.
+
+        Args:
+            frames: Samples (n_frames, frame_length)
+
+        Returns:
+            Boolean array (n_frames,), True for voiced frames
+        """
+        if len(frames) == 0:
+            return np.zeros(0, dtype=bool)
+        energy_db = 10.0 * np.log10(np.mean(frames.astype(np.float64) ** 2, axis=1) + ENERGY_EPS)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frames.shape[1]
+
+        threshold = max(self.energy_floor_db, self.noise_floor_db + self.margin_db)
+        voiced = (energy_db > threshold) & ((zcr <= self.max_zcr) | (energy_db > threshold + self.margin_db))
+
+        # Fall to the quietest frame at once, rise towards it slowly
+        quietest = float(energy_db.min())
+        if quietest < self.noise_floor_db:
+            self.noise_floor_db = quietest
+        else:
+            rise = 1.0 - (1.0 - self.noise_rise_rate) ** len(frames)
+            self.noise_floor_db += rise * (quietest - self.noise_floor_db)
+        return voiced
+
+    def process(self, audio_data: np.ndarray) -> Dict[str, any]:
+        """
+        Run the detector over the next chunk of the call.
+
+        Args:
+            audio_data: Audio samples following the previous chunk
+
+        Returns:
+            Dictionary with "speech" (voiced frames or within the hangover),
+            "speech_ratio" of the chunk's frames and their "frames" count
+        """
+        voiced = self.voiced_frames(self._frames(audio_data))
+        n = len(voiced)
+        self.frames += n
+        previous_run = self._silence_run
+        indices = np.flatnonzero(voiced)
+
+        if len(indices) == 0:
+            if self._silence_run is not None:
+                self._silence_run += n
+        else:
+            # Gaps between voiced frames, including the one since the last chunk
+            gaps = np.diff(indices) - 1
+            if self._silence_run is not None:
+                gaps = np.concatenate([[self._silence_run + indices[0]], gaps])
+            pauses = gaps[gaps >= self.min_pause_frames]
+            self.pauses.extend((pauses * self.frame_seconds).tolist())
+            self.speech_frames += len(indices) + int(gaps[gaps < self.min_pause_frames].sum())
+            self._silence_run = n - 1 - int(indices[-1])
+
+        in_hangover = previous_run is not None and previous_run < self.hangover_frames
+        return {
+            "speech": bool(len(indices)) or in_hangover,
+            "speech_ratio": len(indices) / n if n else 0.0,
+            "frames": n,
+        }
+
+    def call_data(self) -> Dict[str, any]:
+        """
+        Speaking-pattern inputs for BehavioralAnalyzer.analyze_call_behavior.
+
+        Returns:
+            "pauses" (seconds), "speaking_duration" and "total_duration";
+            empty until min_call_seconds of audio have been seen
+        """
+        total_duration = self.frames * self.frame_seconds
+        if total_duration < self.min_call_seconds:
+            return {}
+        return {
+            "pauses": list(self.pauses),
+            "speaking_duration": self.speech_frames * self.frame_seconds,
+            "total_duration": total_duration,
+        }
@@ -1,3 +1,5 @@
+import os
+
 # Support pydantic v2 where BaseSettings lives in the pydantic-settings package
 try:
     from pydantic import BaseSettings
@@ -16,6 +18,64 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     database_url: str = "sqlite:///./fraud_detection.db"
 
+    # Analysis execution: "inline", "thread" or "process"
+    analysis_executor_mode: str = "thread"
+    analysis_max_workers: int = 0  # 0 = one per CPU core
+    analysis_max_in_flight: int = 32
+    analysis_queue_depth: int = 128
+
+    # Cross-session micro-batching of audio chunks (max size 1 disables it)
+    analysis_batch_max_delay_ms: float = 5.0
+    analysis_batch_max_size: int = 32
+
+    # Per-call analyzer state held by each worker
+    session_max_count: int = 10000
+    session_ttl_seconds: float = 1800.0
+
+    # Adaptive acoustic cadence per session (see utils/analysis_scheduler.py)
+    acoustic_base_interval: int = 10
+    acoustic_escalate_risk: float = 0.4
+    acoustic_hold_chunks: int = 10
+
+    # Voice activity gate in front of the acoustic tier (see ai_ml/vad.py)
+    vad_enabled: bool = True
+    vad_energy_floor_db: float = -50.0
+
+    # Warm analysis caches at startup; /ready reports 503 until done
+    warmup_enabled: bool = True
+
+    # Logging: "text" or "json"; repeated warnings allowed per message per interval
+    log_format: str = "text"
+    log_queue_size: int = 10000
+    log_rate_limit_burst: int = 10
+    log_rate_limit_interval: float = 10.0
+    # Lowest level that is rate limited (errors are never limited)
+    log_rate_limit_level: str = "WARNING"
+
+    # Stage timers and the Prometheus /metrics endpoint
+    metrics_enabled: bool = True
+
+    # Opt-in log of every inbound /call/stream message (see utils/session_recorder.py).
+    # With several workers each one writes record_path with its pid inserted.
+    record_sessions: bool = False
+    record_path: str = "logs/sessions.rec"
+    record_max_bytes: int = 1 << 30
+    record_queue_size: int = 10000
+
+    # Per-chunk acoustic features in memory-mapped columns (see utils/feature_store.py)
+    feature_store_enabled: bool = False
+    feature_store_path: str = "data/features"
+    feature_store_flush_rows: int = 64
+
+    # Write-behind persistence of per-call risk updates
+    persist_flush_interval: float = 1.0
+    persist_max_pending: int = 256
+
+    # Cross-worker websocket delivery: "local" (single process) or "broker".
+    # Read from the environment directly so run.py can switch spawned workers.
+    session_router: str = os.environ.get("SESSION_ROUTER", "local")
+    session_broker_path: str = os.environ.get("SESSION_BROKER_PATH", "/tmp/fraud_detection_sessions.sock")
+
     class Config:
         env_file = ".env"
 
@@ -1,25 +1,191 @@
+"""
+Logging setup for the API.
+
+Records are handed to a bounded in-memory queue; a QueueListener thread does
+the console and rotating-file I/O, so a slow disk never blocks the event
+loop. A full queue drops records (and counts them) instead of waiting.
+Repeated warnings are rate limited per message, and output can be plain text
+or one JSON object per line (settings.log_format).
+"""
+
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional, Tuple
+
+from .config import settings
+from .metrics import registry
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord attributes that are not user-supplied "extra" fields
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per (logger, level, message template).
+
+    Each template may log `burst` records per `interval` seconds; the excess
+    is dropped. The next record that gets through carries the number dropped
+    since as `record.suppressed`. Only records from `min_level` to
+    `max_level` (warnings by default) are limited. The key is the unformatted
+    message, so callers should log with %-style arguments rather than
+    f-strings. At most `max_keys` buckets are kept; the least recently used
+    one is evicted beyond that.
+
+    Args:
+        burst: Records allowed back to back per template
+        interval: Seconds to refill the full burst
+        min_level: Lowest level that is rate limited
+        max_level: Highest level that is rate limited
+        max_keys: Number of templates tracked at once
+    """
+
+    def __init__(self, burst: int = 10, interval: float = 10.0, min_level: int = logging.WARNING,
+                 max_level: int = logging.WARNING, max_keys: int = 1024, clock=time.monotonic):
+        super().__init__()
+        self.burst = max(1, burst)
+        self.rate = self.burst / interval if interval > 0 else float("inf")
+        self.min_level = min_level
+        self.max_level = max_level
+        self.max_keys = max(1, max_keys)
+        self.clock = clock
+        # key -> [tokens, last refill time, suppressed count], least recently used first
+        self._buckets: "OrderedDict[Tuple[str, int, str], list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.min_level <= record.levelno <= self.max_level:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] -= 1.0
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    """The classic text format, noting rate-limited repeats."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" ({suppressed} similar messages suppressed)"
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and not name.startswith("_"):
+                entry[name] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of erroring."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+
+def _formatter() -> logging.Formatter:
+    if getattr(settings, "log_format", "text") == "json":
+        return JsonFormatter()
+    return TextFormatter(TEXT_FORMAT)
+
 
 def setup_logging():
+    global _listener, _queue_handler
     # Create logs directory if it doesn't exist
     if not os.path.exists('logs'):
         os.makedirs('logs')
-    
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
+
+    root = logging.getLogger()
+    if _listener is None:
+        formatter = _formatter()
+        handlers = [
             RotatingFileHandler('logs/fraud_detection.log', maxBytes=10485760, backupCount=5),
-            logging.StreamHandler()
+            logging.StreamHandler(),
         ]
-    )
-    
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        queue_handler = DroppingQueueHandler(queue.Queue(getattr(settings, "log_queue_size", 10000)))
+        queue_handler.addFilter(RateLimitFilter(
+            burst=getattr(settings, "log_rate_limit_burst", 10),
+            interval=getattr(settings, "log_rate_limit_interval", 10.0),
+            min_level=logging.getLevelName(getattr(settings, "log_rate_limit_level", "WARNING")),
+        ))
+        root.addHandler(queue_handler)
+        _queue_handler = queue_handler
+        root.setLevel(logging.INFO)
+
+        _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
     # Create logger
     logger = logging.getLogger('fraud_detection')
     return logger
 
 # Global logger instance
 logger = setup_logging()
+
+
+def _log_records_lost():
+    if _queue_handler is None:
+        return None
+    suppressed = sum(f.suppressed for f in _queue_handler.filters if isinstance(f, RateLimitFilter))
+    return {(("reason", "queue_full"),): _queue_handler.dropped, (("reason", "rate_limited"),): suppressed}
+
+
+registry.counter("fraud_log_records_lost_total", "Log records not written, by reason", _log_records_lost)
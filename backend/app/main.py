@@ -1,95 +1,124 @@
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import SQLAlchemyError
-from backend.routes import auth, calls, alerts, analytics
 
-# Import DB & models resiliently (tests may run without SQLAlchemy installed)
-try:
-    from backend.app.database import engine
-    from backend.app import models
-    # Try to create tables if possible
+from backend.app.error_handlers import http_exception_handler, sqlalchemy_exception_handler, general_exception_handler
+from backend.app.logging import logger
+from backend.app.metrics import loop_lag, registry
+from backend.app.warmup import readiness
+from backend.routes import ROUTERS, load_router
+
+
+def _create_tables():
+    # Import DB & models resiliently (tests may run without SQLAlchemy installed)
     try:
+        from backend.app.database import engine
+        from backend.app import models
+        # Try to create tables if possible
         if engine is not None and getattr(models, "Base", None) is not None:
             models.Base.metadata.create_all(bind=engine)
     except Exception:
         pass
-except Exception:
-    engine = None
 
-from backend.app.error_handlers import http_exception_handler, sqlalchemy_exception_handler, general_exception_handler
-from backend.app.logging import logger
 
-app = FastAPI(title="Fraud Detection API", version="1.0.0")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Add exception handlers
-app.add_exception_handler(HTTPException, http_exception_handler)
-app.add_exception_handler(SQLAlchemyError, sqlalchemy_exception_handler)
-app.add_exception_handler(Exception, general_exception_handler)
-
-if getattr(auth, "router", None):
-    app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-if getattr(calls, "router", None):
-    app.include_router(calls.router, prefix="/call", tags=["Calls"])
-if getattr(alerts, "router", None):
-    app.include_router(alerts.router, prefix="/alert", tags=["Alerts"])
-if getattr(analytics, "router", None):
-    app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
-
-# Ensure routes are included even if the routes module changed after import
-try:
-    import importlib
-    # Try to import auth router directly
+async def start_warmup():
+    readiness.start()
+    if registry.enabled:
+        loop_lag.start()
+
+
+async def shutdown_analysis():
+    loop_lag.stop()
     try:
-        auth_mod = importlib.import_module("backend.routes.auth")
-        if getattr(auth_mod, "router", None):
-            app.include_router(auth_mod.router, prefix="/auth", tags=["Authentication"])
+        from backend.app.persistence import risk_writer
+        await risk_writer.close()
     except Exception:
-        pass
-
-    # Try to import calls router (fallback to calls_minimal)
+        logger.exception("Failed to flush pending risk scores")
     try:
-        calls_mod = importlib.import_module("backend.routes.calls")
-        if getattr(calls_mod, "router", None):
-            app.include_router(calls_mod.router, prefix="/call", tags=["Calls"])
+        from backend.routes.session_router import session_router
+        await session_router.close()
     except Exception:
-        try:
-            calls_min = importlib.import_module("backend.routes.calls_minimal")
-            if getattr(calls_min, "router", None):
-                app.include_router(calls_min.router, prefix="/call", tags=["Calls"])
-        except Exception:
-            pass
-
-    # Try alerts and analytics
+        logger.exception("Failed to close session router")
     try:
-        alerts_mod = importlib.import_module("backend.routes.alerts")
-        if getattr(alerts_mod, "router", None):
-            app.include_router(alerts_mod.router, prefix="/alert", tags=["Alerts"])
+        from backend.utils.session_recorder import shutdown_session_recorder
+        shutdown_session_recorder()
     except Exception:
-        pass
-
+        logger.exception("Failed to close session recorder")
     try:
-        analytics_mod = importlib.import_module("backend.routes.analytics")
-        if getattr(analytics_mod, "router", None):
-            app.include_router(analytics_mod.router, prefix="/analytics", tags=["Analytics"])
+        from backend.utils.feature_store import flush_feature_store
+        flush_feature_store()
     except Exception:
-        pass
-except Exception as e:
-    # Log import errors to aid debugging route registration (kept permissive for tests)
+        logger.exception("Failed to flush feature store")
     try:
-        from backend.app.logging import logger
-        logger.exception("Failed to include some routers during startup: %s", e)
+        from backend.utils.analysis_executor import shutdown_analysis_executor
+        shutdown_analysis_executor()
     except Exception:
-        pass
+        logger.exception("Failed to shut down analysis executor")
+
+
+system_router = APIRouter()
 
-@app.get("/")
+
+@system_router.get("/")
 def read_root():
     logger.info("Root endpoint accessed")
     return {"message": "Fraud Detection API is running"}
+
+
+@system_router.get("/ready")
+def read_ready():
+    """Readiness probe: 503 until the startup warm-up has finished."""
+    return JSONResponse(readiness.status(), status_code=200 if readiness.ready else 503)
+
+
+@system_router.get("/metrics")
+def read_metrics():
+    """Stage latencies, queue depths, drops and sessions in Prometheus text format."""
+    if not registry.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def create_app() -> FastAPI:
+    """
+    Build the FastAPI application.
+
+    Every router in backend.routes.ROUTERS is imported and mounted exactly
+    once, in order. Route modules do not import the acoustic stack; librosa
+    and scipy are loaded with the first analysis (or the startup warm-up).
+
+    Returns:
+        The configured application
+    """
+    _create_tables()
+
+    app = FastAPI(title="Fraud Detection API", version="1.0.0")
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Add exception handlers
+    app.add_exception_handler(HTTPException, http_exception_handler)
+    app.add_exception_handler(SQLAlchemyError, sqlalchemy_exception_handler)
+    app.add_exception_handler(Exception, general_exception_handler)
+
+    for spec in ROUTERS:
+        router = load_router(spec)
+        if router is None:
+            logger.error("No router available for %s; its routes are not mounted", spec.prefix)
+            continue
+        app.include_router(router, prefix=spec.prefix, tags=list(spec.tags))
+    app.include_router(system_router)
+
+    app.add_event_handler("startup", start_warmup)
+    app.add_event_handler("shutdown", shutdown_analysis)
+    return app
+
+
+app = create_app()
@@ -0,0 +1,263 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Stage timers feed fixed-bucket latency histograms. Each thread records into
+its own shard of bucket counts, so observing never takes a lock and never
+loses an increment; shards are only summed when /metrics is scraped. Gauges
+and counters owned by other components (queue depths, drops, sessions) are
+registered as callbacks and read at scrape time.
+
+In process executor mode the analysis stages run in worker processes and
+are recorded there; this process then reports the route-level stages only.
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from .config import settings
+
+# Latency bucket upper bounds in seconds (50 us .. 10 s)
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CallbackValue = Union[float, Dict[Tuple[Tuple[str, str], ...], float]]
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with per-thread shards.
+
+    A shard is [bucket counts..., +Inf count, sum]; it is only written by the
+    thread that owns it.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._shards: List[list] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> list:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = [0] * (len(self.buckets) + 1) + [0.0]
+            self._local.shard = shard
+            # Taken once per thread, never on the observe path afterwards
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, value: float) -> None:
+        shard = self._shard()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Per-bucket counts (last is +Inf) and the sum, across all threads."""
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        for shard in list(self._shards):
+            for i in range(len(counts)):
+                counts[i] += shard[i]
+            total += shard[-1]
+        return counts, total
+
+    @property
+    def count(self) -> int:
+        return sum(self.snapshot()[0])
+
+
+class HistogramFamily:
+    """Histograms of one metric, keyed by the value of a single label."""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.buckets = buckets
+        self._children: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, value: str) -> Histogram:
+        child = self._children.get(value)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(value, Histogram(self.buckets))
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for value, child in sorted(self._children.items()):
+            counts, total = child.snapshot()
+            label = f'{self.label}="{value}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {total!r}")
+            lines.append(f"{self.name}_count{{{label}}} {cumulative}")
+        return lines
+
+
+class CallbackMetric:
+    """A gauge or counter whose value is read from its owner at scrape time."""
+
+    def __init__(self, name: str, help_text: str, kind: str, read: Callable[[], CallbackValue]):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.read = read
+
+    def render(self) -> List[str]:
+        try:
+            value = self.read()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        samples = value if isinstance(value, dict) else {(): value}
+        for labels, sample in sorted(samples.items()):
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(sample)}")
+        return lines
+
+
+class Registry:
+    """All metrics of this process, rendered in registration order."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Union[HistogramFamily, CallbackMetric]] = {}
+        self.enabled = getattr(settings, "metrics_enabled", True)
+
+    def histogram(self, name: str, help_text: str, label: str,
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> HistogramFamily:
+        family = self._metrics.get(name)
+        if family is None:
+            family = self._metrics[name] = HistogramFamily(name, help_text, label, buckets)
+        return family
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], CallbackValue]) -> None:
+        self._metrics[name] = CallbackMetric(name, help_text, "gauge", read)
+
+    def counter(self, name: str, help_text: str, read: Callable[[], CallbackValue]) -> None:
+        self._metrics[name] = CallbackMetric(name, help_text, "counter", read)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "fraud_stage_seconds", "Time spent per processing stage", "stage"
+)
+
+
+class _StageTimer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(stage: str):
+    """
+    Context manager recording the duration of a stage.
+
+    Args:
+        stage: Stage name, e.g. "acoustic.mfcc" or "ws.json_loads"
+
+    Returns:
+        A context manager (a no-op one when metrics are disabled)
+    """
+    if not registry.enabled:
+        return _NULL_TIMER
+    return _StageTimer(STAGE_SECONDS.labels(stage))
+
+
+def observe(stage: str, seconds: float) -> None:
+    """Record an already measured stage duration."""
+    if registry.enabled:
+        STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how late a periodic sleep wakes up.
+
+    Args:
+        interval: Seconds between probes
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.histogram = registry.histogram(
+            "fraud_event_loop_lag_seconds", "Delay of event loop wakeups beyond their schedule", "loop"
+        ).labels("main")
+        self.last_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, loop.time() - expected)
+            self.histogram.observe(self.last_lag)
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+loop_lag = LoopLagMonitor()
+registry.gauge("fraud_event_loop_lag_last_seconds", "Most recent event loop lag probe",
+               lambda: loop_lag.last_lag)
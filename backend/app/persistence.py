@@ -0,0 +1,142 @@
+"""
+Write-behind persistence for per-call risk updates.
+
+The stream handler records every new risk score here instead of committing
+per message. Only the latest values per call are kept; they are written in
+one batched transaction on a timer or when enough calls are pending, and
+flushed immediately when a call disconnects or the app shuts down.
+Flushes are serialized, so batches commit in the order they were taken and
+a slow older batch cannot overwrite newer values.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from . import database
+from .config import settings
+from .metrics import registry, timer
+from ..models.call import Call
+
+logger = logging.getLogger(__name__)
+
+
+class RiskScoreWriter:
+    """
+    Coalescing write-behind buffer for Call.risk_score / Call.status.
+
+    Args:
+        flush_interval: Seconds between background flushes
+        max_pending: Number of pending calls that triggers an early flush
+    """
+
+    def __init__(self, flush_interval: float = 1.0, max_pending: int = 256):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.flushes = 0
+        self.rows_written = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def update(self, call_id: int, **values: Any) -> None:
+        """Record the latest values for a call (e.g. risk_score=0.4, status="ended")."""
+        self._pending.setdefault(call_id, {}).update(values)
+        self._ensure_flusher()
+        if len(self._pending) >= self.max_pending and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_flusher(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending:
+                await self.flush()
+
+    def _take(self, call_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Any]]:
+        if call_ids is None:
+            batch, self._pending = self._pending, {}
+            return batch
+        return {cid: self._pending.pop(cid) for cid in call_ids if cid in self._pending}
+
+    def _restore(self, batch: Dict[int, Dict[str, Any]]) -> None:
+        # Keep values that were not superseded while the write was failing
+        for call_id, values in batch.items():
+            newer = self._pending.get(call_id, {})
+            self._pending[call_id] = {**values, **newer}
+
+    def _write(self, batch: Dict[int, Dict[str, Any]]) -> bool:
+        db = database.SessionLocal()
+        try:
+            with timer("db.commit"):
+                db.bulk_update_mappings(Call, [{"id": call_id, **values} for call_id, values in batch.items()])
+                db.commit()
+            self.flushes += 1
+            self.rows_written += len(batch)
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.error("Risk score flush failed for %d calls: %s", len(batch), e)
+            return False
+        finally:
+            db.close()
+
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._flush_lock is None or self._flush_lock_loop is not loop:
+            self._flush_lock = asyncio.Lock()
+            self._flush_lock_loop = loop
+        return self._flush_lock
+
+    async def flush(self, call_ids: Optional[Iterable[int]] = None) -> None:
+        """Write pending values (all calls, or only call_ids) in one transaction."""
+        # Take the batch under the lock too: a batch taken earlier must not commit later
+        async with self._lock():
+            batch = self._take(call_ids)
+            if batch and not await asyncio.to_thread(self._write, batch):
+                self._restore(batch)
+
+    async def flush_call(self, call_id: int) -> None:
+        await self.flush([call_id])
+
+    def flush_sync(self) -> None:
+        """Blocking flush of everything pending (shutdown path)."""
+        batch = self._take()
+        if batch and not self._write(batch):
+            self._restore(batch)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+risk_writer = RiskScoreWriter(
+    flush_interval=getattr(settings, "persist_flush_interval", 1.0),
+    max_pending=getattr(settings, "persist_max_pending", 256),
+)
+
+registry.gauge("fraud_risk_writes_pending", "Calls with risk scores not yet written",
+               lambda: risk_writer.pending)
+registry.counter("fraud_risk_rows_written_total", "Risk score rows written", lambda: risk_writer.rows_written)
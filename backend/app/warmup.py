@@ -0,0 +1,63 @@
+"""
+Startup warm-up and readiness.
+
+A fresh worker would otherwise pay for librosa internals, filterbank/window/
+DCT construction and first-use allocations on its first audio message. The
+app warms the analysis executor in the background at startup; /ready only
+reports ready once that has finished, so load balancers hold traffic back
+until then.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Warm-up progress of this worker."""
+
+    def __init__(self):
+        self.ready = False
+        self.warmup_seconds: Optional[float] = None
+        self.timings: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def status(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {"status": "ready" if self.ready else "warming_up"}
+        if self.warmup_seconds is not None:
+            status["warmup_seconds"] = round(self.warmup_seconds, 3)
+        if self.error is not None:
+            status["warmup_error"] = self.error
+        return status
+
+    async def warm_up(self) -> None:
+        """Warm the analysis executor, then mark the worker ready (also on failure)."""
+        start = time.perf_counter()
+        try:
+            if getattr(settings, "warmup_enabled", True):
+                from ..utils.analysis_executor import get_analysis_executor
+                self.timings = await get_analysis_executor().warm_up()
+        except Exception as e:
+            # Serving cold is better than not serving at all
+            self.error = str(e)
+            logger.exception("Analysis warm-up failed")
+        self.warmup_seconds = time.perf_counter() - start
+        self.ready = True
+        logger.info("Warm-up finished in %.2fs: %s", self.warmup_seconds, self.timings)
+
+    def start(self) -> asyncio.Task:
+        """Run warm_up in the background on the running loop, unless already ready."""
+        loop = asyncio.get_running_loop()
+        # A task left behind by an earlier, already closed loop never finishes
+        if not self.ready and (self._task is None or self._task.get_loop() is not loop):
+            self._task = loop.create_task(self.warm_up())
+        return self._task
+
+
+readiness = Readiness()
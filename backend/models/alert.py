@@ -11,6 +11,6 @@ class Alert(Base):
     alert_type = Column(String, nullable=False)
     risk_score = Column(Float, nullable=False)
     message = Column(String, nullable=False)
-    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
 
     call = relationship("Call")
@@ -11,7 +11,7 @@ class Call(Base):
     session_id = Column(String, nullable=False, unique=True)
     risk_score = Column(Float, default=0.0)
     status = Column(String, default="active")
-    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
-    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
 
     user = relationship("User")
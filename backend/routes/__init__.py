@@ -1,25 +1,50 @@
-# Lazily import routers to avoid requiring optional dependencies at import time.
-try:
-    from .auth import router as auth
-except Exception:
-    auth = None
-
-try:
-    from .calls import router as calls
-except Exception:
-    # Fallback: use a minimal calls router (no DB/SQLAlchemy dependencies) for
-    # environments where SQLAlchemy or other heavy deps are unavailable.
-    try:
-        from .calls_minimal import router as calls  # type: ignore
-    except Exception:
-        calls = None
-
-try:
-    from .alerts import router as alerts
-except Exception:
-    alerts = None
-
-try:
-    from .analytics import router as analytics
-except Exception:
-    analytics = None
+"""
+API routers.
+
+Routers are imported on demand rather than when this package is imported, so
+importing one route module (or the shared connection manager) does not pull
+in every other router and its dependencies. ROUTERS is the single list the
+app factory (backend.app.main.create_app) mounts, each exactly once.
+"""
+
+import importlib
+import logging
+from typing import NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RouterSpec(NamedTuple):
+    module: str
+    prefix: str
+    tags: Tuple[str, ...]
+    # Used when the module cannot be imported (e.g. no SQLAlchemy)
+    fallback: Optional[str] = None
+
+
+ROUTERS = (
+    RouterSpec("auth", "/auth", ("Authentication",)),
+    # Minimal calls router has no DB/SQLAlchemy dependencies
+    RouterSpec("calls", "/call", ("Calls",), fallback="calls_minimal"),
+    RouterSpec("alerts", "/alert", ("Alerts",)),
+    RouterSpec("analytics", "/analytics", ("Analytics",)),
+)
+
+
+def load_router(spec: RouterSpec):
+    """
+    Import a route module and return its router.
+
+    Args:
+        spec: Entry of ROUTERS
+
+    Returns:
+        The APIRouter, from the fallback module if the primary one failed to
+        import, or None if neither is available
+    """
+    for module in filter(None, (spec.module, spec.fallback)):
+        try:
+            return importlib.import_module(f"{__name__}.{module}").router
+        except Exception:
+            logger.exception("Failed to import router backend.routes.%s", module)
+    return None
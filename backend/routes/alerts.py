@@ -1,3 +1,6 @@
+import json
+
+from anyio.from_thread import run, run_sync
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ..app.database import get_db
@@ -6,6 +9,9 @@ from ..models.call import Call
 from ..models.user import User
 from ..routes.auth import get_current_user
 from ..app.logging import logger
+from ..app.persistence import risk_writer
+from .connections import KIND_ALERT
+from .session_router import session_router
 
 router = APIRouter()
 
@@ -14,12 +20,26 @@ def trigger_alert(call_id: int, alert_type: str, message: str, db: Session = Dep
     call = db.query(Call).filter(Call.id == call_id, Call.user_id == current_user.id).first()
     if not call:
         raise HTTPException(status_code=404, detail="Call not found")
-    
+
+    # Stream scores are written behind (see app/persistence.py): write this
+    # worker's pending update before reading it. A stream held by another
+    # worker may still lag by up to settings.persist_flush_interval.
+    run(risk_writer.flush_call, call_id)
+    db.refresh(call)
+
     db_alert = Alert(call_id=call_id, alert_type=alert_type, risk_score=call.risk_score, message=message)
     db.add(db_alert)
     db.commit()
     db.refresh(db_alert)
     
-    logger.warning(f"Alert triggered: {alert_type} for call {call_id} - {message}")
-    
-    return {"message": "Alert triggered successfully", "alert_id": db_alert.id}
+    logger.warning("Alert triggered: %s for call %s - %s", alert_type, call_id, message)
+
+    # Push to the call's live stream, which may be held by another worker
+    payload = {"call_id": call_id, "alert_type": alert_type, "message": message, "risk_score": call.risk_score}
+    try:
+        delivered = run_sync(session_router.publish, call.session_id, json.dumps({"alert": payload}), KIND_ALERT)
+    except Exception as e:
+        logger.error("Failed to publish alert for call %s: %s", call_id, e)
+        delivered = False
+
+    return {"message": "Alert triggered successfully", "alert_id": db_alert.id, "delivered": delivered}
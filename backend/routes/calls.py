@@ -1,8 +1,8 @@
 import asyncio
 import base64
 import json
+import time
 import uuid
-import datetime
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
@@ -10,21 +10,31 @@ from pydantic import BaseModel, Field, ValidationError
 from sqlalchemy.orm import Session
 
 from ..app.database import get_db
+from ..app.persistence import risk_writer
 from ..models.call import Call
 from ..models.user import User
 from ..routes.auth import get_current_user
-from ..utils.fraud_detection import FraudDetectionService
+from ..utils.analysis_batcher import get_analysis_batcher
+from ..utils.analysis_executor import AnalysisOverloadedError, get_analysis_executor
+from ..utils.audio_codecs import SessionCodec
+from ..utils.session_recorder import get_session_recorder
+from ..utils.stream_encoding import StreamEncoder, StreamUpdate
+from ..utils.stream_protocol import FrameError, decode_frame
 from ..app.logging import logger
+from ..app.metrics import observe, timer
+from .connections import KIND_ALERT, KIND_UPDATE, manager
+from .session_router import session_router
 
 import numpy as np
 
 router = APIRouter()
-fraud_service = FraudDetectionService()
+analysis_executor = get_analysis_executor()
+analysis_batcher = get_analysis_batcher()
+fraud_service = analysis_executor.service
+ANALYZER_SAMPLE_RATE = fraud_service.sample_rate
 
 # Configurable timeouts and queue sizes (can be overridden via env in future)
 RECEIVE_TIMEOUT = 15  # seconds
-SEND_TIMEOUT = 2  # seconds
-SEND_QUEUE_MAXSIZE = 10
 TRANSCRIPT_MAX_LENGTH = 5000
 
 
@@ -37,79 +47,12 @@ class AudioMessage(BaseModel):
     transcript: Optional[str] = None
 
 
-class ConnectionManager:
-    """Manage active websocket connections per session with a bounded send queue
-    to avoid unbounded memory growth and provide backpressure semantics.
-    """
-
-    def __init__(self):
-        self._conns: dict[str, dict] = {}
-        self._lock = asyncio.Lock()
-
-    async def connect(self, session_id: str, websocket: WebSocket):
-        """Register or replace the websocket for a given session_id."""
-        await websocket.accept()
-        async with self._lock:
-            # If a connection already exists for the session, replace it (allowing
-            # clients to reconnect transparently).
-            existing = self._conns.get(session_id)
-            if existing:
-                try:
-                    existing["task"].cancel()
-                except Exception:
-                    logger.debug("Failed to cancel existing sender task")
-            queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_MAXSIZE)
-            task = asyncio.create_task(self._sender(session_id, websocket, queue))
-            self._conns[session_id] = {"websocket": websocket, "queue": queue, "task": task}
-
-    async def _sender(self, session_id: str, websocket: WebSocket, queue: asyncio.Queue):
-        try:
-            while True:
-                message = await queue.get()
-                try:
-                    await asyncio.wait_for(websocket.send_text(message), timeout=SEND_TIMEOUT)
-                except asyncio.TimeoutError:
-                    logger.warning("Send timed out for session %s", session_id)
-                except Exception as e:
-                    logger.error("Send error for session %s: %s", session_id, e)
-                    break
-                finally:
-                    queue.task_done()
-        except asyncio.CancelledError:
-            logger.debug("Sender task cancelled for session %s", session_id)
-        finally:
-            # Clean up on exit
-            async with self._lock:
-                current = self._conns.get(session_id)
-                if current and current.get("queue") is queue:
-                    self._conns.pop(session_id, None)
-
-    async def send(self, session_id: str, message: str):
-        """Enqueue a message for sending; if the queue is full, drop the message
-        and log a warning (backpressure handling).
-        """
-        async with self._lock:
-            conn = self._conns.get(session_id)
-            if not conn:
-                logger.debug("No active websocket for session %s", session_id)
-                return
-            queue: asyncio.Queue = conn["queue"]
-            try:
-                queue.put_nowait(message)
-            except asyncio.QueueFull:
-                logger.warning("Send queue full for session %s; dropping message", session_id)
-
-    async def disconnect(self, session_id: str):
-        async with self._lock:
-            conn = self._conns.pop(session_id, None)
-            if conn:
-                try:
-                    conn["task"].cancel()
-                except Exception:
-                    logger.debug("Error cancelling sender task on disconnect")
-
-
-manager = ConnectionManager()
+async def _release_analysis_state(session_id: str):
+    """Drop per-session analyzer state held by the analysis executor."""
+    try:
+        await analysis_executor.run("release_session", session_id=session_id)
+    except Exception:
+        logger.debug("Failed to release analysis state for session %s", session_id)
 
 
 @router.post("/start")
@@ -123,7 +66,9 @@ def start_call(db: Session = Depends(get_db), current_user: User = Depends(get_c
 
 
 @router.websocket("/stream")
-async def websocket_endpoint(websocket: WebSocket, session_id: str, create_if_missing: bool = False):
+async def websocket_endpoint(websocket: WebSocket, session_id: str, create_if_missing: bool = False,
+                             codec: Optional[str] = None, sample_rate: Optional[int] = None,
+                             encoding: Optional[str] = None):
     # Acquire DB session if available; be resilient in test environments where
     # the DB dependency may not be resolvable.
     db = None
@@ -140,6 +85,10 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, create_if_mi
             call = db.query(Call).filter(Call.session_id == session_id).first()
         except Exception:
             call = None
+        finally:
+            # Updates go through the write-behind risk_writer, so the lookup
+            # session is not held for the lifetime of the socket
+            _gen.close()
 
     transient = False
     if not call:
@@ -161,96 +110,182 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, create_if_mi
             await websocket.close()
             return
 
+    # Negotiate the audio codec and response encoding (query params at connect time)
+    try:
+        session_codec = SessionCodec.from_params(codec, sample_rate, ANALYZER_SAMPLE_RATE)
+    except ValueError as e:
+        await websocket.accept()
+        await websocket.send_text(json.dumps({"error": "unsupported_codec", "details": str(e)}))
+        await websocket.close()
+        return
+    try:
+        encoder = StreamEncoder(encoding)
+    except ValueError as e:
+        await websocket.accept()
+        await websocket.send_text(json.dumps({"error": "unsupported_encoding", "details": str(e)}))
+        await websocket.close()
+        return
+
     await manager.connect(session_id, websocket)
+    recorder = get_session_recorder()
+    if recorder is not None:
+        recorder.open_session(session_id, codec=codec, sample_rate=sample_rate, encoding=encoding)
 
+    # Set while the score stays above the alert threshold, so one crossing alerts once
+    high_risk = False
     try:
         while True:
             try:
-                raw = await asyncio.wait_for(websocket.receive_text(), timeout=RECEIVE_TIMEOUT)
+                message = await asyncio.wait_for(websocket.receive(), timeout=RECEIVE_TIMEOUT)
             except asyncio.TimeoutError:
                 # No data received in time — notify and continue (client may still be alive)
                 await manager.send(session_id, json.dumps({"error": "receive_timeout"}))
                 # Optionally close if desired: break
                 break
-
-            # Basic JSON validation
-            try:
-                data = json.loads(raw)
-            except json.JSONDecodeError:
-                await manager.send(session_id, json.dumps({"error": "invalid_json"}))
-                continue
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            received_at = time.perf_counter()
+            if recorder is not None:
+                recorder.record(session_id, message["bytes"] if message.get("bytes") is not None
+                                else message.get("text") or "")
 
             # Handle different data types (text or audio)
             analysis_result = None
             risk_score = 0.0
+            seq = None
 
-            if isinstance(data, dict):
-                if 'transcript' in data:
-                    try:
-                        msg = TranscriptMessage(**data)
-                    except ValidationError as e:
-                        await manager.send(session_id, json.dumps({"error": "validation_error", "details": e.errors()}))
-                        continue
+            if message.get("bytes") is not None:
+                # Binary audio frame: fixed header followed by raw PCM
+                try:
+                    with timer("ws.decode_frame"):
+                        frame = decode_frame(message["bytes"], session_codec.sample_format)
+                        audio_array = session_codec.decode_frame(frame)
+                except (FrameError, ValueError) as e:
+                    await manager.send(session_id, json.dumps({"error": "invalid_audio_frame", "details": str(e)}))
+                    continue
 
-                    # Text analysis
-                    analysis_result = fraud_service.analyze_audio_transcript(msg.transcript)
-                    risk_score = analysis_result.get('risk_score', 0.0)
+                seq = frame.seq
+                try:
+                    with timer("ws.analysis"):
+                        analysis_result = await analysis_batcher.submit(audio_array, None, session_id=session_id)
+                except AnalysisOverloadedError:
+                    await manager.send(session_id, json.dumps({"error": "analysis_overloaded", "seq": seq}))
+                    continue
+                risk_score = analysis_result.get('overall_risk_score', 0.0)
 
-                elif 'audio_data' in data:
-                    try:
-                        msg = AudioMessage(**data)
-                        audio_bytes = base64.b64decode(msg.audio_data)
-                        audio_array = np.frombuffer(audio_bytes, dtype=np.float32)
-                    except Exception:
-                        await manager.send(session_id, json.dumps({"error": "invalid_audio_data"}))
-                        continue
+            else:
+                raw = message.get("text")
 
-                    transcript = msg.transcript
-                    analysis_result = fraud_service.analyze_audio_data(audio_array, transcript)
-                    risk_score = analysis_result.get('overall_risk_score', 0.0)
+                # Basic JSON validation
+                try:
+                    with timer("ws.json_loads"):
+                        data = json.loads(raw)
+                except (TypeError, json.JSONDecodeError):
+                    await manager.send(session_id, json.dumps({"error": "invalid_json"}))
+                    continue
 
+                if isinstance(data, dict):
+                    if 'transcript' in data:
+                        try:
+                            with timer("ws.validate"):
+                                msg = TranscriptMessage(**data)
+                        except ValidationError as e:
+                            await manager.send(session_id, json.dumps({"error": "validation_error", "details": e.errors()}))
+                            continue
+
+                        # Text analysis
+                        try:
+                            with timer("ws.analysis"):
+                                analysis_result = await analysis_executor.run(
+                                    "analyze_audio_transcript", msg.transcript, session_id=session_id
+                                )
+                        except AnalysisOverloadedError:
+                            await manager.send(session_id, json.dumps({"error": "analysis_overloaded"}))
+                            continue
+                        risk_score = analysis_result.get('risk_score', 0.0)
+
+                    elif 'audio_data' in data:
+                        try:
+                            with timer("ws.validate"):
+                                msg = AudioMessage(**data)
+                            with timer("ws.base64_decode"):
+                                audio_bytes = base64.b64decode(msg.audio_data)
+                            audio_array = session_codec.decode_bytes(audio_bytes)
+                        except Exception:
+                            await manager.send(session_id, json.dumps({"error": "invalid_audio_data"}))
+                            continue
+
+                        transcript = msg.transcript
+                        try:
+                            with timer("ws.analysis"):
+                                analysis_result = await analysis_batcher.submit(
+                                    audio_array, transcript, session_id=session_id
+                                )
+                        except AnalysisOverloadedError:
+                            await manager.send(session_id, json.dumps({"error": "analysis_overloaded"}))
+                            continue
+                        risk_score = analysis_result.get('overall_risk_score', 0.0)
+
+                    else:
+                        await manager.send(session_id, json.dumps({"error": "invalid_data_format"}))
+                        continue
                 else:
-                    await manager.send(session_id, json.dumps({"error": "invalid_data_format"}))
-                    continue
-            else:
-                # Fallback to text analysis
-                analysis_result = fraud_service.analyze_audio_transcript(str(data))
-                risk_score = analysis_result.get('risk_score', 0.0)
+                    # Fallback to text analysis
+                    try:
+                        with timer("ws.analysis"):
+                            analysis_result = await analysis_executor.run(
+                                "analyze_audio_transcript", str(data), session_id=session_id
+                            )
+                    except AnalysisOverloadedError:
+                        await manager.send(session_id, json.dumps({"error": "analysis_overloaded"}))
+                        continue
+                    risk_score = analysis_result.get('risk_score', 0.0)
 
-            # Update call risk score and persist if not transient
+            # Update call risk score; persisted in batches by the write-behind writer
             call.risk_score = float(risk_score)
             if not transient:
-                db.commit()
-
-            # Send comprehensive analysis update (use manager to handle backpressure)
-            response = {
-                "risk_score": call.risk_score,
-                "analysis": analysis_result,
-                "timestamp": str(datetime.datetime.utcnow())
-            }
-            await manager.send(session_id, json.dumps(response))
-
-            # Trigger alert if high risk
-            if call.risk_score > 0.8:
+                risk_writer.update(call.id, risk_score=call.risk_score)
+
+            # Send a compact analysis update; a pending unsent update is replaced
+            with timer("ws.encode"):
+                update = StreamUpdate.from_analysis(call.risk_score, analysis_result, time.time(), seq=seq)
+                payload = encoder.encode(update)
+            await manager.send(session_id, payload, kind=KIND_UPDATE)
+
+            # Trigger alert when the score rises above the threshold. Alerts are not
+            # coalesced, so repeating one per message would fill the send queue.
+            if call.risk_score > 0.8 and not high_risk:
                 alert_data = {
                     "call_id": call.id,
                     "alert_type": "HIGH_RISK_DETECTED",
                     "message": f"High risk score detected: {call.risk_score:.2f}",
                     "risk_score": call.risk_score
                 }
-                logger.warning(f"Auto-alert triggered for call {call.id}: {alert_data}")
+                logger.warning("Auto-alert triggered for call %s: %s", call.id, alert_data)
+                session_router.publish(session_id, json.dumps({"alert": alert_data}), kind=KIND_ALERT)
+            elif call.risk_score > 0.8:
+                logger.debug("Call %s still high risk: %.2f", call.id, call.risk_score)
+            high_risk = call.risk_score > 0.8
+
+            observe("ws.message", time.perf_counter() - received_at)
 
     except WebSocketDisconnect:
         call.status = "ended"
-        if not transient:
-            db.commit()
-        await manager.disconnect(session_id)
     except Exception as e:
         logger.exception("WebSocket error: %s", e)
         call.status = "error"
+    finally:
+        # A reconnect with the same session_id replaced this socket: the new
+        # handler owns the session's call status, recording and analysis state
+        owner = await manager.disconnect(session_id, websocket)
+        if owner and recorder is not None:
+            recorder.close_session(session_id)
         if not transient:
-            db.commit()
-        await manager.disconnect(session_id)
+            if owner:
+                risk_writer.update(call.id, risk_score=call.risk_score, status=call.status)
+            await risk_writer.flush_call(call.id)
+        if owner:
+            await _release_analysis_state(session_id)
 
 
 @router.get("/risk-score")
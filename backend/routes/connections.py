@@ -0,0 +1,205 @@
+import asyncio
+from collections import Counter, deque
+from typing import Deque, Dict, Optional, Union
+
+from fastapi import WebSocket
+
+from ..app.logging import logger
+from ..app.metrics import registry, timer
+
+# Configurable timeouts and queue sizes (can be overridden via env in future)
+SEND_TIMEOUT = 2  # seconds
+SEND_QUEUE_MAXSIZE = 10  # pending errors/alerts per connection
+
+Message = Union[str, bytes]
+
+# Message classes. Risk updates are state: only the most recent one matters,
+# so a pending update is replaced instead of queued. Errors and alerts are
+# events and are delivered in order, ahead of any pending update.
+KIND_UPDATE = "update"
+KIND_ERROR = "error"
+KIND_ALERT = "alert"
+COALESCED_KINDS = frozenset({KIND_UPDATE})
+
+
+class Connection:
+    """One registered websocket with its outbound channel and sender task."""
+
+    __slots__ = ("session_id", "websocket", "latest", "critical", "ready", "task", "closed",
+                 "sent", "coalesced", "dropped")
+
+    def __init__(self, session_id: str, websocket: WebSocket):
+        self.session_id = session_id
+        self.websocket = websocket
+        self.latest: Optional[Message] = None
+        self.critical: Deque[Message] = deque()
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self.critical) + (self.latest is not None)
+
+    def put(self, message: Message, kind: str) -> bool:
+        """Queue a message by class; returns False if it was dropped."""
+        if kind in COALESCED_KINDS:
+            if self.latest is not None:
+                self.coalesced += 1
+            self.latest = message
+        elif len(self.critical) >= SEND_QUEUE_MAXSIZE:
+            self.dropped += 1
+            return False
+        else:
+            self.critical.append(message)
+        self.ready.set()
+        return True
+
+    def take(self) -> Optional[Message]:
+        """Next message to send: errors/alerts first, then the latest update."""
+        if self.critical:
+            return self.critical.popleft()
+        message, self.latest = self.latest, None
+        return message
+
+    def close(self):
+        # The flag backs up the cancel: asyncio.wait_for can swallow a
+        # cancellation that races with a completed send, which would
+        # otherwise leave the sender parked on its wakeup event forever.
+        self.closed = True
+        if self.task is not None:
+            self.task.cancel()
+
+
+class ConnectionManager:
+    """Registry of active websocket connections per session.
+
+    Each connection has an outbound channel holding at most one pending risk
+    update plus a small bounded queue of errors/alerts, so a slow client costs
+    O(1) memory and always converges to the current risk score.
+
+    The registry is only touched from the event loop thread, and no method
+    awaits between reading and updating it (connect awaits only the accept,
+    before it looks at the registry), so none of them needs a lock.
+    """
+
+    def __init__(self):
+        self._conns: Dict[str, Connection] = {}
+        self.counters: Counter = Counter()
+        # Session router notified of sessions this process holds (see session_router)
+        self.router = None
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._conns
+
+    def __len__(self) -> int:
+        return len(self._conns)
+
+    async def connect(self, session_id: str, websocket: WebSocket):
+        """Register or replace the websocket for a given session_id."""
+        await websocket.accept()
+        # If a connection already exists for the session, replace it (allowing
+        # clients to reconnect transparently).
+        existing = self._conns.get(session_id)
+        if existing is not None:
+            existing.close()
+        conn = Connection(session_id, websocket)
+        conn.task = asyncio.create_task(self._sender(conn))
+        self._conns[session_id] = conn
+        if self.router is not None:
+            self.router.subscribe(session_id)
+
+    async def _sender(self, conn: Connection):
+        websocket = conn.websocket
+        try:
+            while not conn.closed:
+                await conn.ready.wait()
+                conn.ready.clear()
+                while not conn.closed:
+                    message = conn.take()
+                    if message is None:
+                        break
+                    try:
+                        with timer("ws.send"):
+                            if isinstance(message, bytes):
+                                await asyncio.wait_for(websocket.send_bytes(message), timeout=SEND_TIMEOUT)
+                            else:
+                                await asyncio.wait_for(websocket.send_text(message), timeout=SEND_TIMEOUT)
+                        conn.sent += 1
+                        self.counters["sent"] += 1
+                    except asyncio.TimeoutError:
+                        logger.warning("Send timed out for session %s", conn.session_id)
+                    except Exception as e:
+                        logger.error("Send error for session %s: %s", conn.session_id, e)
+                        return
+        except asyncio.CancelledError:
+            logger.debug("Sender task cancelled for session %s", conn.session_id)
+        finally:
+            # Clean up on exit unless the session was already replaced
+            if self._conns.get(conn.session_id) is conn:
+                self._unregister(conn)
+
+    def _unregister(self, conn: Connection):
+        del self._conns[conn.session_id]
+        if self.router is not None:
+            self.router.unsubscribe(conn.session_id)
+
+    def send_nowait(self, session_id: str, message: Message, kind: str = KIND_ERROR) -> bool:
+        """Queue a message without blocking; returns False if it was dropped.
+
+        Args:
+            session_id: Session to send to
+            message: Encoded text or binary frame
+            kind: KIND_UPDATE (coalesced), KIND_ERROR or KIND_ALERT
+
+        Returns:
+            True if the message is pending delivery
+        """
+        conn = self._conns.get(session_id)
+        if conn is None:
+            logger.debug("No active websocket for session %s", session_id)
+            return False
+        coalesced = conn.coalesced
+        if not conn.put(message, kind):
+            self.counters["dropped"] += 1
+            logger.warning("Send queue full for session %s; dropping %s message", session_id, kind)
+            return False
+        if conn.coalesced != coalesced:
+            self.counters["coalesced"] += 1
+        return True
+
+    async def send(self, session_id: str, message: Message, kind: str = KIND_ERROR):
+        """Queue a message for sending (see send_nowait)."""
+        self.send_nowait(session_id, message, kind)
+
+    async def disconnect(self, session_id: str, websocket: Optional[WebSocket] = None) -> bool:
+        """Unregister a session. With websocket given, only that socket's
+        registration is removed, so a late disconnect of a replaced socket
+        does not drop its replacement.
+
+        Returns:
+            False if the session now belongs to another websocket, whose
+            handler owns the session's state from here on
+        """
+        conn = self._conns.get(session_id)
+        if conn is None:
+            return True
+        if websocket is not None and conn.websocket is not websocket:
+            return False
+        self._unregister(conn)
+        conn.close()
+        return True
+
+
+manager = ConnectionManager()
+
+registry.gauge("fraud_ws_sessions", "Websocket sessions connected to this process", lambda: len(manager))
+registry.gauge("fraud_ws_send_pending", "Messages waiting in per-connection send channels",
+               lambda: sum(conn.pending for conn in list(manager._conns.values())))
+registry.counter(
+    "fraud_ws_messages_total", "Outbound websocket messages by outcome",
+    lambda: {(("result", result),): manager.counters[result] for result in ("sent", "coalesced", "dropped")},
+)
@@ -0,0 +1,262 @@
+"""
+Cross-worker session routing for /call/stream.
+
+Each uvicorn worker only holds its own websockets, so a message for a session
+(e.g. an alert raised by an HTTP request) may originate in a worker that does
+not own the socket. A session router delivers such messages:
+
+- LocalSessionRouter (default): single process; publish goes straight to the
+  ConnectionManager.
+- BrokerSessionRouter: every worker connects to a SessionBroker over a Unix
+  socket and subscribes the sessions it holds. Publishing a session that is
+  not local sends one frame to the broker, which forwards it only to the
+  worker that subscribed it last, so a reconnect to another worker takes over
+  delivery.
+"""
+
+import asyncio
+import os
+import struct
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from ..app.config import settings
+from ..app.logging import logger
+from .connections import KIND_ALERT, KIND_ERROR, KIND_UPDATE, ConnectionManager, Message, manager
+
+# Frame layout (little-endian): op u8, kind u8, session_id length u16,
+# payload length u32, then the UTF-8 session_id and the payload.
+FRAME_HEADER = struct.Struct("<BBHI")
+OP_SUBSCRIBE = 1
+OP_UNSUBSCRIBE = 2
+OP_PUBLISH_TEXT = 3
+OP_PUBLISH_BYTES = 4
+KINDS = (KIND_UPDATE, KIND_ERROR, KIND_ALERT)
+
+# Stop forwarding to a worker whose socket buffer grows past this
+BROKER_MAX_BUFFER = 4 * 1024 * 1024
+
+
+def encode_frame(op: int, session_id: str, message: Message = b"", kind: str = KIND_ALERT) -> bytes:
+    sid = session_id.encode("utf-8")
+    payload = message.encode("utf-8") if isinstance(message, str) else message
+    return FRAME_HEADER.pack(op, KINDS.index(kind), len(sid), len(payload)) + sid + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, str, str, Message, bytes]:
+    """Read one frame; returns (op, session_id, kind, message, raw frame)."""
+    header = await reader.readexactly(FRAME_HEADER.size)
+    op, kind, sid_len, payload_len = FRAME_HEADER.unpack(header)
+    body = await reader.readexactly(sid_len + payload_len)
+    session_id = body[:sid_len].decode("utf-8")
+    payload = body[sid_len:]
+    message: Message = payload.decode("utf-8") if op == OP_PUBLISH_TEXT else payload
+    return op, session_id, KINDS[kind], message, header + body
+
+
+class LocalSessionRouter:
+    """In-process routing: every session lives in this worker's manager."""
+
+    def __init__(self, connections: ConnectionManager):
+        self.connections = connections
+        connections.router = self
+
+    def subscribe(self, session_id: str) -> None:
+        pass
+
+    def unsubscribe(self, session_id: str) -> None:
+        pass
+
+    def publish(self, session_id: str, message: Message, kind: str = KIND_ALERT) -> bool:
+        """Deliver a message to a session's websocket; returns False if it was not queued."""
+        return self.connections.send_nowait(session_id, message, kind)
+
+    async def close(self) -> None:
+        pass
+
+
+class BrokerSessionRouter(LocalSessionRouter):
+    """
+    Routes non-local sessions through a SessionBroker.
+
+    The broker connection is opened lazily on the running loop and retried
+    after failures; on (re)connect all local sessions are subscribed again.
+
+    Args:
+        connections: This worker's ConnectionManager
+        path: Unix socket path of the broker
+        retry_interval: Seconds between reconnect attempts
+    """
+
+    def __init__(self, connections: ConnectionManager, path: str, retry_interval: float = 1.0):
+        super().__init__(connections)
+        self.path = path
+        self.retry_interval = retry_interval
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connected = asyncio.Event()
+        self.counters: Counter = Counter()
+
+    def _ensure_connected(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._writer = None
+            self._connected = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    async def wait_connected(self, timeout: float = 5.0) -> None:
+        self._ensure_connected()
+        await asyncio.wait_for(self._connected.wait(), timeout=timeout)
+
+    async def _run(self) -> None:
+        while True:
+            writer = None
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+                for session_id in list(self.connections._conns):
+                    writer.write(encode_frame(OP_SUBSCRIBE, session_id))
+                self._writer = writer
+                self._connected.set()
+                while True:
+                    op, session_id, kind, message, _ = await read_frame(reader)
+                    if op in (OP_PUBLISH_TEXT, OP_PUBLISH_BYTES):
+                        self.counters["received"] += 1
+                        self.connections.send_nowait(session_id, message, kind)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                logger.warning("Session broker connection to %s lost: %s", self.path, e)
+            finally:
+                self._writer = None
+                self._connected.clear()
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(self.retry_interval)
+
+    def _write(self, frame: bytes) -> bool:
+        self._ensure_connected()
+        if self._writer is None:
+            return False
+        self._writer.write(frame)
+        return True
+
+    def subscribe(self, session_id: str) -> None:
+        self._write(encode_frame(OP_SUBSCRIBE, session_id))
+
+    def unsubscribe(self, session_id: str) -> None:
+        self._write(encode_frame(OP_UNSUBSCRIBE, session_id))
+
+    def publish(self, session_id: str, message: Message, kind: str = KIND_ALERT) -> bool:
+        if session_id in self.connections:
+            return self.connections.send_nowait(session_id, message, kind)
+        op = OP_PUBLISH_BYTES if isinstance(message, bytes) else OP_PUBLISH_TEXT
+        if not self._write(encode_frame(op, session_id, message, kind)):
+            self.counters["unrouted"] += 1
+            return False
+        self.counters["forwarded"] += 1
+        return True
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class SessionBroker:
+    """
+    Unix-socket broker that forwards published frames to the worker owning
+    the session. Ownership goes to the latest subscriber, and an unsubscribe
+    only counts from the current owner, so a late disconnect on the old
+    worker does not steal a reconnected session.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._owners: Dict[str, asyncio.StreamWriter] = {}
+        # Connected workers and the tasks serving them
+        self._clients: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.counters: Counter = Counter()
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients[writer] = asyncio.current_task()
+        try:
+            while True:
+                op, session_id, _, _, raw = await read_frame(reader)
+                if op == OP_SUBSCRIBE:
+                    self._owners[session_id] = writer
+                elif op == OP_UNSUBSCRIBE:
+                    if self._owners.get(session_id) is writer:
+                        del self._owners[session_id]
+                else:
+                    self._forward(session_id, raw)
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for session_id in [s for s, w in self._owners.items() if w is writer]:
+                del self._owners[session_id]
+            self._clients.pop(writer, None)
+            writer.close()
+
+    def _forward(self, session_id: str, raw: bytes) -> None:
+        owner = self._owners.get(session_id)
+        if owner is None:
+            self.counters["unrouted"] += 1
+        elif owner.transport.get_write_buffer_size() > BROKER_MAX_BUFFER:
+            self.counters["dropped"] += 1
+        else:
+            owner.write(raw)
+            self.counters["forwarded"] += 1
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Close worker connections so each handler ends on end-of-stream
+            # instead of being cancelled while it waits for a frame
+            handlers = list(self._clients.values())
+            for writer in list(self._clients):
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def start_in_thread(self) -> threading.Thread:
+        """Serve from a daemon thread (used by run.py in the parent process)."""
+        started = threading.Event()
+
+        def serve():
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(self.start())
+            started.set()
+            loop.run_forever()
+
+        thread = threading.Thread(target=serve, name="session-broker", daemon=True)
+        thread.start()
+        started.wait()
+        return thread
+
+
+def create_session_router(connections: ConnectionManager) -> LocalSessionRouter:
+    mode = getattr(settings, "session_router", "local")
+    if mode == "broker":
+        return BrokerSessionRouter(connections, getattr(settings, "session_broker_path", "/tmp/fraud_detection_sessions.sock"))
+    if mode != "local":
+        logger.warning("Unknown session_router %r; using in-process routing", mode)
+    return LocalSessionRouter(connections)
+
+
+session_router = create_session_router(manager)
@@ -1,3 +1,4 @@
+import argparse
 import sys
 import os
 
@@ -7,6 +8,24 @@ sys.path.insert(0, os.path.dirname(__file__))
 import uvicorn
 
 if __name__ == "__main__":
-    # Import app after setting path
-    from app.main import app
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    parser = argparse.ArgumentParser(description="Run the Fraud Detection API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="uvicorn worker processes; more than one routes sessions through a broker")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # Workers are spawned processes, so the router mode travels via the
+        # environment; the broker lives in this parent process.
+        os.environ["SESSION_ROUTER"] = "broker"
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from backend.app.config import settings
+        from backend.routes.session_router import SessionBroker
+
+        SessionBroker(settings.session_broker_path).start_in_thread()
+        uvicorn.run("backend.app.main:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        # Import app after setting path
+        from app.main import app
+        uvicorn.run(app, host=args.host, port=args.port, reload=True)
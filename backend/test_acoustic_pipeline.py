@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip("librosa")
+
+from backend.ai_ml.acoustic_analysis import AcousticAnalyzer
+
+
+def _tone(sample_rate=16000, seconds=1.0, freq=220.0):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    rng = np.random.default_rng(1)
+    return (0.5 * np.sin(2 * np.pi * freq * t) + 0.01 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def test_analyze_audio_chunk_returns_all_features():
+    analyzer = AcousticAnalyzer()
+    result = analyzer.analyze_audio_chunk(_tone())
+    assert "error" not in result
+    for key in ("mfcc", "rms_energy", "pitch_mean", "duration", "artifact_score",
+                "centroid_variation", "rolloff_consistency", "flatness_uniformity"):
+        assert key in result
+    assert result["mfcc"].shape[1] == analyzer.mfcc_features
+    assert result["duration"] == pytest.approx(1.0)
+    assert 0.0 <= result["artifact_score"] <= 1.0
+
+
+def test_spectrogram_mfcc_matches_time_domain_mfcc():
+    analyzer = AcousticAnalyzer()
+    audio = _tone()
+    magnitude = np.abs(librosa.stft(audio, n_fft=analyzer.n_fft, hop_length=analyzer.hop_length))
+    expected = analyzer.extract_mfcc(audio)
+    np.testing.assert_allclose(analyzer.mfcc_from_spectrogram(magnitude), expected, rtol=1e-3, atol=1e-2)
+
+
+def test_mel_basis_is_built_once():
+    analyzer = AcousticAnalyzer()
+    assert analyzer.mel_basis is analyzer.mel_basis
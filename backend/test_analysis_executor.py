@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.utils.analysis_executor import AnalysisExecutor, AnalysisOverloadedError
+
+
+class _SlowService:
+    def __init__(self):
+        self.release = threading.Event()
+        self.thread_names = []
+
+    def analyze_data(self, data: str) -> float:
+        self.thread_names.append(threading.current_thread().name)
+        self.release.wait(timeout=5)
+        return 0.5
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread"])
+def test_run_returns_service_result(mode):
+    executor = AnalysisExecutor(mode=mode, max_workers=2)
+    try:
+        score = asyncio.run(executor.run("analyze_data", "urgent wire transfer"))
+        assert 0.0 < score <= 1.0
+    finally:
+        executor.shutdown()
+
+
+def test_thread_mode_runs_off_the_event_loop():
+    service = _SlowService()
+    service.release.set()
+    executor = AnalysisExecutor(mode="thread", max_workers=1, service=service)
+    try:
+        assert asyncio.run(executor.run("analyze_data", "hi")) == 0.5
+        assert service.thread_names[0].startswith("analysis")
+    finally:
+        executor.shutdown()
+
+
+def test_queue_depth_limit_rejects_excess_work():
+    service = _SlowService()
+    executor = AnalysisExecutor(mode="thread", max_workers=1, max_in_flight=1,
+                                max_queue_depth=1, service=service)
+
+    async def scenario():
+        first = asyncio.create_task(executor.run("analyze_data", "a"))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(executor.run("analyze_data", "b"))
+        await asyncio.sleep(0.05)
+        assert executor.in_flight == 1
+        assert executor.queue_depth == 1
+        with pytest.raises(AnalysisOverloadedError):
+            await executor.run("analyze_data", "c")
+        service.release.set()
+        return await asyncio.gather(first, second)
+
+    try:
+        assert asyncio.run(scenario()) == [0.5, 0.5]
+    finally:
+        executor.shutdown()
+
+
+def test_process_mode_uses_warm_worker():
+    executor = AnalysisExecutor(mode="process", max_workers=2)
+    try:
+        score = asyncio.run(executor.run("analyze_data", "urgent"))
+        assert score == pytest.approx(executor.service.analyze_data("urgent"))
+        # A session always lands on the same worker process
+        assert executor._get_process_pool("s1") is executor._get_process_pool("s1")
+    finally:
+        executor.shutdown()
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        AnalysisExecutor(mode="gpu")
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from backend.utils.analysis_scheduler import AcousticScheduler
+
+
+def test_benign_session_is_sampled_sparsely():
+    scheduler = AcousticScheduler(base_interval=10)
+    runs = [scheduler.should_run(0.0) for _ in range(100)]
+    assert runs[0]
+    assert sum(runs) == 10
+
+
+def test_cadence_rises_with_risk_and_keyword_hits():
+    scheduler = AcousticScheduler(base_interval=10, escalate_risk=0.4, hold_chunks=3)
+    assert scheduler.interval(0.0) == 10
+    assert scheduler.interval(0.2) == 5
+    assert scheduler.interval(0.5) == 1
+
+    scheduler.should_run(0.0)
+    assert not scheduler.should_run(0.0)
+    # A keyword forces the current chunk and the next ones through
+    assert [scheduler.should_run(0.0, keyword_hit=i == 0) for i in range(4)] == [True, True, True, False]
+
+    # Overall risk from the previous chunk keeps a risky call fully analyzed
+    scheduler.observe(0.6)
+    assert all(scheduler.should_run(0.0) for _ in range(5))
+
+
+def test_service_skips_acoustic_tier_on_benign_chunks():
+    pytest.importorskip("librosa")
+    from backend.utils.fraud_detection import FraudDetectionService
+
+    service = FraudDetectionService()
+    t = np.arange(1600) / 16000
+    rng = np.random.default_rng(0)
+    chunk = (0.2 * np.sin(2 * np.pi * 200 * t) + 0.05 * rng.standard_normal(t.size)).astype(np.float32)
+    results = [service.analyze_audio_data(chunk, "hello how are you", session_id="calm") for _ in range(30)]
+    state = service.sessions.peek("calm")
+    assert state.scheduler.runs <= 4
+    assert sum(1 for r in results if r["acoustic_result"].get("skipped")) == 30 - state.scheduler.runs
+    # Skipped chunks keep the stream aligned
+    assert state.acoustic.samples_written == 30 * len(chunk)
+
+    result = service.analyze_audio_data(chunk, "urgent wire transfer now", session_id="calm")
+    assert not result["acoustic_result"].get("skipped")
@@ -0,0 +1,122 @@
+import json
+import uuid
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.utils.audio_codecs import (
+    ALAW_TABLE,
+    MULAW_TABLE,
+    SessionCodec,
+    decode_samples,
+    get_resampler,
+)
+from backend.utils.stream_protocol import (
+    SAMPLE_INT16,
+    SAMPLE_MULAW,
+    decode_frame,
+    encode_audio_frame,
+)
+
+try:
+    import audioop  # deprecated, but a handy G.711 reference where present
+except Exception:
+    audioop = None
+
+
+@pytest.mark.skipif(audioop is None, reason="audioop reference not available")
+def test_g711_tables_match_reference():
+    codes = bytes(range(256))
+    mulaw = np.frombuffer(audioop.ulaw2lin(codes, 2), dtype="<i2") / 32768.0
+    alaw = np.frombuffer(audioop.alaw2lin(codes, 2), dtype="<i2") / 32768.0
+    np.testing.assert_allclose(MULAW_TABLE, mulaw)
+    np.testing.assert_allclose(ALAW_TABLE, alaw)
+
+
+def test_int16_decodes_to_unit_range():
+    samples = np.array([-32768, 0, 16384, 32767], dtype="<i2")
+    np.testing.assert_allclose(decode_samples(samples, SAMPLE_INT16), [-1.0, 0.0, 0.5, 32767 / 32768])
+
+
+def test_resampler_is_cached_and_preserves_tone():
+    resampler = get_resampler(8000, 16000)
+    assert resampler is get_resampler(8000, 16000)
+    t = np.arange(8000) / 8000
+    tone = np.sin(2 * np.pi * 440 * t).astype(np.float32)
+    out = resampler(tone)
+    assert out.dtype == np.float32
+    assert len(out) == 16000
+    spectrum = np.abs(np.fft.rfft(out))
+    assert np.argmax(spectrum) == 440  # 1 Hz bins for a 1 s signal
+
+
+@pytest.mark.parametrize("src_rate", [8000, 22050, 44100, 48000])
+def test_chunked_resampling_matches_whole_signal(src_rate):
+    rng = np.random.default_rng(0)
+    t = np.arange(src_rate) / src_rate
+    signal = (np.sin(2 * np.pi * 300 * t) + 0.1 * rng.standard_normal(t.size)).astype(np.float32)
+    resampler = get_resampler(src_rate, 16000)
+    whole = resampler(signal)
+
+    # 20 ms chunks plus an odd remainder, so chunks straddle output phases
+    stream, step = resampler.stream(), src_rate // 50 + 3
+    chunked = np.concatenate([stream(signal[i:i + step]) for i in range(0, len(signal), step)])
+    assert len(whole) == 16000
+    np.testing.assert_array_equal(chunked, whole)
+
+
+def test_session_codec_carries_resampler_state_between_frames():
+    t = np.arange(8000) / 8000
+    samples = (8000 * np.sin(2 * np.pi * 440 * t)).astype("<i2")
+    whole = SessionCodec.from_params("int16", 8000, 16000).decode_bytes(samples.tobytes())
+
+    codec = SessionCodec.from_params("int16", 8000, 16000)
+    chunks = [codec.decode_frame(decode_frame(encode_audio_frame(samples[i:i + 160], sample_format=SAMPLE_INT16)))
+              for i in range(0, len(samples), 160)]
+    np.testing.assert_array_equal(np.concatenate(chunks), whole)
+
+
+def test_unsupported_sample_rates_are_rejected():
+    for rate in (0, -8000, 160009, 7999):
+        with pytest.raises(ValueError):
+            SessionCodec.from_params("int16", rate, 16000)
+    codec = SessionCodec.from_params("int16", 8000, 16000)
+    frame = decode_frame(encode_audio_frame(np.zeros(160, dtype="<i2"), sample_rate=160009,
+                                            sample_format=SAMPLE_INT16))
+    with pytest.raises(ValueError):
+        codec.decode_frame(frame)
+
+    client = TestClient(app)
+    uri = f"/call/stream?session_id={uuid.uuid4()}&create_if_missing=true"
+    with client.websocket_connect(f"{uri}&codec=int16&sample_rate=160009") as ws:
+        assert json.loads(ws.receive_text())["error"] == "unsupported_codec"
+    with client.websocket_connect(uri) as ws:
+        ws.send_bytes(encode_audio_frame(np.zeros(160, dtype=np.float32), sample_rate=160009))
+        assert json.loads(ws.receive_text())["error"] == "invalid_audio_frame"
+
+
+def test_session_codec_header_overrides_negotiated_values():
+    codec = SessionCodec.from_params("mulaw", 8000, target_rate=16000)
+    payload = np.full(800, 0xFF, dtype=np.uint8)  # mu-law silence
+    assert len(codec.decode_bytes(payload.tobytes())) == 1600
+
+    frame = decode_frame(encode_audio_frame(np.zeros(160, dtype="<i2"), sample_rate=16000,
+                                            sample_format=SAMPLE_INT16))
+    assert len(codec.decode_frame(frame)) == 160
+
+    frame = decode_frame(encode_audio_frame(np.full(80, 0xD5, dtype=np.uint8), sample_format=0),
+                         codec.sample_format)
+    assert frame.sample_format == SAMPLE_MULAW
+    assert len(codec.decode_frame(frame)) == 160
+
+
+def test_unknown_codec_is_rejected_at_connect():
+    with pytest.raises(ValueError):
+        SessionCodec.from_params("opus", None, 16000)
+
+    session_id = str(uuid.uuid4())
+    client = TestClient(app)
+    with client.websocket_connect(f"/call/stream?session_id={session_id}&create_if_missing=true&codec=opus") as ws:
+        assert json.loads(ws.receive_text())["error"] == "unsupported_codec"
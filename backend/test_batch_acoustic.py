@@ -0,0 +1,49 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip("librosa")
+
+from backend.utils.analysis_batcher import AnalysisBatcher
+from backend.utils.analysis_executor import AnalysisExecutor
+from backend.utils.fraud_detection import FraudDetectionService
+
+
+def _chunks(n, size=4000):
+    rng = np.random.default_rng(5)
+    t = np.arange(size) / 16000
+    return [(0.3 * np.sin(2 * np.pi * (150 + 20 * i) * t) + 0.05 * rng.standard_normal(size)).astype(np.float32)
+            for i in range(n)]
+
+
+def test_batched_results_match_per_chunk_analysis():
+    chunks = _chunks(6)
+    # Two chunks per session, interleaved, so stream state carries across the batch
+    items = [{"audio": chunk, "transcript": None, "session_id": f"s{i % 3}"} for i, chunk in enumerate(chunks)]
+
+    single = FraudDetectionService()
+    expected = [single.analyze_audio_data(item["audio"], session_id=item["session_id"]) for item in items]
+    got = FraudDetectionService().analyze_audio_batch(items)
+
+    for exp, res in zip(expected, got):
+        np.testing.assert_allclose(res["acoustic_result"]["mfcc"], exp["acoustic_result"]["mfcc"], atol=1e-3)
+        assert res["acoustic_result"]["new_frames"] == exp["acoustic_result"]["new_frames"]
+        assert res["overall_risk_score"] == pytest.approx(exp["overall_risk_score"], abs=1e-4)
+
+
+def test_batcher_groups_concurrent_requests():
+    executor = AnalysisExecutor(mode="inline")
+    batcher = AnalysisBatcher(executor, max_delay=0.05, max_batch_size=4)
+    chunks = _chunks(6)
+
+    async def scenario():
+        # Four arrive together (size-triggered), the last two wait for the delay
+        return await asyncio.gather(*(
+            batcher.submit(chunk, session_id=f"call-{i}") for i, chunk in enumerate(chunks)
+        ))
+
+    results = asyncio.run(scenario())
+    assert len(results) == 6
+    assert all("acoustic_result" in r for r in results)
+    assert (batcher.batches, batcher.items) == (2, 6)
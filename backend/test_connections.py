@@ -0,0 +1,88 @@
+import asyncio
+
+from backend.routes import connections
+from backend.routes.connections import KIND_UPDATE, ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        self.sent.append(message)
+
+    async def send_bytes(self, message):
+        self.sent.append(message)
+
+
+def test_send_reaches_current_socket_and_replace_keeps_new_one():
+    async def scenario():
+        manager = ConnectionManager()
+        old, new = FakeWebSocket(), FakeWebSocket()
+        await manager.connect("s1", old)
+        await manager.send("s1", "first")
+        await asyncio.sleep(0.01)
+
+        await manager.connect("s1", new)
+        old_conn_replaced = manager._conns["s1"].websocket is new
+        # Late disconnect from the replaced socket must not drop the new one
+        assert await manager.disconnect("s1", old) is False
+        await manager.send("s1", b"second")
+        await asyncio.sleep(0.01)
+        still_registered = len(manager)
+
+        conn = manager._conns["s1"]
+        assert await manager.disconnect("s1", new) is True
+        await asyncio.sleep(0)
+        return old.sent, new.sent, old_conn_replaced, still_registered, conn, len(manager)
+
+    old_sent, new_sent, replaced, registered, conn, remaining = asyncio.run(scenario())
+    assert old_sent == ["first"]
+    assert new_sent == [b"second"]
+    assert replaced and registered == 1
+    assert conn.closed and conn.task.done()
+    assert remaining == 0
+
+
+def test_send_nowait_reports_drops():
+    async def scenario():
+        manager = ConnectionManager()
+        assert not manager.send_nowait("missing", "x")
+        await manager.connect("s1", FakeWebSocket())
+        conn = manager._conns["s1"]
+        while len(conn.critical) < connections.SEND_QUEUE_MAXSIZE:
+            conn.critical.append("fill")
+        dropped = not manager.send_nowait("s1", "overflow")
+        await manager.disconnect("s1")
+        return dropped
+
+    assert asyncio.run(scenario())
+
+
+def test_updates_coalesce_and_errors_are_bounded(monkeypatch):
+    monkeypatch.setattr(connections, "SEND_QUEUE_MAXSIZE", 3)
+
+    async def scenario():
+        manager = ConnectionManager()
+        ws = FakeWebSocket()
+        await manager.connect("s1", ws)
+        conn = manager._conns["s1"]
+        for i in range(50):
+            manager.send_nowait("s1", f"update-{i}", kind=KIND_UPDATE)
+        for i in range(5):
+            manager.send_nowait("s1", f"error-{i}")
+        pending = conn.pending
+        await asyncio.sleep(0.01)
+        await manager.disconnect("s1")
+        return ws.sent, pending, conn, manager.counters
+
+    sent, pending, conn, counters = asyncio.run(scenario())
+    # Memory stays O(1): one pending update plus the bounded error queue
+    assert pending == 4
+    assert sent == ["error-0", "error-1", "error-2", "update-49"]
+    assert conn.coalesced == counters["coalesced"] == 49
+    assert conn.dropped == counters["dropped"] == 2
+    assert counters["sent"] == 4
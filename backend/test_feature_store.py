@@ -0,0 +1,153 @@
+import threading
+
+import numpy as np
+import pytest
+
+from backend.utils import feature_store
+from backend.utils.analysis_executor import AnalysisExecutor
+from backend.utils.feature_store import FeatureStore
+from backend.utils.fraud_detection import FraudDetectionService
+
+
+def _result(seed, frames=5):
+    rng = np.random.default_rng(seed)
+    return {
+        "duration": 0.5,
+        "rms_energy": 0.1 * seed,
+        "pitch_mean": 180.0 + seed,
+        "artifact_score": 0.25,
+        "mfcc": rng.standard_normal((frames, 13)).astype(np.float32),
+    }
+
+
+def test_append_flush_and_read_call(tmp_path):
+    store = FeatureStore(tmp_path, flush_rows=3)
+    results = [_result(seed) for seed in range(4)]
+    for i, result in enumerate(results):
+        store.append("call-1", result, risk_score=0.5, timestamp=1000.0 + i)
+
+    # Three rows reached flush_rows; the fourth is still buffered
+    assert store.num_rows("call-1") == 3
+    store.close_call("call-1")
+    assert store.num_rows("call-1") == 4
+
+    call = store.read_call("call-1")
+    assert isinstance(call["rms_energy"], np.memmap)
+    assert call["timestamp"].tolist() == [int((1000.0 + i) * 1e9) for i in range(4)]
+    assert call["rms_energy"] == pytest.approx([0.0, 0.1, 0.2, 0.3])
+    assert np.isnan(call["pitch_variance"]).all()
+    assert call["mfcc"].shape == (4, 13)
+    np.testing.assert_allclose(call["mfcc"][2], results[2]["mfcc"].mean(axis=0), rtol=1e-6)
+
+    assert set(store.read_call("call-1", ["risk_score"])) == {"risk_score"}
+    with pytest.raises(KeyError):
+        store.read_call("unknown")
+    with pytest.raises(ValueError):
+        store.read_call("call-1", ["nope"])
+
+
+def test_read_range_across_calls_and_reopen(tmp_path):
+    store = FeatureStore(tmp_path)
+    for i in range(10):
+        store.append("a", _result(i), timestamp=100.0 + i)
+        store.append("b", _result(i), timestamp=105.0 + i)
+    store.append("c", _result(0), timestamp=500.0)
+    store.flush()
+
+    window = store.read_range(103.0, 108.0, columns=["rms_energy"])
+    assert set(window) == {"a", "b"}
+    assert len(window["a"]["rms_energy"]) == 5
+    assert len(window["b"]["rms_energy"]) == 3
+    assert window["b"]["rms_energy"] == pytest.approx([0.0, 0.1, 0.2])
+    assert set(store.read_range(0, 1e9, session_ids=["c", "missing"])) == {"c"}
+
+    reopened = FeatureStore(tmp_path)
+    assert sorted(reopened.sessions()) == ["a", "b", "c"]
+    assert reopened.num_rows("a") == 10
+    with pytest.raises(ValueError):
+        FeatureStore(tmp_path, n_mfcc=20)
+
+
+def test_flush_of_one_call_does_not_block_others(tmp_path):
+    store = FeatureStore(tmp_path, flush_rows=1)
+    write_rows = store._write_rows
+    writing, release = threading.Event(), threading.Event()
+
+    def slow_write(session_id, rows):
+        if session_id == "slow":
+            writing.set()
+            release.wait(5)
+        write_rows(session_id, rows)
+
+    store._write_rows = slow_write
+    slow = threading.Thread(target=store.append, args=("slow", _result(0)))
+    slow.start()
+    assert writing.wait(5)
+    # The slow call is mid-flush; other calls append and flush meanwhile
+    store.append("fast", _result(1))
+    assert store.num_rows("fast") == 1
+    release.set()
+    slow.join(5)
+    assert store.num_rows("slow") == 1
+
+
+def test_flush_cut_short_does_not_misalign_later_rows(tmp_path, monkeypatch):
+    store = FeatureStore(tmp_path, flush_rows=1)
+    store.append("call-1", _result(0), timestamp=1.0)
+
+    # The disk fills up after a few columns of the second row
+    real_open, opened = open, []
+
+    def failing_open(path, mode="r", *args, **kwargs):
+        if str(path).endswith(".bin") and "a" in mode:
+            opened.append(path)
+            if len(opened) == 4:
+                raise OSError(28, "No space left on device")
+        return real_open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", failing_open)
+    store.append("call-1", _result(1), timestamp=2.0)
+    monkeypatch.setattr("builtins.open", real_open)
+    sizes = {path.stat().st_size for path in (tmp_path / "calls").glob("*/rms_energy.bin")}
+    assert store.num_rows("call-1") == 1 and sizes == {8}
+
+    store.append("call-1", _result(3), timestamp=3.0)
+    call = store.read_call("call-1")
+    assert call["timestamp"].tolist() == [int(1e9), int(3e9)]
+    assert call["rms_energy"] == pytest.approx([0.0, 0.3])
+    assert call["pitch_mean"] == pytest.approx([180.0, 183.0])
+    assert {path.stat().st_size for path in (tmp_path / "calls").glob("*/timestamp.bin")} == {16}
+
+
+def test_service_stores_analyzed_chunks(tmp_path, monkeypatch):
+    service = FraudDetectionService()
+    store = FeatureStore(tmp_path)
+    monkeypatch.setattr(service, "feature_store", store)
+
+    t = np.arange(8000) / 16000
+    tone = (0.3 * np.sin(2 * np.pi * 180 * t)).astype(np.float32)
+    results = [service.analyze_audio_data(tone, "urgent, verify your account", session_id="s1")
+               for _ in range(3)]
+    analyzed = [r for r in results if not r["acoustic_result"].get("skipped")]
+    service.release_session("s1")
+
+    call = store.read_call("s1")
+    assert len(call["risk_score"]) == len(analyzed) > 0
+    assert call["risk_score"] == pytest.approx([r["overall_risk_score"] for r in analyzed], abs=1e-6)
+    assert not np.isnan(call["mfcc"]).any()
+
+
+def _buffer_rows_in_worker(root):
+    # Stands in for settings.feature_store_enabled in the worker process
+    feature_store._default_store = FeatureStore(root, flush_rows=64)
+    for i in range(3):
+        feature_store._default_store.append("open-call", _result(i), timestamp=100.0 + i)
+
+
+def test_worker_exit_flushes_rows_of_open_calls(tmp_path):
+    executor = AnalysisExecutor(mode="process", max_workers=1)
+    pool = executor._get_process_pool("open-call")
+    pool.submit(_buffer_rows_in_worker, str(tmp_path)).result(timeout=60)
+    assert "open-call" not in FeatureStore(tmp_path)
+    executor.shutdown()
+    assert FeatureStore(tmp_path).num_rows("open-call") == 3
@@ -0,0 +1,49 @@
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Loaded with the first analysis (or the startup warm-up), never at import
+DEFERRED_MODULES = ("librosa", "scipy", "numba", "backend.ai_ml.acoustic_analysis",
+                    "backend.ai_ml.streaming_acoustic", "backend.ai_ml.batch_acoustic")
+
+# Summed self time of backend.* modules while importing the app; third-party
+# imports (FastAPI, SQLAlchemy, numpy) are not counted
+OWN_IMPORT_BUDGET_US = 500_000
+
+
+def _importtime(module):
+    """Run `python -X importtime -c "import module"`; returns {name: (self_us, cumulative_us)}."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def test_app_import_defers_acoustic_stack_and_fits_budget():
+    timings = _importtime("backend.app.main")
+    assert "backend.app.main" in timings
+    assert [name for name in DEFERRED_MODULES if name in timings] == []
+    own = sum(self_us for name, (self_us, _) in timings.items() if name.split(".")[0] == "backend")
+    assert own < OWN_IMPORT_BUDGET_US
+
+
+def test_package_import_does_not_build_the_app():
+    timings = _importtime("backend.utils.keyword_matcher")
+    assert "backend.app.main" not in timings
+    assert "fastapi" not in timings
+
+
+def test_each_router_is_mounted_once():
+    from backend.app.main import app
+
+    routes = [(route.path, tuple(sorted(getattr(route, "methods", None) or ()))) for route in app.routes]
+    assert len(routes) == len(set(routes))
+    assert {"/call/stream", "/auth/login", "/ready"} <= {path for path, _ in routes}
@@ -0,0 +1,56 @@
+import random
+
+from backend.utils.fraud_detection import FraudDetectionService
+from backend.utils.keyword_matcher import KeywordAutomaton
+
+
+def _naive_occurrences(text, phrase):
+    text = text.lower()
+    return [i for i in range(len(text)) if text.startswith(phrase, i)]
+
+
+def test_overlapping_patterns_are_all_reported():
+    automaton = KeywordAutomaton({"demo": ["he", "she", "his", "hers"]})
+    hits = automaton.scan("ushers")
+    assert sorted((m.keyword, m.start, m.end) for m in hits.matches) == [
+        ("he", 2, 4), ("hers", 2, 6), ("she", 1, 4),
+    ]
+
+
+def test_matches_agree_with_naive_scan():
+    rng = random.Random(4)
+    phrases = ["ab", "abc", "bca", "caab", "b", "aaa"]
+    automaton = KeywordAutomaton({"demo": phrases})
+    for _ in range(200):
+        text = "".join(rng.choice("abcA ") for _ in range(rng.randint(0, 40)))
+        hits = automaton.scan(text)
+        for phrase in phrases:
+            assert [s for s, _ in hits.offsets(phrase)] == _naive_occurrences(text, phrase)
+
+
+def test_service_scores_match_substring_semantics():
+    service = FraudDetectionService()
+
+    def legacy(data):
+        data_lower = data.lower()
+        score = min(sum(1 for k in service.fraud_keywords if k in data_lower) * 0.1, 0.5)
+        score += min(sum(1 for k in service.high_risk_keywords if k in data_lower) * 0.2, 0.3)
+        score += min(data_lower.count("urgent") * 0.05, 0.2)
+        return min(score, 1.0)
+
+    samples = [
+        "",
+        "Hello, how are you?",
+        "URGENT: wire transfer to my Bank Account urgently, it's confidential",
+        "Your loan investment scam needs immediate action and your password, secret!",
+        "urgent urgent urgent urgent urgent",
+    ]
+    for text in samples:
+        assert service.analyze_data(text) == legacy(text)
+
+
+def test_transcript_reports_keywords_and_categories():
+    service = FraudDetectionService(lexicon={"tech_support": ["remote access", "gift card"]})
+    result = service.analyze_audio_transcript("Buy a gift card now, it's urgent, we need remote access")
+    assert result["detected_keywords"] == ["urgent"]
+    assert result["keyword_categories"] == {"fraud": 1, "tech_support": 2}
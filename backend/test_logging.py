@@ -0,0 +1,93 @@
+import json
+import logging
+import queue
+import threading
+from logging.handlers import QueueListener
+
+from backend.app.logging import DroppingQueueHandler, JsonFormatter, RateLimitFilter, TextFormatter
+
+
+def _record(msg="Send queue full for session %s", args=("s1",), level=logging.WARNING, **extra):
+    record = logging.LogRecord("backend.routes.connections", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rate_limit_is_per_message_and_reports_suppressed():
+    clock = _Clock()
+    limiter = RateLimitFilter(burst=3, interval=10.0, clock=clock)
+    passed = [limiter.filter(_record(args=(f"s{i}",))) for i in range(10)]
+    # The template, not the formatted text, is the key
+    assert passed == [True] * 3 + [False] * 7
+    assert limiter.filter(_record("Another warning", ()))
+    # Errors are never limited
+    assert limiter.filter(_record(level=logging.ERROR))
+
+    clock.now = 4.0  # refills a bit over one token
+    record = _record()
+    assert limiter.filter(record)
+    assert record.suppressed == 7
+    assert "(7 similar messages suppressed)" in TextFormatter("%(message)s").format(record)
+    assert not limiter.filter(_record())
+
+
+def test_rate_limit_tracks_bounded_templates_at_limited_levels_only():
+    limiter = RateLimitFilter(burst=1, interval=10.0, max_keys=4, clock=_Clock())
+    # Info and debug records pass untouched and take no bucket
+    assert all(limiter.filter(_record(level=logging.INFO)) for _ in range(5))
+    assert not limiter._buckets
+
+    assert limiter.filter(_record())
+    for i in range(100):
+        limiter.filter(_record(f"Auto-alert triggered for call {i}", ()))
+    assert len(limiter._buckets) == 4
+    # The oldest template was evicted and starts with a full bucket again
+    assert limiter.filter(_record())
+
+    from_info = RateLimitFilter(burst=1, interval=10.0, min_level=logging.INFO, clock=_Clock())
+    assert from_info.filter(_record(level=logging.INFO))
+    assert not from_info.filter(_record(level=logging.INFO))
+
+
+def test_json_formatter_includes_extra_fields():
+    record = _record(session_id="abc", suppressed=2)
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Send queue full for session s1"
+    assert entry["level"] == "WARNING"
+    assert entry["logger"] == "backend.routes.connections"
+    assert entry["session_id"] == "abc"
+    assert entry["suppressed"] == 2
+
+
+def test_queue_handler_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(2))
+    for _ in range(5):
+        handler.handle(_record())
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_listener_thread_does_the_io():
+    emitted = []
+
+    class _Capture(logging.Handler):
+        def emit(self, record):
+            emitted.append((threading.current_thread(), record.getMessage()))
+
+    handler = DroppingQueueHandler(queue.Queue(10))
+    listener = QueueListener(handler.queue, _Capture())
+    listener.start()
+    try:
+        handler.handle(_record())
+    finally:
+        listener.stop()
+    assert emitted and emitted[0][0] is not threading.current_thread()
+    assert emitted[0][1] == "Send queue full for session s1"
@@ -0,0 +1,64 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from backend.app.metrics import Histogram, Registry, STAGE_SECONDS, observe, timer
+
+
+def test_histogram_merges_thread_shards():
+    histogram = Histogram(buckets=(0.001, 0.01))
+    threads = [threading.Thread(target=lambda: [histogram.observe(0.005) for _ in range(1000)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    histogram.observe(1.0)
+
+    counts, total = histogram.snapshot()
+    assert counts == [0, 4000, 1]
+    assert abs(total - 21.0) < 1e-6
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    family = registry.histogram("demo_seconds", "Demo stage", "stage", buckets=(0.1, 1.0))
+    family.labels("decode").observe(0.05)
+    family.labels("decode").observe(0.5)
+    registry.gauge("demo_sessions", "Sessions", lambda: 3)
+    registry.counter("demo_total", "Messages", lambda: {(("result", "sent"),): 7, (("result", "dropped"),): 1})
+    registry.gauge("demo_unset", "Not reported yet", lambda: None)
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{stage="decode",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="decode",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="decode",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{stage="decode"} 2' in text
+    assert "demo_sessions 3" in text
+    assert 'demo_total{result="dropped"} 1' in text
+    assert 'demo_total{result="sent"} 7' in text
+    assert "demo_unset" not in text
+
+
+def test_timer_and_observe_record_stages():
+    before = STAGE_SECONDS.labels("test.stage").count
+    with timer("test.stage"):
+        pass
+    observe("test.stage", 0.002)
+    assert STAGE_SECONDS.labels("test.stage").count == before + 2
+
+
+def test_metrics_endpoint_reports_stages_and_counters():
+    from backend.app.main import app
+
+    with timer("test.endpoint"):
+        pass
+    with TestClient(app) as client:
+        response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'fraud_stage_seconds_count{stage="test.endpoint"} 1' in response.text
+    assert "fraud_ws_sessions 0" in response.text
+    assert "# TYPE fraud_ws_messages_total counter" in response.text
+    assert "fraud_event_loop_lag_last_seconds" in response.text
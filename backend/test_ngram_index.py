@@ -0,0 +1,48 @@
+import random
+from collections import Counter
+
+from backend.ai_ml.behavioral_analysis import BehavioralAnalyzer, RollingNGramIndex
+
+
+def _legacy_repetition(text_chunks):
+    phrases = []
+    for chunk in text_chunks[-10:]:
+        words = chunk.split()
+        for i in range(len(words) - 2):
+            phrases.append(' '.join(words[i:i + 3]).lower())
+    counts = Counter(phrases)
+    max_repetition = max(counts.values()) if counts else 1
+    return {
+        "repetition_score": min(max_repetition / len(phrases) * 10 if phrases else 0, 1.0),
+        "exact_repeats": sum(1 for c in counts.values() if c > 2),
+        "unique_phrases": len(counts),
+        "total_phrases": len(phrases),
+    }
+
+
+def test_rolling_index_matches_full_recount():
+    rng = random.Random(6)
+    vocab = ["please", "verify", "your", "account", "Now", "urgent", "the", "bank"]
+    index = RollingNGramIndex(window=10)
+    history = []
+    for _ in range(300):
+        chunk = " ".join(rng.choice(vocab) for _ in range(rng.randint(0, 12)))
+        history.append(chunk)
+        index.add(chunk)
+        assert index.stats() == _legacy_repetition(history)
+
+
+def test_stateless_call_data_uses_same_statistics():
+    analyzer = BehavioralAnalyzer()
+    chunks = ["we need your bank account now"] * 4 + ["thank you"]
+    assert analyzer._detect_repetition({"text_chunks": chunks}) == _legacy_repetition(chunks)
+    assert analyzer._detect_repetition({"text_chunks": []}) == {"repetition_score": 0.0}
+
+
+def test_observed_text_feeds_repetition_incrementally():
+    analyzer = BehavioralAnalyzer()
+    for _ in range(3):
+        analyzer.observe_text("verify your social security number")
+    result = analyzer.analyze_call_behavior({})
+    assert result["repetition_analysis"]["exact_repeats"] == 3
+    assert result["repetition_analysis"]["total_phrases"] == 9
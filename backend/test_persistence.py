@@ -0,0 +1,114 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import event
+
+from backend.app import database
+from backend.app.persistence import RiskScoreWriter
+from backend.models.call import Call
+from backend.models.user import User
+
+
+@pytest.fixture
+def call_id():
+    db = database.SessionLocal()
+    try:
+        name = f"user_{uuid.uuid4().hex[:6]}"
+        user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        call = Call(user_id=user.id, session_id=str(uuid.uuid4()))
+        db.add(call)
+        db.commit()
+        yield call.id
+    finally:
+        db.close()
+
+
+def _stored(call_id):
+    db = database.SessionLocal()
+    try:
+        call = db.get(Call, call_id)
+        return call.risk_score, call.status
+    finally:
+        db.close()
+
+
+def test_updates_coalesce_into_one_batched_write(call_id):
+    writer = RiskScoreWriter(flush_interval=60)
+    commits = []
+    engine = database.SessionLocal.kw["bind"]
+
+    def on_commit(conn):
+        commits.append(1)
+
+    event.listen(engine, "commit", on_commit)
+    try:
+        async def scenario():
+            for i in range(100):
+                writer.update(call_id, risk_score=i / 100)
+            assert writer.pending == 1
+            await writer.flush()
+        asyncio.run(scenario())
+    finally:
+        event.remove(engine, "commit", on_commit)
+
+    assert writer.pending == 0
+    assert writer.flushes == 1
+    assert len(commits) == 1
+    assert _stored(call_id)[0] == pytest.approx(0.99)
+
+
+def test_size_threshold_triggers_background_flush(call_id):
+    writer = RiskScoreWriter(flush_interval=60, max_pending=1)
+
+    async def scenario():
+        writer.update(call_id, risk_score=0.25, status="ended")
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if writer.flushes:
+                break
+        await writer.close()
+
+    asyncio.run(scenario())
+    assert _stored(call_id) == (pytest.approx(0.25), "ended")
+
+
+def test_flush_sync_on_shutdown(call_id):
+    writer = RiskScoreWriter()
+    writer.update(call_id, risk_score=0.5)
+    writer.flush_sync()
+    assert writer.pending == 0
+    assert _stored(call_id)[0] == pytest.approx(0.5)
+
+
+def test_overlapping_flushes_commit_in_order(call_id):
+    writer = RiskScoreWriter(flush_interval=60)
+    write = writer._write
+    batches = []
+
+    def slow_first_write(batch):
+        batches.append(batch)
+        if len(batches) == 1:
+            time.sleep(0.2)
+        return write(batch)
+
+    writer._write = slow_first_write
+
+    async def scenario():
+        writer.update(call_id, risk_score=0.1)
+        timer_flush = asyncio.create_task(writer.flush())
+        await asyncio.sleep(0.05)
+        # The call ends while the older batch is still being written
+        writer.update(call_id, risk_score=0.9, status="ended")
+        await writer.flush_call(call_id)
+        await timer_flush
+
+    asyncio.run(scenario())
+    assert writer.flushes == 2
+    assert _stored(call_id) == (pytest.approx(0.9), "ended")
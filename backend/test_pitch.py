@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip("librosa")
+
+from backend.ai_ml.pitch import PitchStats, PitchTracker
+
+SR = 16000
+
+
+def _voice(f0, seconds=1.0, seed=0):
+    """Harmonic-rich tone with a time-varying f0 (Hz, scalar or per-sample array)."""
+    n = int(seconds * SR)
+    phase = 2 * np.pi * np.cumsum(np.broadcast_to(f0, (n,))) / SR
+    rng = np.random.default_rng(seed)
+    y = sum(np.sin(k * phase) / k for k in range(1, 8))
+    return (0.2 * y + 0.01 * rng.standard_normal(n)).astype(np.float32)
+
+
+def _spectrogram(audio):
+    return np.abs(librosa.stft(audio, n_fft=2048, hop_length=512))
+
+
+@pytest.mark.parametrize("f0", [85.0, 140.0, 220.0, 380.0])
+def test_tracker_finds_fundamental(f0):
+    track = PitchTracker(SR, 2048).track(_spectrogram(_voice(f0)))
+    voiced = track[track > 0]
+    assert len(voiced) >= 0.9 * len(track)
+    assert np.median(voiced) == pytest.approx(f0, rel=0.01)
+
+
+def test_tracker_rejects_noise_and_silence():
+    tracker = PitchTracker(SR, 2048)
+    noise = np.random.default_rng(1).standard_normal(SR).astype(np.float32) * 0.1
+    assert np.mean(tracker.track(_spectrogram(noise)) > 0) < 0.1
+    assert not tracker.track(np.zeros((1025, 5))).any()
+    assert tracker.track(np.zeros((1025, 0))).shape == (0,)
+
+
+def test_streaming_pitch_stats_accumulate_across_chunks():
+    from backend.ai_ml.streaming_acoustic import StreamingAcousticAnalyzer
+
+    # Glide 120 -> 240 Hz over two seconds, fed in 0.25 s chunks
+    glide = np.linspace(120.0, 240.0, 2 * SR)
+    audio = _voice(glide, seconds=2.0)
+    stream = StreamingAcousticAnalyzer()
+    for i in range(0, len(audio), 4000):
+        result = stream.analyze_chunk(audio[i:i + 4000])
+
+    assert stream.pitch_stats.mean == pytest.approx(180.0, rel=0.05)
+    assert result["pitch_range"] == pytest.approx(0.8 * 120.0, rel=0.15)
+    assert result["pitch_variation"] > 0.1
+    assert result["emotional_range"] == pytest.approx(result["pitch_range"] / stream.pitch_stats.mean)
+
+
+def test_pitch_stats_need_enough_voiced_frames():
+    stats = PitchStats(min_frames=3)
+    stats.update(np.array([0.0, 200.0, 0.0, 200.0]))
+    assert stats.summary() == {}
+    stats.update(np.array([200.0]))
+    summary = stats.summary()
+    assert summary["pitch_variance"] == pytest.approx(0.0, abs=1e-6)
+    assert summary["pitch_variation"] == pytest.approx(0.0, abs=1e-6)
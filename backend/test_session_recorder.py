@@ -0,0 +1,111 @@
+import base64
+import json
+import time
+import uuid
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.utils import session_recorder
+from backend.utils.fraud_detection import FraudDetectionService
+from backend.utils.session_recorder import (
+    REC_BINARY, REC_CLOSE, REC_OPEN, REC_TEXT, RecordFormatError, SessionRecorder, SessionReplayer, merge_records,
+    read_records, worker_record_path,
+)
+from backend.utils.stream_protocol import encode_audio_frame
+
+
+def _tone(seconds=0.5, sample_rate=16000, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (0.3 * np.sin(2 * np.pi * 180 * t) + 0.01 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def test_records_round_trip_and_truncated_tail_is_ignored(tmp_path):
+    path = tmp_path / "sessions.rec"
+    recorder = SessionRecorder(path)
+    recorder.open_session("s1", codec="int16", sample_rate=8000, encoding=None)
+    recorder.record("s1", '{"transcript": "héllo"}')
+    recorder.record("s1", b"\x01\x02\x03")
+    recorder.close_session("s1")
+    recorder.close()
+
+    records = list(read_records(path))
+    assert [r.kind for r in records] == [REC_OPEN, REC_TEXT, REC_BINARY, REC_CLOSE]
+    assert {r.session_id for r in records} == {"s1"}
+    assert records[0].params == {"codec": "int16", "sample_rate": 8000, "encoding": None}
+    assert records[1].message == '{"transcript": "héllo"}'
+    assert records[2].message == b"\x01\x02\x03"
+    assert records == sorted(records, key=lambda r: r.timestamp)
+
+    # A crash mid-write leaves a partial record: readers stop before it
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 7)
+    assert len(list(read_records(path))) == 4
+
+    (tmp_path / "other.bin").write_bytes(b"not a log")
+    with pytest.raises(RecordFormatError):
+        list(read_records(tmp_path / "other.bin"))
+
+
+def test_recording_stops_at_max_bytes(tmp_path):
+    recorder = SessionRecorder(tmp_path / "sessions.rec", max_bytes=200)
+    for _ in range(10):
+        recorder.record("s1", b"x" * 50)
+    recorder.close()
+    assert recorder.records == 2
+    assert recorder.dropped == 8
+    assert (tmp_path / "sessions.rec").stat().st_size <= 200
+
+
+def test_workers_record_to_own_files_and_merge_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_recorder, "_recorder", None)
+    monkeypatch.setattr(session_recorder.settings, "record_sessions", True, raising=False)
+    monkeypatch.setattr(session_recorder.settings, "record_path", str(tmp_path / "sessions.rec"), raising=False)
+    monkeypatch.setattr(session_recorder.settings, "session_router", "broker", raising=False)
+    recorder = session_recorder.get_session_recorder()
+    assert recorder.path == worker_record_path(tmp_path / "sessions.rec")
+    assert recorder.path.name.startswith("sessions.") and recorder.path.suffix == ".rec"
+    recorder.close()
+    monkeypatch.setattr(session_recorder, "_recorder", None)
+
+    workers = [SessionRecorder(worker_record_path(tmp_path / "sessions.rec", pid)) for pid in (101, 102)]
+    for i in range(6):
+        workers[i % 2].record(f"s{i % 2}", f"message {i}")
+        time.sleep(0.001)
+    for worker in workers:
+        worker.close()
+    merged = list(merge_records(worker.path for worker in workers))
+    assert [r.message for r in merged] == [f"message {i}" for i in range(6)]
+
+
+def test_replay_reproduces_stream_scores(tmp_path, monkeypatch):
+    recorder = SessionRecorder(tmp_path / "sessions.rec")
+    monkeypatch.setattr(session_recorder, "_recorder", recorder)
+
+    session_id = str(uuid.uuid4())
+    client = TestClient(app)
+    sent_scores = []
+    with client.websocket_connect(f"/call/stream?session_id={session_id}&create_if_missing=true") as ws:
+        ws.send_text(json.dumps({"transcript": "this is urgent, verify your account now"}))
+        sent_scores.append(json.loads(ws.receive_text())["risk_score"])
+        for seq in range(4):
+            ws.send_bytes(encode_audio_frame(_tone(seed=seq), seq=seq))
+            sent_scores.append(json.loads(ws.receive_text())["risk_score"])
+        audio_data = base64.b64encode(_tone(seed=9).tobytes()).decode()
+        ws.send_text(json.dumps({"audio_data": audio_data}))
+        sent_scores.append(json.loads(ws.receive_text())["risk_score"])
+        ws.send_text("not json")
+        assert json.loads(ws.receive_text())["error"] == "invalid_json"
+    recorder.close()
+
+    records = [r for r in read_records(recorder.path) if r.session_id == session_id]
+    assert [r.kind for r in records] == [REC_OPEN, REC_TEXT] + [REC_BINARY] * 4 + [REC_TEXT, REC_TEXT, REC_CLOSE]
+
+    replayer = SessionReplayer(FraudDetectionService())
+    outcomes = [replayer.feed(record) for record in records]
+    replayed = [score for _, score in filter(None, outcomes)]
+    assert [kind for kind, _ in filter(None, outcomes)] == ["transcript"] + ["audio"] * 5
+    assert replayed == pytest.approx(sent_scores, abs=1e-3)
@@ -0,0 +1,90 @@
+import asyncio
+
+from backend.routes.connections import KIND_ALERT, KIND_UPDATE, ConnectionManager
+from backend.routes.session_router import (
+    BrokerSessionRouter,
+    LocalSessionRouter,
+    SessionBroker,
+)
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        self.sent.append(message)
+
+    async def send_bytes(self, message):
+        self.sent.append(message)
+
+
+async def _until(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+def test_local_router_delivers_in_process():
+    async def scenario():
+        manager = ConnectionManager()
+        router = LocalSessionRouter(manager)
+        ws = FakeWebSocket()
+        await manager.connect("s1", ws)
+        assert router.publish("s1", '{"alert":{}}')
+        assert not router.publish("unknown", "x")
+        await _until(lambda: ws.sent)
+        await manager.disconnect("s1")
+        return ws.sent
+
+    assert asyncio.run(scenario()) == ['{"alert":{}}']
+
+
+def test_broker_routes_to_owning_worker_and_follows_reconnect(tmp_path):
+    path = str(tmp_path / "broker.sock")
+
+    async def scenario():
+        broker = SessionBroker(path)
+        await broker.start()
+        # Two managers stand in for two uvicorn workers
+        worker_a, worker_b = ConnectionManager(), ConnectionManager()
+        router_a = BrokerSessionRouter(worker_a, path)
+        router_b = BrokerSessionRouter(worker_b, path)
+        await router_a.wait_connected()
+        await router_b.wait_connected()
+
+        ws_b = FakeWebSocket()
+        await worker_b.connect("call-1", ws_b)
+        await _until(lambda: "call-1" in broker._owners)
+        assert router_a.publish("call-1", '{"alert":1}', KIND_ALERT)
+        assert router_a.publish("call-1", b"\x01update", KIND_UPDATE)
+        await _until(lambda: len(ws_b.sent) == 2)
+
+        # The client reconnects to worker A; the old socket on B closes late
+        ws_a = FakeWebSocket()
+        await worker_a.connect("call-1", ws_a)
+        await asyncio.sleep(0.05)
+        await worker_b.disconnect("call-1", ws_b)
+        await asyncio.sleep(0.05)
+        assert router_b.publish("call-1", '{"alert":2}')
+        await _until(lambda: ws_a.sent)
+
+        # Sessions nobody holds are counted by the broker, not delivered
+        assert router_a.publish("missing", "x")
+        await _until(lambda: broker.counters["unrouted"] == 1)
+        for manager in (worker_a, worker_b):
+            for session_id in list(manager._conns):
+                await manager.disconnect(session_id)
+        await router_a.close()
+        await router_b.close()
+        await broker.close()
+        return ws_b.sent, ws_a.sent
+
+    sent_b, sent_a = asyncio.run(scenario())
+    assert sent_b == ['{"alert":1}', b"\x01update"]
+    assert sent_a == ['{"alert":2}']
@@ -0,0 +1,58 @@
+from backend.utils.fraud_detection import FraudDetectionService
+from backend.utils.session_state import SessionState, SessionStateRegistry
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_keeps_most_recent_sessions():
+    registry = SessionStateRegistry(SessionState, max_sessions=2)
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")  # touch a so b is least recently used
+    registry.get("c")
+    assert set(registry) == {"a", "c"}
+    assert registry.evictions == 1
+
+
+def test_ttl_eviction_drops_idle_sessions():
+    clock = _Clock()
+    registry = SessionStateRegistry(SessionState, ttl_seconds=10, clock=clock)
+    registry.get("idle")
+    clock.now = 5
+    registry.get("active")
+    clock.now = 12
+    registry.get("active")
+    assert set(registry) == {"active"}
+    clock.now = 30
+    assert registry.evict_expired() == 1
+    assert len(registry) == 0
+
+
+def test_release_is_explicit_and_idempotent():
+    registry = SessionStateRegistry(SessionState)
+    registry.get("a")
+    assert registry.release("a") is True
+    assert registry.release("a") is False
+
+
+def test_behavioral_state_is_per_session_and_bounded():
+    service = FraudDetectionService()
+    for i in range(50):
+        service.analyze_audio_transcript(f"urgent wire transfer number {i}", session_id="a")
+    service.analyze_audio_transcript("hello there", session_id="b")
+
+    a = service.sessions.peek("a").behavioral
+    b = service.sessions.peek("b").behavioral
+    assert a is not b
+    assert len(a.ngram_index) == a.ngram_index.window
+    assert len(b.call_history) == 1
+    assert len(a.call_history) <= a.call_history.maxlen
+
+    service.release_session("a")
+    assert "a" not in service.sessions
@@ -0,0 +1,82 @@
+import json
+import uuid
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.utils.stream_encoding import (
+    StreamEncoder,
+    StreamUpdate,
+    decode_binary_update,
+    dumps_json,
+)
+from backend.utils.stream_protocol import encode_audio_frame
+
+
+def _audio_result():
+    return {
+        "overall_risk_score": np.float64(0.123456789),
+        "acoustic_result": {
+            "mfcc": np.ones((40, 13), dtype=np.float32),
+            "rms_energy": np.float32(0.5),
+            "pitch_mean": np.float64(180.25),
+            "duration": 1.0,
+            "artifact_score": np.float64(0.3),
+        },
+        "detected_keywords": ["urgent"],
+        "semantic_result": {"keyword_risk": 0.25, "behavioral_risk": 0.0, "recommendation": "Low risk"},
+    }
+
+
+def test_update_is_compact_and_json_serializable():
+    update = StreamUpdate.from_analysis(0.123456789, _audio_result(), 1700000000.12345, seq=3)
+    data = json.loads(StreamEncoder("json").encode(update))
+    assert data["risk_score"] == 0.1235
+    assert data["seq"] == 3
+    assert data["analysis"]["acoustic"]["mfcc_mean"] == [1.0] * 13
+    assert data["analysis"]["detected_keywords"] == ["urgent"]
+    assert len(dumps_json(data)) < 512
+
+
+def test_binary_encoding_roundtrip():
+    update = StreamUpdate.from_analysis(0.5, _audio_result(), 1700000000.5, seq=9)
+    decoded = decode_binary_update(StreamEncoder("binary").encode(update))
+    assert decoded["seq"] == 9
+    assert decoded["risk_score"] == pytest.approx(0.5)
+    assert decoded["pitch_mean"] == pytest.approx(180.25)
+    assert decoded["mfcc_mean"] == pytest.approx([1.0] * 13)
+    assert decoded["detected_keywords"] == ["urgent"]
+
+
+def test_msgpack_encoding_when_available():
+    msgpack = pytest.importorskip("msgpack")
+    update = StreamUpdate.from_analysis(0.5, {"risk_score": 0.5, "keyword_risk": 0.2}, 1.0)
+    data = msgpack.unpackb(StreamEncoder("msgpack").encode(update))
+    assert data["analysis"]["keyword_risk"] == pytest.approx(0.2)
+
+
+def test_unknown_encoding_rejected():
+    with pytest.raises(ValueError):
+        StreamEncoder("xml")
+
+
+def test_binary_audio_frame_gets_compact_update():
+    pytest.importorskip("librosa")
+    session_id = str(uuid.uuid4())
+    client = TestClient(app)
+    t = np.arange(8000) / 16000
+    audio = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+    with client.websocket_connect(f"/call/stream?session_id={session_id}&create_if_missing=true") as ws:
+        ws.send_bytes(encode_audio_frame(audio, seq=1))
+        data = json.loads(ws.receive_text())
+        assert data["seq"] == 1
+        assert 0.0 <= data["risk_score"] <= 1.0
+        assert len(data["analysis"]["acoustic"]["mfcc_mean"]) == 13
+
+    uri = f"/call/stream?session_id={session_id}&create_if_missing=true&encoding=binary"
+    with client.websocket_connect(uri) as ws:
+        ws.send_bytes(encode_audio_frame(audio, seq=2))
+        assert decode_binary_update(ws.receive_bytes())["seq"] == 2
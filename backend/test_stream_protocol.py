@@ -0,0 +1,54 @@
+import json
+import struct
+import uuid
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.utils.stream_protocol import (
+    FRAME_HEADER,
+    SAMPLE_FLOAT32,
+    FrameError,
+    decode_frame,
+    encode_audio_frame,
+)
+
+
+def test_roundtrip_is_zero_copy_view():
+    samples = np.linspace(-1, 1, 480, dtype=np.float32)
+    data = encode_audio_frame(samples, seq=7, sample_rate=16000)
+    assert len(data) == FRAME_HEADER.size + samples.nbytes
+
+    frame = decode_frame(data)
+    assert frame.seq == 7
+    assert frame.sample_rate == 16000
+    assert frame.sample_format == SAMPLE_FLOAT32
+    np.testing.assert_array_equal(frame.samples, samples)
+    assert not frame.samples.flags.owndata
+
+
+@pytest.mark.parametrize("data", [
+    b"\x01\x01",                                         # truncated header
+    struct.pack("<BBBBII", 9, 1, 1, 0, 0, 0),            # bad version
+    struct.pack("<BBBBII", 1, 5, 1, 0, 0, 0),            # bad message type
+    struct.pack("<BBBBII", 1, 1, 99, 0, 0, 0),           # bad sample format
+    struct.pack("<BBBBII", 1, 1, 1, 0, 0, 0) + b"\x00",  # partial sample
+])
+def test_malformed_frames_are_rejected(data):
+    with pytest.raises(FrameError):
+        decode_frame(data)
+
+
+def test_stream_reports_invalid_binary_frame_and_keeps_json_path():
+    session_id = str(uuid.uuid4())
+    uri = f"/call/stream?session_id={session_id}&create_if_missing=true"
+
+    client = TestClient(app)
+    with client.websocket_connect(uri) as websocket:
+        websocket.send_bytes(b"\x01\x01\x01")
+        assert json.loads(websocket.receive_text())["error"] == "invalid_audio_frame"
+
+        websocket.send_text(json.dumps({"transcript": "urgent wire transfer"}))
+        assert "risk_score" in json.loads(websocket.receive_text())
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("librosa")
+
+from backend.ai_ml.streaming_acoustic import StreamingAcousticAnalyzer
+from backend.utils.fraud_detection import FraudDetectionService
+
+
+def _signal(seconds=2.0, sample_rate=16000):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    rng = np.random.default_rng(2)
+    return (0.4 * np.sin(2 * np.pi * 200 * t) + 0.02 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def test_chunked_frames_match_single_pass():
+    audio = _signal()
+    whole = StreamingAcousticAnalyzer()
+    expected = whole.push(audio)
+
+    chunked = StreamingAcousticAnalyzer()
+    # Uneven chunk sizes so frames straddle chunk boundaries
+    pieces = [chunked.push(part) for part in np.array_split(audio, [700, 3100, 3300, 12000, 25000])]
+    got = np.concatenate(pieces, axis=1)
+
+    assert got.shape == expected.shape
+    np.testing.assert_allclose(got, expected, rtol=1e-4, atol=1e-4)
+
+
+def test_chunk_larger_than_ring_buffer_is_not_truncated():
+    audio = _signal(seconds=3.0)
+    analyzer = StreamingAcousticAnalyzer(buffer_seconds=0.5)
+    magnitude = analyzer.push(audio)
+    expected_frames = (len(audio) - analyzer.n_fft) // analyzer.hop_length + 1
+    assert magnitude.shape[1] == expected_frames
+
+
+def test_noise_profile_is_learned_once_then_adapted():
+    analyzer = StreamingAcousticAnalyzer(noise_frames=4)
+    audio = _signal()
+    analyzer.analyze_chunk(audio[:8000])
+    learned = analyzer.noise_profile.copy()
+    assert analyzer._noise_count == 4
+
+    result = analyzer.analyze_chunk(audio[8000:16000])
+    assert "error" not in result
+    assert result["new_frames"] > 0
+    assert analyzer._noise_count == 4
+    assert analyzer.noise_profile.shape == learned.shape
+
+
+def test_service_keeps_stream_state_per_session():
+    service = FraudDetectionService()
+    audio = _signal(seconds=0.5)
+    service.analyze_audio_data(audio, session_id="a")
+    service.analyze_audio_data(audio, session_id="b")
+    assert service.sessions.peek("a").acoustic is not service.sessions.peek("b").acoustic
+    service.release_session("a")
+    assert set(service.sessions) == {"b"}
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from backend.ai_ml.vad import VoiceActivityDetector
+
+SR = 16000
+
+
+def _burst(seconds, rng, amplitude=0.2):
+    t = np.arange(int(seconds * SR)) / SR
+    return (amplitude * np.sin(2 * np.pi * 180 * t) + 0.02 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def _silence(seconds, rng):
+    return (1e-4 * rng.standard_normal(int(seconds * SR))).astype(np.float32)
+
+
+def test_vad_gates_silence_and_measures_pauses():
+    rng = np.random.default_rng(1)
+    vad = VoiceActivityDetector(sample_rate=SR, min_call_seconds=1.0)
+    # Leading silence is not a pause
+    assert not vad.process(_silence(1.0, rng))["speech"]
+    assert vad.call_data()["pauses"] == []
+
+    # Speech and gaps, fed in chunks that do not align with VAD frames
+    audio = np.concatenate([_burst(0.5, rng), _silence(0.4, rng), _burst(0.5, rng),
+                            _silence(0.1, rng), _burst(0.5, rng), _silence(0.8, rng)])
+    results = [vad.process(audio[i:i + 1000]) for i in range(0, len(audio), 1000)]
+    assert any(r["speech"] for r in results)
+    # The trailing silence is gated once the hangover has passed
+    assert not results[-1]["speech"]
+
+    data = vad.call_data()
+    # The 0.1 s gap is below min_pause and belongs to the speech segment
+    assert data["pauses"] == pytest.approx([0.4], abs=0.04)
+    assert data["speaking_duration"] == pytest.approx(1.6, abs=0.06)
+    assert data["total_duration"] == pytest.approx(3.8, abs=0.02)
+
+
+def test_vad_reports_nothing_until_enough_audio():
+    rng = np.random.default_rng(2)
+    vad = VoiceActivityDetector(sample_rate=SR, min_call_seconds=5.0)
+    assert vad.process(_burst(1.0, rng))["speech"]
+    assert vad.call_data() == {}
+
+
+def test_service_short_circuits_silent_chunks():
+    pytest.importorskip("librosa")
+    from backend.utils.fraud_detection import FraudDetectionService
+
+    rng = np.random.default_rng(3)
+    service = FraudDetectionService()
+    silent = [service.analyze_audio_data(_silence(0.1, rng), session_id="hold") for _ in range(20)]
+    assert all(r["acoustic_result"]["speech"] is False for r in silent)
+    assert all(r["acoustic_result"]["artifact_score"] == 0.0 for r in silent)
+
+    state = service.sessions.peek("hold")
+    assert state.scheduler.chunks == 0
+    # Silent chunks still advance the stream so frames stay aligned
+    assert state.acoustic.samples_written == 20 * 1600
+
+    result = service.analyze_audio_data(_burst(0.1, rng), session_id="hold")
+    assert "mfcc" in result["acoustic_result"]
+    assert state.scheduler.runs == 1
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.app.warmup import Readiness
+
+
+def test_service_warm_up_builds_tables_and_releases_its_session():
+    pytest.importorskip("librosa")
+    from backend.utils.fraud_detection import WARMUP_SESSION_ID, FraudDetectionService
+
+    service = FraudDetectionService()
+    timings = service.warm_up()
+    assert set(timings) == {"tables", "chunk", "stream"}
+    assert service.acoustic_analyzer._mel_basis is not None
+    assert service._batch_extractor is not None
+    assert WARMUP_SESSION_ID not in service.sessions
+
+
+def test_readiness_reports_warming_up_until_done(monkeypatch):
+    readiness = Readiness()
+    assert readiness.status() == {"status": "warming_up"}
+
+    monkeypatch.setattr("backend.app.warmup.settings.warmup_enabled", False, raising=False)
+    asyncio.run(readiness.warm_up())
+    assert readiness.ready
+    assert readiness.status()["status"] == "ready"
+
+
+def test_ready_endpoint_after_startup():
+    from backend.app.warmup import readiness
+
+    async def _warmed():
+        if readiness._task is not None:
+            await readiness._task
+
+    with TestClient(app) as client:
+        client.portal.call(_warmed)
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
@@ -1,13 +1,13 @@
 import json
 import uuid
-import time
-import logging
 
+import numpy as np
 from fastapi.testclient import TestClient
 from backend.app.main import app
 import pytest
 
-from backend.routes import calls_minimal
+from backend.routes import connections
+from backend.utils.stream_protocol import encode_audio_frame
 
 client = TestClient(app)
 
@@ -29,63 +29,54 @@ def test_reconnection_replaces_sender():
         assert "risk_score" in resp2
 
 
-def test_backpressure_causes_send_queue_drops(caplog):
-    # Capture warnings from the app logger ('fraud_detection') specifically
-    caplog.set_level(logging.WARNING, logger='fraud_detection')
+def test_late_close_of_replaced_socket_keeps_session_state():
+    from backend.routes.calls import analysis_executor
+
+    session_id = str(uuid.uuid4())
+    uri = f"/call/stream?session_id={session_id}&create_if_missing=true"
+    sessions = analysis_executor.service.sessions
+
+    old = client.websocket_connect(uri).__enter__()
+    old.send_text(json.dumps({"transcript": "First message urgent"}))
+    json.loads(old.receive_text())
+    with client.websocket_connect(uri) as ws2:
+        ws2.send_text(json.dumps({"transcript": "Second message urgent"}))
+        json.loads(ws2.receive_text())
+        state = sessions.peek(session_id)
+        assert state is not None
+
+        # The replaced socket's handler exits while the new one is live
+        old.__exit__(None, None, None)
+        assert sessions.peek(session_id) is state
+        ws2.send_text(json.dumps({"transcript": "Third message urgent"}))
+        assert "risk_score" in json.loads(ws2.receive_text())
+        assert session_id in connections.manager
+    assert sessions.peek(session_id) is None
+
+
+def test_backpressure_coalesces_risk_updates():
+    pytest.importorskip("librosa")
     session_id = str(uuid.uuid4())
     uri = f"/call/stream?session_id={session_id}&create_if_missing=true"
+    t = np.arange(4000) / 16000
+    audio = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    frames = 20
 
-    # Temporarily reduce queue size and increase send timeout to make it easier
-    # to trigger queue-full behavior deterministically.
-    old_max = getattr(calls_minimal, "SEND_QUEUE_MAXSIZE", None)
-    old_timeout = getattr(calls_minimal, "SEND_TIMEOUT", None)
-    calls_minimal.SEND_QUEUE_MAXSIZE = 2
-    calls_minimal.SEND_TIMEOUT = 5
-
-    try:
-        with client.websocket_connect(uri) as ws:
-            # Wait up to 1s for the connection to be registered in the manager
-            start = time.time()
-            conn = None
-            while time.time() - start < 1.0:
-                conn = calls_minimal.manager._conns.get(session_id)
-                if conn is not None:
-                    break
-                time.sleep(0.05)
-            assert conn is not None, "manager connection not registered"
-            queue = conn["queue"]
-
-            # Fill the queue to capacity
-            import asyncio as _asyncio
-            while True:
-                try:
-                    queue.put_nowait("__fill__")
-                except _asyncio.QueueFull:
-                    break
-
-            qsize_before = queue.qsize()
-            assert qsize_before == queue.maxsize
-
-            # Directly invoke manager.send to deterministically trigger QueueFull handling
-            import asyncio as _asyncio
-            _asyncio.run(calls_minimal.manager.send(session_id, "drop-trigger"))
-
-            # Give the server a moment to log
-            time.sleep(0.1)
-
-            qsize_after = queue.qsize()
-            # The queue must still be full (no new item inserted)
-            assert qsize_before == qsize_after, f"Queue size changed: before {qsize_before} after {qsize_after}"
-
-    finally:
-        # Restore values
-        if old_max is not None:
-            calls_minimal.SEND_QUEUE_MAXSIZE = old_max
-        if old_timeout is not None:
-            calls_minimal.SEND_TIMEOUT = old_timeout
-
-    # Assert that server logged a queue-full warning at least once
-    assert any("Send queue full" in rec.getMessage() for rec in caplog.records), f"No 'Send queue full' in logs: {caplog.records}"
+    with client.websocket_connect(uri) as ws:
+        # Send every frame before reading anything, like a client that
+        # stalls; pending risk updates are replaced rather than queued.
+        for seq in range(1, frames + 1):
+            ws.send_bytes(encode_audio_frame(audio, seq=seq))
+        seqs = []
+        while not seqs or seqs[-1] != frames:
+            seqs.append(json.loads(ws.receive_text())["seq"])
+        conn = connections.manager._conns[session_id]
+
+        # The client always converges to the latest update, in order, and
+        # every update was either delivered or coalesced into a newer one.
+        assert seqs == sorted(seqs)
+        assert conn.coalesced + len(seqs) == frames
+        assert conn.dropped == 0
 
 
 if __name__ == "__main__":
@@ -32,3 +32,26 @@ def test_e2e_invalid_json():
         websocket.send_text("this-is-not-json")
         data = json.loads(websocket.receive_text())
         assert data.get("error") == "invalid_json"
+
+
+def test_high_risk_alert_is_published_once_per_crossing(monkeypatch):
+    from backend.routes import calls
+
+    scores = iter([0.9, 0.95, 0.9, 0.5, 0.85, 0.9])
+    published = []
+
+    async def fake_run(method, *args, **kwargs):
+        return {"risk_score": next(scores)}
+
+    monkeypatch.setattr(calls.analysis_executor, "run", fake_run)
+    monkeypatch.setattr(calls.session_router, "publish",
+                        lambda session_id, message, kind=None: published.append(json.loads(message)))
+
+    session_id = str(uuid.uuid4())
+    client = TestClient(app)
+    with client.websocket_connect(f"/call/stream?session_id={session_id}&create_if_missing=true") as websocket:
+        for _ in range(6):
+            websocket.send_text(json.dumps({"transcript": "wire the money now"}))
+            assert "risk_score" in json.loads(websocket.receive_text())
+
+    assert [alert["alert"]["risk_score"] for alert in published] == [0.9, 0.85]
@@ -0,0 +1,135 @@
+"""
+Cross-Session Micro-Batching for Audio Analysis
+
+Audio chunks from concurrent calls are held for at most a few milliseconds
+and handed to the analysis executor together, so the spectral stage runs
+once per batch (FraudDetectionService.analyze_audio_batch) instead of once
+per chunk.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .analysis_executor import AnalysisExecutor, get_analysis_executor
+from ..app.metrics import registry
+
+try:
+    from ..app.config import settings
+except Exception:
+    # Minimal fallback settings for environments without pydantic
+    class _DummySettings:
+        analysis_batch_max_delay_ms = 5.0
+        analysis_batch_max_size = 32
+    settings = _DummySettings()
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisBatcher:
+    """
+    Collects analyze_audio_data requests and runs them as batches.
+
+    A batch is dispatched when it reaches max_batch_size or when its oldest
+    request has waited max_delay seconds. In process mode requests are
+    grouped per worker lane so session affinity is kept.
+
+    Args:
+        executor: Executor that runs the batches
+        max_delay: Longest time (seconds) a request waits for companions
+        max_batch_size: Requests per batch; 1 disables batching
+    """
+
+    def __init__(self, executor: AnalysisExecutor, max_delay: float = 0.005, max_batch_size: int = 32):
+        self.executor = executor
+        self.max_delay = max(0.0, max_delay)
+        self.max_batch_size = max(1, max_batch_size)
+        self._pending: Dict[int, List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    @classmethod
+    def from_settings(cls, executor: Optional[AnalysisExecutor] = None) -> "AnalysisBatcher":
+        return cls(
+            executor if executor is not None else get_analysis_executor(),
+            max_delay=getattr(settings, "analysis_batch_max_delay_ms", 5.0) / 1000.0,
+            max_batch_size=getattr(settings, "analysis_batch_max_size", 32),
+        )
+
+    async def submit(self, audio, transcript: Optional[str] = None,
+                     session_id: Optional[str] = None) -> dict:
+        """
+        Analyze one chunk as part of the next batch.
+
+        Args:
+            audio: Audio samples (numpy array)
+            transcript: Optional transcript for the chunk
+            session_id: Call session the chunk continues
+
+        Returns:
+            The analyze_audio_data result for this chunk
+
+        Raises:
+            AnalysisOverloadedError: If the executor rejected the batch
+        """
+        if self.max_batch_size == 1:
+            return await self.executor.run("analyze_audio_data", audio, transcript, session_id=session_id)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        lane = self.executor.lane(session_id)
+        pending = self._pending.setdefault(lane, [])
+        pending.append(({"audio": audio, "transcript": transcript, "session_id": session_id}, future))
+        if len(pending) >= self.max_batch_size:
+            self._flush(lane)
+        elif lane not in self._timers:
+            self._timers[lane] = loop.call_later(self.max_delay, self._flush, lane)
+        return await future
+
+    def _flush(self, lane: int) -> None:
+        timer = self._timers.pop(lane, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(lane, None)
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        self.batches += 1
+        self.items += len(items)
+        try:
+            results = await self.executor.run("analyze_audio_batch", items, affinity=items[0]["session_id"])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+_default_batcher: Optional[AnalysisBatcher] = None
+
+
+def get_analysis_batcher() -> AnalysisBatcher:
+    """Return the process-wide batcher in front of the shared executor."""
+    global _default_batcher
+    if _default_batcher is None:
+        _default_batcher = AnalysisBatcher.from_settings()
+    return _default_batcher
+
+
+def _batcher_stat(name: str) -> Optional[int]:
+    return None if _default_batcher is None else getattr(_default_batcher, name)
+
+
+registry.counter("fraud_analysis_batches_total", "Batches submitted by the analysis batcher",
+                 lambda: _batcher_stat("batches"))
+registry.counter("fraud_analysis_batched_items_total", "Chunks submitted through the analysis batcher",
+                 lambda: _batcher_stat("items"))
@@ -0,0 +1,245 @@
+"""
+Analysis Executor for Fraud Detection
+
+This module runs FraudDetectionService analysis off the asyncio event loop so
+that a slow librosa pass on one call does not stall every other websocket on
+the same worker.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import itertools
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+from typing import Any, Dict, List, Optional
+
+from .feature_store import flush_feature_store
+from .fraud_detection import FraudDetectionService
+from ..app.metrics import registry
+
+try:
+    from ..app.config import settings
+except Exception:
+    # Minimal fallback settings for environments without pydantic
+    class _DummySettings:
+        analysis_executor_mode = "thread"
+        analysis_max_workers = 0
+        analysis_max_in_flight = 32
+        analysis_queue_depth = 128
+    settings = _DummySettings()
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+# Warm service instance owned by each process-pool worker
+_worker_service: Optional[FraudDetectionService] = None
+
+
+class AnalysisOverloadedError(RuntimeError):
+    """Raised when more analyses are waiting than the configured queue depth."""
+
+
+def _init_worker():
+    """Process-pool initializer: build the analyzers once per worker process."""
+    global _worker_service
+    _worker_service = FraudDetectionService()
+    # Feature rows of calls still open live only in this worker; write them
+    # when the pool shuts the worker down (the parent flushes its own store)
+    multiprocessing.util.Finalize(None, flush_feature_store, exitpriority=10)
+
+
+def _run_in_worker(method: str, args: tuple, kwargs: dict) -> Any:
+    if _worker_service is None:
+        _init_worker()
+    return getattr(_worker_service, method)(*args, **kwargs)
+
+
+class AnalysisExecutor:
+    """
+    Pluggable execution engine for FraudDetectionService calls.
+
+    Modes:
+        inline:  run on the calling event loop (tests, debugging)
+        thread:  run in a shared thread pool against one in-process service
+        process: run in worker processes, each holding a warm service; a
+                 session is always routed to the same worker so per-call
+                 analyzer state stays in one place
+    """
+
+    def __init__(self, mode: str = "thread", max_workers: int = 0,
+                 max_in_flight: int = 32, max_queue_depth: int = 128,
+                 service: Optional[FraudDetectionService] = None):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown analysis executor mode: {mode!r}")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue_depth = max(0, max_queue_depth)
+        self.service = service if service is not None else FraudDetectionService()
+
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._waiting = 0
+        self._in_flight = 0
+        self.rejected = 0
+        self._thread_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._process_pools: List[concurrent.futures.ProcessPoolExecutor] = []
+        self._round_robin = itertools.count()
+
+    @classmethod
+    def from_settings(cls, service: Optional[FraudDetectionService] = None) -> "AnalysisExecutor":
+        return cls(
+            mode=getattr(settings, "analysis_executor_mode", "thread"),
+            max_workers=getattr(settings, "analysis_max_workers", 0),
+            max_in_flight=getattr(settings, "analysis_max_in_flight", 32),
+            max_queue_depth=getattr(settings, "analysis_queue_depth", 128),
+            service=service,
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of analyses waiting for an in-flight slot."""
+        return self._waiting
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_thread_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="analysis"
+            )
+        return self._thread_pool
+
+    def _get_process_pool(self, session_id: Optional[str]) -> concurrent.futures.ProcessPoolExecutor:
+        if not self._process_pools:
+            # spawn avoids forking a process that owns a running event loop
+            ctx = multiprocessing.get_context("spawn")
+            self._process_pools = [
+                concurrent.futures.ProcessPoolExecutor(
+                    max_workers=1, mp_context=ctx, initializer=_init_worker
+                )
+                for _ in range(self.max_workers)
+            ]
+        if session_id is None:
+            shard = next(self._round_robin)
+        else:
+            shard = hash(session_id)
+        return self._process_pools[shard % len(self._process_pools)]
+
+    def lane(self, session_id: Optional[str]) -> int:
+        """Worker a session is pinned to (always 0 unless in process mode)."""
+        if self.mode != "process" or session_id is None:
+            return 0
+        return hash(session_id) % self.max_workers
+
+    async def run(self, method: str, *args, affinity: Optional[str] = None, **kwargs) -> Any:
+        """
+        Run a FraudDetectionService method without blocking the event loop.
+
+        Args:
+            method: Name of the FraudDetectionService method to call
+            *args, **kwargs: Passed to the method; a ``session_id`` keyword
+                also selects the worker in process mode
+            affinity: Session whose worker to use when the method takes no
+                session_id (e.g. a batch of chunks from one lane)
+
+        Returns:
+            The method's return value
+
+        Raises:
+            AnalysisOverloadedError: If the wait queue is already full
+        """
+        if self._in_flight >= self.max_in_flight and self._waiting >= self.max_queue_depth:
+            self.rejected += 1
+            raise AnalysisOverloadedError(
+                f"analysis queue full ({self._waiting} waiting, {self._in_flight} in flight)"
+            )
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        try:
+            if self.mode == "inline":
+                return getattr(self.service, method)(*args, **kwargs)
+
+            loop = asyncio.get_running_loop()
+            if self.mode == "thread":
+                call = functools.partial(getattr(self.service, method), *args, **kwargs)
+                return await loop.run_in_executor(self._get_thread_pool(), call)
+
+            call = functools.partial(_run_in_worker, method, args, kwargs)
+            pool = self._get_process_pool(affinity or kwargs.get("session_id"))
+            return await loop.run_in_executor(pool, call)
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    async def warm_up(self) -> Dict[str, float]:
+        """
+        Run FraudDetectionService.warm_up wherever analyses will run.
+
+        In process mode every worker process is started and warmed, since
+        each holds its own service.
+
+        Returns:
+            Warm-up step timings (of the first worker in process mode)
+        """
+        if self.mode == "inline":
+            return self.service.warm_up()
+        loop = asyncio.get_running_loop()
+        if self.mode == "thread":
+            return await loop.run_in_executor(self._get_thread_pool(), self.service.warm_up)
+        self._get_process_pool(None)
+        timings = await asyncio.gather(*(
+            loop.run_in_executor(pool, _run_in_worker, "warm_up", (), {}) for pool in self._process_pools
+        ))
+        return timings[0]
+
+    def shutdown(self, wait: bool = True):
+        """Stop all worker threads/processes owned by this executor."""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=wait)
+            self._thread_pool = None
+        for pool in self._process_pools:
+            pool.shutdown(wait=wait)
+        self._process_pools = []
+
+
+_default_executor: Optional[AnalysisExecutor] = None
+
+
+def get_analysis_executor() -> AnalysisExecutor:
+    """Return the process-wide executor shared by the stream routers."""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = AnalysisExecutor.from_settings()
+        logger.info("Analysis executor started in %s mode", _default_executor.mode)
+    return _default_executor
+
+
+def shutdown_analysis_executor():
+    global _default_executor
+    if _default_executor is not None:
+        _default_executor.shutdown()
+        _default_executor = None
+
+
+def _executor_stat(name: str) -> Optional[int]:
+    # Not reported until the executor exists; reading must not create it
+    return None if _default_executor is None else getattr(_default_executor, name)
+
+
+registry.gauge("fraud_analysis_queue_depth", "Analyses waiting for an execution slot",
+               lambda: _executor_stat("queue_depth"))
+registry.gauge("fraud_analysis_in_flight", "Analyses currently executing", lambda: _executor_stat("in_flight"))
+registry.counter("fraud_analysis_rejected_total", "Analyses refused because the wait queue was full",
+                 lambda: _executor_stat("rejected"))
@@ -0,0 +1,80 @@
+"""
+Adaptive Acoustic Scheduling for Fraud Detection
+
+Keyword and behavioral analysis are cheap and run on every message. The
+acoustic tier (STFT, MFCC, spectral artifacts, pitch) dominates CPU, so per
+session it runs at a sampled cadence: sparse while a call looks benign,
+denser as its risk rises, and on every chunk for a while after a keyword
+fires.
+"""
+
+from typing import Dict
+
+
+class AcousticScheduler:
+    """
+    Decides, per session, which audio chunks get full acoustic analysis.
+
+    Args:
+        base_interval: Analyze one chunk in this many while risk is zero
+        escalate_risk: At or above this risk every chunk is analyzed; the
+            interval shrinks linearly from base_interval towards it
+        hold_chunks: Chunks analyzed back to back after a keyword hit
+    """
+
+    __slots__ = ("base_interval", "escalate_risk", "hold_chunks", "risk",
+                 "chunks", "runs", "_since_run", "_hold")
+
+    def __init__(self, base_interval: int = 10, escalate_risk: float = 0.4, hold_chunks: int = 10):
+        self.base_interval = max(1, base_interval)
+        self.escalate_risk = escalate_risk
+        self.hold_chunks = hold_chunks
+        self.risk = 0.0
+        self.chunks = 0
+        self.runs = 0
+        self._since_run = 0
+        self._hold = 0
+
+    def interval(self, risk: float) -> int:
+        """Chunks between acoustic runs at the given risk."""
+        if risk >= self.escalate_risk:
+            return 1
+        return max(1, int(round(self.base_interval * (1.0 - risk / self.escalate_risk))))
+
+    def should_run(self, risk: float = 0.0, keyword_hit: bool = False) -> bool:
+        """
+        Account for one incoming chunk and decide whether to analyze it.
+
+        Args:
+            risk: Risk known before the acoustic tier (cheap tiers of this
+                message); the session's last overall risk is also considered
+            keyword_hit: Whether a fraud keyword fired in this message
+
+        Returns:
+            True if the chunk should get full acoustic analysis
+        """
+        self.chunks += 1
+        self._since_run += 1
+        if keyword_hit:
+            self._hold = self.hold_chunks
+        if self._hold > 0:
+            self._hold -= 1
+            run = True
+        else:
+            # The first chunk always runs so the session has a baseline
+            run = self.runs == 0 or self._since_run >= self.interval(max(risk, self.risk))
+        if run:
+            self.runs += 1
+            self._since_run = 0
+        return run
+
+    def observe(self, risk: float) -> None:
+        """Record the overall risk produced for the latest chunk."""
+        self.risk = risk
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "chunks": self.chunks,
+            "acoustic_runs": self.runs,
+            "run_ratio": self.runs / self.chunks if self.chunks else 0.0,
+        }
@@ -0,0 +1,239 @@
+"""
+Audio Codecs for Telephony Ingestion
+
+Decodes 16-bit linear, G.711 mu-law and A-law PCM to float32 with vectorized
+lookup tables, and resamples the supported input rates to the analyzer rate
+with a cached polyphase filter and per-session filter state.
+"""
+
+from functools import lru_cache
+from math import gcd
+from typing import Optional
+import logging
+
+import numpy as np
+
+from .stream_protocol import (
+    SAMPLE_ALAW,
+    SAMPLE_DTYPES,
+    SAMPLE_FLOAT32,
+    SAMPLE_INT16,
+    SAMPLE_MULAW,
+    AudioFrame,
+)
+
+logger = logging.getLogger(__name__)
+
+CODEC_NAMES = {
+    "float32": SAMPLE_FLOAT32,
+    "pcm16": SAMPLE_INT16,
+    "int16": SAMPLE_INT16,
+    "mulaw": SAMPLE_MULAW,
+    "ulaw": SAMPLE_MULAW,
+    "alaw": SAMPLE_ALAW,
+}
+
+
+def _build_mulaw_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.uint8)
+    exponent = (u >> 4) & 0x07
+    mantissa = (u & 0x0F).astype(np.int32)
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    linear = np.where(u & 0x80, -magnitude, magnitude)
+    return (linear / 32768.0).astype(np.float32)
+
+
+def _build_alaw_table() -> np.ndarray:
+    a = np.arange(256, dtype=np.uint8) ^ 0x55
+    exponent = ((a >> 4) & 0x07).astype(np.int32)
+    mantissa = (a & 0x0F).astype(np.int32)
+    magnitude = np.where(
+        exponent == 0,
+        (mantissa << 4) + 8,
+        ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0),
+    )
+    linear = np.where(a & 0x80, magnitude, -magnitude)
+    return (linear / 32768.0).astype(np.float32)
+
+
+MULAW_TABLE = _build_mulaw_table()
+ALAW_TABLE = _build_alaw_table()
+_INT16_SCALE = np.float32(1.0 / 32768.0)
+
+
+def decode_samples(samples: np.ndarray, sample_format: int) -> np.ndarray:
+    """
+    Convert encoded samples to float32 in [-1, 1).
+
+    Args:
+        samples: Array typed per SAMPLE_DTYPES[sample_format]
+        sample_format: One of the SAMPLE_* constants
+
+    Returns:
+        float32 waveform (the input itself for float32)
+    """
+    if sample_format == SAMPLE_FLOAT32:
+        return samples
+    if sample_format == SAMPLE_INT16:
+        return samples.astype(np.float32) * _INT16_SCALE
+    if sample_format == SAMPLE_MULAW:
+        return MULAW_TABLE[samples]
+    if sample_format == SAMPLE_ALAW:
+        return ALAW_TABLE[samples]
+    raise ValueError(f"unsupported sample format {sample_format}")
+
+
+# Input rates a client may negotiate or put in a frame header. Each pair with
+# the analyzer rate has a small gcd-reduced up/down ratio, so filters stay
+# small and the resampler cache is bounded.
+SUPPORTED_SAMPLE_RATES = frozenset({8000, 16000, 22050, 44100, 48000})
+
+
+def check_sample_rate(sample_rate: int) -> int:
+    """Return sample_rate, or raise ValueError if it is not supported."""
+    if sample_rate not in SUPPORTED_SAMPLE_RATES:
+        raise ValueError(f"unsupported sample rate {sample_rate}; "
+                         f"expected one of {sorted(SUPPORTED_SAMPLE_RATES)}")
+    return sample_rate
+
+
+class PolyphaseResampler:
+    """
+    Rational-ratio resampler with its anti-aliasing filter designed once.
+
+    The filter is a Kaiser-windowed sinc (as scipy.signal.firwin designs it),
+    split into `up` polyphase branches. Instances are shared between
+    sessions and hold no stream state; see stream().
+
+    Args:
+        src_rate: Input sample rate in Hz
+        dst_rate: Output sample rate in Hz
+        taps_per_phase: Filter length per polyphase branch
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, taps_per_phase: int = 16):
+        divisor = gcd(src_rate, dst_rate)
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.up = dst_rate // divisor
+        self.down = src_rate // divisor
+        self.filter: Optional[np.ndarray] = None
+        self.branches: Optional[np.ndarray] = None
+        if (self.up, self.down) != (1, 1):
+            max_rate = max(self.up, self.down)
+            length = 2 * taps_per_phase * max_rate + 1
+            cutoff = 1.0 / max_rate
+            n = np.arange(length) - (length - 1) / 2
+            taps = cutoff * np.sinc(cutoff * n) * np.kaiser(length, 5.0)
+            self.filter = taps / taps.sum() * self.up
+            # branches[p, t] = filter[p + t * up], zero-padded to a whole number of taps
+            n_taps = -(-length // self.up)
+            padded = np.zeros(n_taps * self.up)
+            padded[:length] = self.filter
+            self.branches = padded.reshape(n_taps, self.up).T
+
+    @property
+    def history(self) -> int:
+        """Input samples a stream carries over between chunks."""
+        return 0 if self.branches is None else self.branches.shape[1] - 1
+
+    def stream(self) -> "StreamResampler":
+        """New per-stream state for resampling consecutive chunks."""
+        return StreamResampler(self)
+
+    def __call__(self, audio: np.ndarray) -> np.ndarray:
+        """Resample a whole signal in one go."""
+        return self.stream()(audio)
+
+
+class StreamResampler:
+    """
+    Resampling state of one audio stream.
+
+    Keeps the last input samples and the output position between chunks, so
+    chunked input gives exactly the output of resampling the signal in one
+    piece. The output is causal: it lags the input by the filter's group
+    delay, taps_per_phase * max(up, down) / up input samples (1-2 ms for
+    the supported rates).
+
+    Args:
+        resampler: Shared filter design for the stream's rate pair
+    """
+
+    def __init__(self, resampler: PolyphaseResampler):
+        self.resampler = resampler
+        self._history = np.zeros(resampler.history)
+        self._consumed = 0  # input samples seen so far
+        self._produced = 0  # output samples emitted so far
+
+    def __call__(self, audio: np.ndarray) -> np.ndarray:
+        resampler = self.resampler
+        if resampler.branches is None:
+            return audio
+        up, down = resampler.up, resampler.down
+        n_taps = resampler.branches.shape[1]
+        buffer = np.concatenate((self._history, audio))
+
+        end = self._consumed + len(audio)
+        # Output m sits at upsampled position m * down, i.e. after input m * down // up
+        positions = np.arange(self._produced, -(-end * up // down), dtype=np.int64) * down
+        inputs = positions // up - self._consumed + n_taps - 1
+        windows = buffer[inputs[:, None] - np.arange(n_taps)]
+        out = np.einsum("ij,ij->i", windows, resampler.branches[positions % up])
+
+        self._history = buffer[len(buffer) - len(self._history):]
+        self._consumed = end
+        self._produced += len(out)
+        return out.astype(np.float32)
+
+
+@lru_cache(maxsize=32)
+def get_resampler(src_rate: int, dst_rate: int) -> PolyphaseResampler:
+    return PolyphaseResampler(check_sample_rate(src_rate), dst_rate)
+
+
+class SessionCodec:
+    """
+    Codec parameters negotiated for one stream session.
+
+    Binary frames may override the sample format and rate in their header;
+    a zero in the header means "use the negotiated value". The resampler
+    state follows the stream, and starts over if a frame changes the rate.
+    """
+
+    def __init__(self, sample_format: int = SAMPLE_FLOAT32, sample_rate: int = 0,
+                 target_rate: int = 16000):
+        if sample_format not in SAMPLE_DTYPES:
+            raise ValueError(f"unsupported sample format {sample_format}")
+        self.sample_format = sample_format
+        self.target_rate = target_rate
+        self.sample_rate = sample_rate or target_rate
+        self._stream: Optional[StreamResampler] = None
+
+    @classmethod
+    def from_params(cls, codec: Optional[str], sample_rate: Optional[int],
+                    target_rate: int) -> "SessionCodec":
+        """Build from connect-time query parameters (e.g. ?codec=mulaw&sample_rate=8000)."""
+        name = (codec or "float32").lower()
+        if name not in CODEC_NAMES:
+            raise ValueError(f"unsupported codec {codec!r}")
+        if sample_rate is not None:
+            check_sample_rate(sample_rate)
+        return cls(CODEC_NAMES[name], sample_rate or 0, target_rate)
+
+    def _to_target(self, samples: np.ndarray, sample_format: int, sample_rate: int) -> np.ndarray:
+        if sample_rate == self.target_rate:
+            return decode_samples(samples, sample_format)
+        resampler = get_resampler(sample_rate, self.target_rate)
+        if self._stream is None or self._stream.resampler is not resampler:
+            self._stream = resampler.stream()
+        return self._stream(decode_samples(samples, sample_format))
+
+    def decode_bytes(self, data: bytes) -> np.ndarray:
+        """Decode a raw payload in the negotiated format and rate."""
+        samples = np.frombuffer(data, dtype=SAMPLE_DTYPES[self.sample_format])
+        return self._to_target(samples, self.sample_format, self.sample_rate)
+
+    def decode_frame(self, frame: AudioFrame) -> np.ndarray:
+        """Decode a binary frame, honouring per-frame header overrides."""
+        return self._to_target(frame.samples, frame.sample_format, frame.sample_rate or self.sample_rate)
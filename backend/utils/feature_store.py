@@ -0,0 +1,323 @@
+"""
+Memory-mapped columnar store of per-chunk acoustic features.
+
+Every chunk the acoustic tier analyzes becomes one row of a per-call table:
+float32 feature columns (energy, pitch, artifact scores, the chunk's mean
+MFCC vector and the combined risk score) plus an int64 timestamp column in
+nanoseconds. Each column of each call is its own flat file, so a reader maps
+a column with np.memmap and gets a zero-copy view of the whole call, or of a
+time range of it.
+
+    <root>/schema.json              column names, dtypes and shapes
+    <root>/index.jsonl              one {"session_id", "key"} line per call
+    <root>/calls/<key>/<column>.bin raw little-endian column data
+
+The index maps Call.session_id to the call's directory. Rows are buffered per
+call and appended in batches of flush_rows (and when the call ends), so
+writers never hold files open between flushes. A call's row count is that of
+its shortest column, which keeps readers consistent with a flush that was cut
+short (an I/O error or a crash between columns); the next flush first
+truncates every column back to that count, so later rows stay aligned. Each call has a single writer (the process owning its session); index
+lines are small O_APPEND writes, safe across processes. Within a process,
+the shared lock only guards the buffers and the index: file writes happen
+under a per-call lock, so one call's flush never stalls the others.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    from ..app.config import settings
+except Exception:
+    # Minimal fallback settings for environments without pydantic
+    class _DummySettings:
+        feature_store_enabled = False
+        feature_store_path = "data/features"
+        feature_store_flush_rows = 64
+    settings = _DummySettings()
+
+logger = logging.getLogger(__name__)
+
+N_MFCC = 13
+
+# Scalar float32 features, taken from the acoustic result by name (NaN if absent)
+SCALAR_FEATURES = (
+    "duration", "rms_energy", "pitch_mean", "pitch_variance", "pitch_range", "pitch_variation",
+    "emotional_range", "artifact_score", "centroid_variation", "rolloff_consistency",
+    "flatness_uniformity",
+)
+
+Schema = Dict[str, Tuple[np.dtype, Tuple[int, ...]]]
+
+
+def default_schema(n_mfcc: int = N_MFCC) -> Schema:
+    """Column name -> (dtype, per-row shape)."""
+    schema: Schema = {"timestamp": (np.dtype("<i8"), ())}
+    schema.update({name: (np.dtype("<f4"), ()) for name in SCALAR_FEATURES})
+    schema["risk_score"] = (np.dtype("<f4"), ())
+    schema["mfcc"] = (np.dtype("<f4"), (n_mfcc,))
+    return schema
+
+
+def _schema_to_json(schema: Schema) -> Dict[str, Any]:
+    return {name: {"dtype": dtype.str, "shape": list(shape)} for name, (dtype, shape) in schema.items()}
+
+
+def _row_bytes(dtype: np.dtype, shape: Tuple[int, ...]) -> int:
+    return dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+
+
+class FeatureStore:
+    """
+    Per-call columnar feature tables under a data directory.
+
+    Args:
+        root: Data directory (created if missing)
+        n_mfcc: Width of the mfcc column
+        flush_rows: Buffered rows per call that trigger an append to disk
+    """
+
+    def __init__(self, root: Union[str, Path], n_mfcc: int = N_MFCC, flush_rows: int = 64):
+        self.root = Path(root)
+        self.schema = default_schema(n_mfcc)
+        self.n_mfcc = n_mfcc
+        self.flush_rows = max(1, flush_rows)
+        self._lock = threading.Lock()
+        self._index: Dict[str, str] = {}
+        self._index_size = 0
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        # Per-call locks keep a call's batches in order while they are written
+        self._write_locks: Dict[str, threading.Lock] = {}
+        self._open()
+
+    def _open(self) -> None:
+        (self.root / "calls").mkdir(parents=True, exist_ok=True)
+        schema_path = self.root / "schema.json"
+        expected = _schema_to_json(self.schema)
+        if schema_path.exists():
+            stored = json.loads(schema_path.read_text())
+            if stored != expected:
+                raise ValueError(f"feature store at {self.root} has a different schema")
+        else:
+            schema_path.write_text(json.dumps(expected, indent=2) + "\n")
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Read index lines added since the last load (e.g. by another process)."""
+        path = self.root / "index.jsonl"
+        if not path.exists():
+            return
+        with open(path, "rb") as f:
+            f.seek(self._index_size)
+            data = f.read()
+        # Only complete lines; a line being written is picked up next time
+        complete = data[:data.rfind(b"\n") + 1]
+        self._index_size += len(complete)
+        for line in complete.splitlines():
+            entry = json.loads(line)
+            self._index[entry["session_id"]] = entry["key"]
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return hashlib.sha1(session_id.encode("utf-8")).hexdigest()[:20]
+
+    def _call_dir(self, session_id: str, create: bool = False) -> Optional[Path]:
+        with self._lock:
+            key = self._index.get(session_id)
+            if key is None:
+                self._load_index()
+                key = self._index.get(session_id)
+            if key is None:
+                if not create:
+                    return None
+                key = self._key(session_id)
+                (self.root / "calls" / key).mkdir(exist_ok=True)
+                line = json.dumps({"session_id": session_id, "key": key, "created": time.time()}) + "\n"
+                with open(self.root / "index.jsonl", "a", encoding="utf-8") as f:
+                    f.write(line)
+                self._index[session_id] = key
+        return self.root / "calls" / key
+
+    # Writing
+
+    def row_from_result(self, acoustic_result: Dict[str, Any], risk_score: float = float("nan"),
+                        timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Build a row from an AcousticAnalyzer / StreamingAcousticAnalyzer result.
+
+        Args:
+            acoustic_result: Chunk features; missing scalars are stored as NaN
+            risk_score: Combined risk score of the chunk
+            timestamp: Unix seconds (default: now)
+
+        Returns:
+            Dictionary with one value per column
+        """
+        ts = time.time() if timestamp is None else timestamp
+        row: Dict[str, Any] = {"timestamp": int(ts * 1e9), "risk_score": risk_score}
+        for name in SCALAR_FEATURES:
+            value = acoustic_result.get(name)
+            row[name] = float(value) if value is not None else float("nan")
+        mfcc = np.asarray(acoustic_result.get("mfcc", ()), dtype=np.float32)
+        if mfcc.ndim == 2 and mfcc.shape[0] and mfcc.shape[1] == self.n_mfcc:
+            row["mfcc"] = mfcc.mean(axis=0)
+        else:
+            row["mfcc"] = np.full(self.n_mfcc, np.nan, dtype=np.float32)
+        return row
+
+    def append(self, session_id: str, acoustic_result: Dict[str, Any], risk_score: float = float("nan"),
+               timestamp: Optional[float] = None) -> None:
+        """Buffer one analyzed chunk of a call; written once flush_rows are pending."""
+        row = self.row_from_result(acoustic_result, risk_score, timestamp)
+        with self._lock:
+            rows = self._buffers.setdefault(session_id, [])
+            rows.append(row)
+            full = len(rows) >= self.flush_rows
+        if full:
+            self._flush_call(session_id)
+
+    def _flush_call(self, session_id: str) -> None:
+        with self._lock:
+            write_lock = self._write_locks.setdefault(session_id, threading.Lock())
+        # Take the rows only once this call's earlier batch is written
+        with write_lock:
+            with self._lock:
+                rows = self._buffers.pop(session_id, None)
+            if not rows:
+                return
+            try:
+                self._write_rows(session_id, rows)
+            except OSError as e:
+                logger.error("Feature store flush failed for session %s: %s", session_id, e)
+
+    def _write_rows(self, session_id: str, rows: List[Dict[str, Any]]) -> None:
+        call_dir = self._call_dir(session_id, create=True)
+        # Drop the tail of an earlier flush that did not reach every column
+        committed = self.num_rows(session_id)
+        for name, (dtype, shape) in self.schema.items():
+            column = np.asarray([row[name] for row in rows], dtype=dtype).reshape((len(rows),) + shape)
+            with open(call_dir / f"{name}.bin", "ab") as f:
+                f.truncate(committed * _row_bytes(dtype, shape))
+                f.write(column.tobytes())
+
+    def flush(self, session_id: Optional[str] = None) -> None:
+        """Write buffered rows of one call (or of all calls)."""
+        if session_id is None:
+            with self._lock:
+                session_ids = list(self._buffers)
+        else:
+            session_ids = [session_id]
+        for sid in session_ids:
+            self._flush_call(sid)
+
+    def close_call(self, session_id: str) -> None:
+        """The call ended: write its remaining rows."""
+        self.flush(session_id)
+        with self._lock:
+            self._write_locks.pop(session_id, None)
+
+    # Reading
+
+    def sessions(self) -> List[str]:
+        """Session ids of all calls in the store."""
+        with self._lock:
+            self._load_index()
+            return list(self._index)
+
+    def __contains__(self, session_id: str) -> bool:
+        return self._call_dir(session_id) is not None
+
+    def num_rows(self, session_id: str) -> int:
+        call_dir = self._call_dir(session_id)
+        if call_dir is None:
+            return 0
+        counts = []
+        for name, (dtype, shape) in self.schema.items():
+            path = call_dir / f"{name}.bin"
+            counts.append(path.stat().st_size // _row_bytes(dtype, shape) if path.exists() else 0)
+        return min(counts)
+
+    def _column(self, call_dir: Path, name: str, rows: int) -> np.ndarray:
+        dtype, shape = self.schema[name]
+        if rows == 0:
+            return np.empty((0,) + shape, dtype=dtype)
+        return np.memmap(call_dir / f"{name}.bin", dtype=dtype, mode="r", shape=(rows,) + shape)
+
+    def read_call(self, session_id: str, columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Zero-copy views of a call's columns.
+
+        Args:
+            session_id: Call.session_id
+            columns: Columns to map (default: all)
+
+        Returns:
+            Column name -> read-only memmap of shape (rows, *column shape)
+
+        Raises:
+            KeyError: If the call is not in the store
+        """
+        call_dir = self._call_dir(session_id)
+        if call_dir is None:
+            raise KeyError(session_id)
+        names = list(columns) if columns is not None else list(self.schema)
+        unknown = [name for name in names if name not in self.schema]
+        if unknown:
+            raise ValueError(f"unknown columns {unknown}")
+        rows = self.num_rows(session_id)
+        return {name: self._column(call_dir, name, rows) for name in names}
+
+    def read_range(self, start: float, end: float, session_ids: Optional[Iterable[str]] = None,
+                   columns: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Rows with start <= timestamp < end, per call, as zero-copy slices.
+
+        Args:
+            start: Range start, Unix seconds
+            end: Range end, Unix seconds
+            session_ids: Calls to read (default: all)
+            columns: Columns to return (default: all)
+
+        Returns:
+            session_id -> column name -> memmap slice, for calls with rows in range
+        """
+        lo, hi = int(start * 1e9), int(end * 1e9)
+        names = list(columns) if columns is not None else list(self.schema)
+        out: Dict[str, Dict[str, np.ndarray]] = {}
+        for session_id in (list(session_ids) if session_ids is not None else self.sessions()):
+            if session_id not in self:
+                continue
+            call = self.read_call(session_id, set(names) | {"timestamp"})
+            # Timestamps are appended in arrival order, so each call is sorted
+            first, last = np.searchsorted(call["timestamp"], [lo, hi])
+            if last > first:
+                out[session_id] = {name: call[name][first:last] for name in names}
+        return out
+
+
+_default_store: Optional[FeatureStore] = None
+
+
+def get_feature_store() -> Optional[FeatureStore]:
+    """Return the process-wide store, or None unless settings.feature_store_enabled is on."""
+    global _default_store
+    if _default_store is None and getattr(settings, "feature_store_enabled", False):
+        _default_store = FeatureStore(
+            getattr(settings, "feature_store_path", "data/features"),
+            flush_rows=getattr(settings, "feature_store_flush_rows", 64),
+        )
+        logger.info("Storing per-chunk acoustic features under %s", _default_store.root)
+    return _default_store
+
+
+def flush_feature_store() -> None:
+    """Write the rows buffered in this process (app shutdown, analysis worker exit)."""
+    if _default_store is not None:
+        _default_store.flush()
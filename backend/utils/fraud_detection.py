@@ -1,17 +1,76 @@
+import functools
 import re
+import time
 from typing import List, Dict, Any, Optional
 import logging
 
-logger = logging.getLogger(__name__)
+import numpy as np
+
+from .analysis_scheduler import AcousticScheduler
+from .feature_store import get_feature_store
+from .keyword_matcher import KeywordAutomaton, KeywordHits
+from .session_state import SessionState, SessionStateRegistry
+from ..ai_ml.vad import NO_SPEECH_RESULT, VoiceActivityDetector
+from ..app.metrics import timer
 
-# Make AI/ML analyzer imports resilient so tests and lightweight runs do not
-# fail when heavy optional dependencies (like librosa) are not installed.
 try:
-    from ..ai_ml.acoustic_analysis import AcousticAnalyzer  # type: ignore
+    from ..app.config import settings
 except Exception:
-    class AcousticAnalyzer:  # type: ignore
-        def analyze_audio_chunk(self, audio_data):
-            return {"artifact_score": 0.0, "rms_energy": 0.0, "duration": 0.0}
+    # Minimal fallback settings for environments without pydantic
+    class _DummySettings:
+        session_max_count = 10000
+        session_ttl_seconds = 1800.0
+        acoustic_base_interval = 10
+        acoustic_escalate_risk = 0.4
+        acoustic_hold_chunks = 10
+        vad_enabled = True
+        vad_energy_floor_db = -50.0
+    settings = _DummySettings()
+
+logger = logging.getLogger(__name__)
+
+# Session used by warm_up; released again when it finishes
+WARMUP_SESSION_ID = "__warmup__"
+
+
+class _StubAcousticAnalyzer:
+    """Stand-in used when the librosa-based analyzer cannot be imported."""
+
+    def __init__(self, sample_rate: int = 16000):
+        self.sample_rate = sample_rate
+
+    def analyze_audio_chunk(self, audio_data):
+        return {"artifact_score": 0.0, "rms_energy": 0.0, "duration": 0.0}
+
+
+@functools.lru_cache(maxsize=None)
+def _acoustic_stack():
+    """
+    (AcousticAnalyzer, StreamingAcousticAnalyzer, BatchSpectralExtractor),
+    imported on first use.
+
+    librosa and scipy dominate import time, so web workers and test
+    collection only pay for them once audio is analyzed. The imports stay
+    resilient: without the optional dependencies the acoustic tier is a stub
+    and the streaming/batched classes are None.
+    """
+    try:
+        from ..ai_ml.acoustic_analysis import AcousticAnalyzer
+    except Exception:
+        AcousticAnalyzer = _StubAcousticAnalyzer
+
+    try:
+        from ..ai_ml.streaming_acoustic import StreamingAcousticAnalyzer
+    except Exception:
+        StreamingAcousticAnalyzer = None
+
+    try:
+        from ..ai_ml.batch_acoustic import BatchSpectralExtractor
+    except Exception:
+        BatchSpectralExtractor = None
+
+    return AcousticAnalyzer, StreamingAcousticAnalyzer, BatchSpectralExtractor
+
 
 try:
     from ..ai_ml.behavioral_analysis import BehavioralAnalyzer  # type: ignore
@@ -20,9 +79,12 @@ except Exception:
         def analyze_call_behavior(self, call_data: Dict[str, any]) -> Dict[str, float]:
             return {"behavioral_risk_score": 0.0}
 
+        def observe_text(self, text_chunk: str) -> None:
+            pass
+
 
 class FraudDetectionService:
-    def __init__(self):
+    def __init__(self, lexicon: Optional[Dict[str, List[str]]] = None, sample_rate: int = 16000):
         # Simple keyword-based fraud detection for demo
         self.fraud_keywords = [
             "urgent", "wire transfer", "bank account", "social security",
@@ -30,9 +92,26 @@ class FraudDetectionService:
         ]
         self.high_risk_keywords = ["immediate action", "confidential", "secret"]
 
-        # Initialize AI/ML analyzers (may be simple stubs if heavy deps missing)
-        self.acoustic_analyzer = AcousticAnalyzer()
+        # Additional scam-category phrase lists; reported per category but
+        # only the fraud/high_risk categories feed the keyword score
+        self.lexicon: Dict[str, List[str]] = dict(lexicon or {})
+        self.build_keyword_matcher()
+
+        # Initialize AI/ML analyzers (may be simple stubs if heavy deps missing);
+        # the acoustic analyzer is built on first use, see _acoustic_stack
+        self.sample_rate = sample_rate
+        self._acoustic_analyzer = None
         self.behavioral_analyzer = BehavioralAnalyzer()
+        self._batch_extractor = None
+        # Per-chunk acoustic features kept for retraining (None unless enabled)
+        self.feature_store = get_feature_store()
+
+        # Per-call analyzer state, keyed by call session_id
+        self.sessions = SessionStateRegistry(
+            self._new_session_state,
+            max_sessions=getattr(settings, "session_max_count", 10000),
+            ttl_seconds=getattr(settings, "session_ttl_seconds", 1800.0),
+        )
 
         # Risk scoring weights
         self.weights = {
@@ -42,37 +121,70 @@ class FraudDetectionService:
             'semantic_score': 0.2
         }
 
-    def analyze_data(self, data: str) -> float:
-        """
-        Analyze text/audio data and return risk score (0.0 to 1.0)
-        """
+    @property
+    def acoustic_analyzer(self):
+        if self._acoustic_analyzer is None:
+            self._acoustic_analyzer = _acoustic_stack()[0](sample_rate=self.sample_rate)
+        return self._acoustic_analyzer
+
+    def build_keyword_matcher(self) -> None:
+        """(Re)compile the keyword automaton; call after editing the keyword lists."""
+        self.keyword_matcher = KeywordAutomaton({
+            **self.lexicon,
+            "fraud": self.fraud_keywords,
+            "high_risk": self.high_risk_keywords,
+        })
+
+    def _keyword_score(self, hits: KeywordHits) -> float:
         risk_score = 0.0
-        data_lower = data.lower()
-        
+
         # Count fraud keywords
-        keyword_count = sum(1 for keyword in self.fraud_keywords if keyword in data_lower)
+        keyword_count = len(hits.keywords("fraud"))
         risk_score += min(keyword_count * 0.1, 0.5)
-        
+
         # Check for high-risk keywords
-        high_risk_count = sum(1 for keyword in self.high_risk_keywords if keyword in data_lower)
+        high_risk_count = len(hits.keywords("high_risk"))
         risk_score += min(high_risk_count * 0.2, 0.3)
-        
+
         # Check for suspicious patterns (e.g., repeated urgent words)
-        urgent_count = data_lower.count("urgent")
+        urgent_count = hits.count("urgent", "fraud")
         risk_score += min(urgent_count * 0.05, 0.2)
-        
+
         return min(risk_score, 1.0)
-    
-    def analyze_audio_transcript(self, transcript: str) -> dict:
+
+    def analyze_data(self, data: str) -> float:
+        """
+        Analyze text/audio data and return risk score (0.0 to 1.0)
+        """
+        return self._keyword_score(self.keyword_matcher.scan(data))
+
+    def analyze_audio_transcript(self, transcript: str, session_id: Optional[str] = None) -> dict:
         """
         Analyze audio transcript and return detailed analysis
+
+        With a session_id, behavioral analysis uses that call's own analyzer
+        and its recent transcript window.
         """
-        # Use behavioral analyzer in a compatible way
-        behavioral_analysis = self.behavioral_analyzer.analyze_call_behavior({"text_chunks": [transcript]})
+        if session_id is not None:
+            state = self.sessions.get(session_id)
+            behavioral_analyzer = state.behavioral
+            behavioral_analyzer.observe_text(transcript)
+            # Pauses and speaking time measured by the session's voice activity gate
+            call_data = state.vad.call_data() if state.vad is not None else {}
+            # Call-level pitch statistics from the streaming acoustic tier
+            pitch_features = state.acoustic.pitch_stats.summary() if state.acoustic is not None else {}
+            if pitch_features:
+                call_data = {**call_data, "acoustic_features": pitch_features}
+            behavioral_analysis = behavioral_analyzer.analyze_call_behavior(call_data)
+        else:
+            # Use behavioral analyzer in a compatible way
+            behavioral_analysis = self.behavioral_analyzer.analyze_call_behavior({"text_chunks": [transcript]})
 
-        # Keyword analysis
-        keyword_score = self.analyze_data(transcript)
-        detected_keywords = [kw for kw in self.fraud_keywords if kw in transcript.lower()]
+        # Keyword analysis (single pass over the transcript)
+        hits = self.keyword_matcher.scan(transcript)
+        keyword_score = self._keyword_score(hits)
+        found = hits.keywords("fraud")
+        detected_keywords = [kw for kw in self.fraud_keywords if kw in found]
 
         # Calculate combined score
         combined_score = (
@@ -87,26 +199,124 @@ class FraudDetectionService:
             "keyword_risk": keyword_score,
             "behavioral_risk": behavioral_analysis.get('behavioral_risk_score', 0.0),
             "detected_keywords": detected_keywords,
+            "keyword_categories": dict(hits.category_counts),
             "behavioral_analysis": behavioral_analysis,
             "recommendation": "High risk - investigate immediately" if combined_score > 0.7 else "Monitor closely" if combined_score > 0.4 else "Low risk"
         }
 
-    def analyze_audio_data(self, audio_array, transcript: Optional[str] = None) -> dict:
-        """Analyze raw audio data (numpy array) and optional transcript."""
+    def _new_session_state(self, session_id: str) -> SessionState:
+        scheduler = AcousticScheduler(
+            base_interval=getattr(settings, "acoustic_base_interval", 10),
+            escalate_risk=getattr(settings, "acoustic_escalate_risk", 0.4),
+            hold_chunks=getattr(settings, "acoustic_hold_chunks", 10),
+        )
+        return SessionState(session_id, behavioral=BehavioralAnalyzer(), scheduler=scheduler,
+                            vad=self._new_vad() if getattr(settings, "vad_enabled", True) else None)
+
+    def _new_vad(self) -> VoiceActivityDetector:
+        return VoiceActivityDetector(
+            sample_rate=self.sample_rate,
+            energy_floor_db=getattr(settings, "vad_energy_floor_db", -50.0),
+        )
+
+    def _voice_activity(self, audio_array, session_id: Optional[str] = None) -> bool:
+        """Run the voice activity gate over a chunk; True if it may contain speech."""
+        if session_id is not None:
+            vad = self.sessions.get(session_id).vad
+        else:
+            vad = self._new_vad() if getattr(settings, "vad_enabled", True) else None
+        if vad is None:
+            return True
+        with timer("analysis.vad"):
+            return vad.process(audio_array)["speech"]
+
+    def _stream_analyzer(self, session_id: str):
+        state = self.sessions.get(session_id)
+        if state.acoustic is None:
+            state.acoustic = _acoustic_stack()[1](self.acoustic_analyzer)
+        return state.acoustic
+
+    def release_session(self, session_id: str) -> None:
+        """Drop all per-session analysis state (call ended or disconnected)."""
+        self.sessions.release(session_id)
+        if self.feature_store is not None:
+            self.feature_store.close_call(session_id)
+
+    def warm_up(self) -> Dict[str, float]:
+        """
+        Build cached DSP tables and run synthetic audio through every path.
+
+        The mel filterbank, window and DCT matrices are built for the
+        analyzer's configured sample rate and FFT size, and a voiced chunk
+        goes through the standalone, streaming and batched analysis, so the
+        first real call does not pay for librosa internals, table
+        construction or first-use allocations.
+
+        Returns:
+            Seconds spent per warm-up step
+        """
+        timings: Dict[str, float] = {}
+        analyzer = self.acoustic_analyzer
+        sample_rate = getattr(analyzer, "sample_rate", 16000)
+
+        start = time.perf_counter()
+        if hasattr(analyzer, "mel_basis"):
+            analyzer.mel_basis
+        batch_extractor = _acoustic_stack()[2]
+        if batch_extractor is not None and self._batch_extractor is None:
+            self._batch_extractor = batch_extractor(analyzer)
+        timings["tables"] = time.perf_counter() - start
+
+        # One second of a noisy tone, so VAD, pitch and every feature run
+        t = np.arange(sample_rate) / sample_rate
+        rng = np.random.default_rng(0)
+        chunk = (0.2 * np.sin(2 * np.pi * 150 * t) + 0.02 * rng.standard_normal(t.size)).astype(np.float32)
+
+        start = time.perf_counter()
+        analyzer.analyze_audio_chunk(chunk)
+        timings["chunk"] = time.perf_counter() - start
+
+        # A keyword keeps the scheduler from skipping the follow-up chunks
+        start = time.perf_counter()
         try:
-            acoustic_result = self.acoustic_analyzer.analyze_audio_chunk(audio_array)
-        except Exception:
-            acoustic_result = {"artifact_score": 0.0}
+            self.analyze_audio_data(chunk, "urgent", session_id=WARMUP_SESSION_ID)
+            step = sample_rate // 10
+            self.analyze_audio_batch([
+                {"audio": chunk[i:i + step], "transcript": "urgent", "session_id": WARMUP_SESSION_ID}
+                for i in range(0, 2 * step, step)
+            ])
+        finally:
+            self.release_session(WARMUP_SESSION_ID)
+        timings["stream"] = time.perf_counter() - start
+        return timings
 
-        acoustic_score = acoustic_result.get("artifact_score", 0.0)
+    def _semantic_tier(self, transcript: Optional[str], session_id: Optional[str]) -> dict:
+        if not transcript:
+            return {}
+        with timer("analysis.semantic"):
+            return self.analyze_audio_transcript(transcript, session_id=session_id)
 
-        semantic_result = {}
-        keyword_score = 0.0
-        detected_keywords = []
-        if transcript:
-            semantic_result = self.analyze_audio_transcript(transcript)
-            keyword_score = semantic_result.get("keyword_risk", 0.0)
-            detected_keywords = semantic_result.get("detected_keywords", [])
+    def _acoustic_due(self, session_id: str, semantic_result: dict, speech: bool = True):
+        """Return (stream analyzer, scheduler, run acoustic tier for this chunk?)."""
+        stream = self._stream_analyzer(session_id)
+        scheduler = self.sessions.get(session_id).scheduler
+        # Chunks without speech never count towards the acoustic cadence
+        due = speech and scheduler.should_run(
+            semantic_result.get("risk_score", 0.0), keyword_hit=semantic_result.get("keyword_risk", 0.0) > 0
+        )
+        return stream, scheduler, due
+
+    def _store_features(self, session_id: str, result: dict) -> None:
+        """Keep the features of a freshly analyzed chunk in the feature store."""
+        acoustic_result = result["acoustic_result"]
+        # Failed analyses carry no features; warm-up audio is synthetic
+        if self.feature_store is None or "mfcc" not in acoustic_result or session_id == WARMUP_SESSION_ID:
+            return
+        self.feature_store.append(session_id, acoustic_result, result["overall_risk_score"])
+
+    def _combine(self, acoustic_result: dict, semantic_result: dict, scheduler=None) -> dict:
+        acoustic_score = acoustic_result.get("artifact_score", 0.0)
+        keyword_score = semantic_result.get("keyword_risk", 0.0)
 
         # Combine scores simply for now
         combined_score = (
@@ -115,10 +325,135 @@ class FraudDetectionService:
             self.weights['behavioral_score'] * semantic_result.get('behavioral_risk', 0.0)
         )
         combined_score = min(max(combined_score, 0.0), 1.0)
+        if scheduler is not None:
+            scheduler.observe(combined_score)
 
         return {
             "overall_risk_score": combined_score,
             "acoustic_result": acoustic_result,
-            "detected_keywords": detected_keywords,
+            "detected_keywords": semantic_result.get("detected_keywords", []),
             "semantic_result": semantic_result
         }
+
+    def analyze_audio_data(self, audio_array, transcript: Optional[str] = None,
+                           session_id: Optional[str] = None) -> dict:
+        """Analyze raw audio data (numpy array) and optional transcript.
+
+        When a session_id is given, the chunk is treated as the continuation of
+        that call's audio and analyzed incrementally. Keyword and behavioral
+        tiers run on every message; the acoustic tier runs at the cadence the
+        session's AcousticScheduler picks, and skipped chunks reuse the last
+        acoustic features. Chunks the voice activity gate finds silent get
+        the no-speech result without any acoustic analysis.
+        """
+        # Cheap tiers first: they drive acoustic scheduling, and the gate
+        # feeds pause timing to the behavioral tier
+        speech = self._voice_activity(audio_array, session_id)
+        semantic_result = self._semantic_tier(transcript, session_id)
+
+        scheduler = None
+        analyzed = False
+        try:
+            if session_id is not None and _acoustic_stack()[1] is not None:
+                stream, scheduler, due = self._acoustic_due(session_id, semantic_result, speech)
+                if not speech:
+                    acoustic_result = stream.silence(audio_array)
+                elif due:
+                    with timer("analysis.acoustic"):
+                        acoustic_result = stream.analyze_chunk(audio_array)
+                    analyzed = True
+                else:
+                    acoustic_result = stream.skip(audio_array)
+            elif not speech:
+                acoustic_result = {**NO_SPEECH_RESULT, "duration": len(audio_array) / self.sample_rate}
+            else:
+                with timer("analysis.acoustic"):
+                    acoustic_result = self.acoustic_analyzer.analyze_audio_chunk(audio_array)
+        except Exception:
+            acoustic_result = {"artifact_score": 0.0}
+
+        result = self._combine(acoustic_result, semantic_result, scheduler)
+        if analyzed:
+            self._store_features(session_id, result)
+        return result
+
+    def _analyze_staged(self, staged: list, acoustic_results: Dict[int, dict]) -> None:
+        """Batched spectral pass for staged (index, stream, ..., audio, frames) entries."""
+        extractor = self._batch_extractor
+        framed = []
+        for entry, magnitude in zip(staged, extractor.magnitudes([entry[-1] for entry in staged])):
+            index, stream, _, _, audio, _ = entry
+            if magnitude.shape[1] == 0:
+                acoustic_results[index] = stream.last_result(audio)
+                continue
+            stream.reduce_noise(magnitude)
+            framed.append((entry, magnitude))
+        if not framed:
+            return
+        spectra = [magnitude for _, magnitude in framed]
+        for ((index, stream, _, _, audio, _), magnitude), mfcc, frames in zip(
+                framed, extractor.mfccs(spectra), extractor.frame_features(spectra)):
+            acoustic_results[index] = stream.features(magnitude, audio, mfcc=mfcc, frames=frames)
+
+    def analyze_audio_batch(self, items: List[Dict[str, Any]]) -> List[dict]:
+        """
+        Analyze chunks from many sessions with one batched spectral pass.
+
+        Each item holds "audio" and optional "transcript" / "session_id", as
+        for analyze_audio_data. The new frames of every chunk due for the
+        acoustic tier are transformed together (one rfft, one mel/DCT);
+        noise tracking and the remaining features stay per session.
+
+        Args:
+            items: Chunks in arrival order (a session may appear repeatedly)
+
+        Returns:
+            One analyze_audio_data-style result per item, in the same order
+        """
+        _, streaming, batch_extractor = _acoustic_stack()
+        if batch_extractor is None or streaming is None:
+            return [self.analyze_audio_data(item["audio"], item.get("transcript"), item.get("session_id"))
+                    for item in items]
+        if self._batch_extractor is None:
+            self._batch_extractor = batch_extractor(self.acoustic_analyzer)
+
+        results: List[Optional[dict]] = [None] * len(items)
+        acoustic_results: Dict[int, dict] = {}
+        staged, deferred = [], []
+        last_staged: Dict[str, int] = {}
+        for index, item in enumerate(items):
+            audio, session_id = item["audio"], item.get("session_id")
+            if session_id is None:
+                results[index] = self.analyze_audio_data(audio, item.get("transcript"))
+                continue
+            speech = self._voice_activity(audio, session_id)
+            semantic_result = self._semantic_tier(item.get("transcript"), session_id)
+            stream, scheduler, due = self._acoustic_due(session_id, semantic_result, speech)
+            if not speech:
+                results[index] = self._combine(stream.silence(audio), semantic_result, scheduler)
+            elif due:
+                staged.append((index, stream, scheduler, semantic_result, audio, stream.take(audio)))
+                last_staged[session_id] = index
+            elif session_id in last_staged:
+                # Reuses features of an earlier chunk of this batch, not yet computed
+                stream.skip(audio)
+                deferred.append((index, last_staged[session_id], scheduler, semantic_result, audio, stream))
+            else:
+                results[index] = self._combine(stream.skip(audio), semantic_result, scheduler)
+
+        try:
+            for group in self._batch_extractor.group(staged, [len(entry[-1]) for entry in staged]):
+                with timer("analysis.batch_spectral"):
+                    self._analyze_staged(group, acoustic_results)
+        except Exception as e:
+            logger.error("Batched acoustic analysis failed: %s", e)
+
+        for index, _, scheduler, semantic_result, _, _ in staged:
+            acoustic_result = acoustic_results.get(index, {"artifact_score": 0.0})
+            results[index] = self._combine(acoustic_result, semantic_result, scheduler)
+            self._store_features(items[index]["session_id"], results[index])
+        for index, source, scheduler, semantic_result, audio, stream in deferred:
+            acoustic_result = {**acoustic_results.get(source, {"artifact_score": 0.0}),
+                               "duration": len(audio) / stream.sample_rate, "new_frames": 0, "skipped": True}
+            results[index] = self._combine(acoustic_result, semantic_result, scheduler)
+        return results
@@ -0,0 +1,104 @@
+"""
+Keyword Matcher for Fraud Detection
+
+Compiles a categorized keyword lexicon into an Aho-Corasick automaton so a
+transcript is scanned once, in time linear in its length, regardless of how
+many phrases the lexicon holds.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordMatch(NamedTuple):
+    keyword: str
+    category: str
+    start: int
+    end: int
+
+
+class KeywordHits:
+    """All matches found in one text, with per-keyword and per-category counts."""
+
+    def __init__(self, matches: List[KeywordMatch]):
+        self.matches = matches
+        self.counts: Counter = Counter((m.category, m.keyword) for m in matches)
+        self.category_counts: Counter = Counter(m.category for m in matches)
+
+    def keywords(self, category: str) -> Set[str]:
+        """Distinct keywords of a category that occur in the text."""
+        return {keyword for (cat, keyword) in self.counts if cat == category}
+
+    def count(self, keyword: str, category: str) -> int:
+        return self.counts[(category, keyword)]
+
+    def offsets(self, keyword: str) -> List[Tuple[int, int]]:
+        return [(m.start, m.end) for m in self.matches if m.keyword == keyword]
+
+
+class KeywordAutomaton:
+    """
+    Case-insensitive multi-pattern substring matcher (Aho-Corasick).
+
+    Args:
+        lexicon: Mapping of category name to the phrases in that category.
+            A phrase listed under several categories is reported once per
+            category.
+    """
+
+    def __init__(self, lexicon: Dict[str, Iterable[str]]):
+        self.lexicon = {category: [p.lower() for p in phrases if p]
+                        for category, phrases in lexicon.items()}
+        self._build()
+
+    def _build(self):
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Tuple[str, str]]] = [[]]
+
+        for category, phrases in self.lexicon.items():
+            for phrase in phrases:
+                state = 0
+                for char in phrase:
+                    nxt = goto[state].get(char)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[state][char] = nxt
+                        goto.append({})
+                        outputs.append([])
+                    state = nxt
+                if (phrase, category) not in outputs[state]:
+                    outputs[state].append((phrase, category))
+
+        # Breadth-first pass to compute failure links and merge outputs
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and char not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(char, 0) if goto[f].get(char, 0) != nxt else 0
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [tuple(o) for o in outputs]
+        logger.debug("Keyword automaton built with %d states", len(goto))
+
+    def iter_matches(self, text: str) -> Iterator[KeywordMatch]:
+        """Yield every (possibly overlapping) occurrence of every phrase."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for i, char in enumerate(text.lower()):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for phrase, category in outputs[state]:
+                yield KeywordMatch(phrase, category, i - len(phrase) + 1, i + 1)
+
+    def scan(self, text: str) -> KeywordHits:
+        return KeywordHits(list(self.iter_matches(text)))
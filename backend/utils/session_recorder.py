@@ -0,0 +1,360 @@
+"""
+Record and replay of /call/stream sessions.
+
+With settings.record_sessions enabled, the stream handler appends every
+inbound message to an append-only binary log, together with the session id
+and the time it arrived. The log can later be fed back through
+FraudDetectionService (scripts/replay_sessions.py) to reproduce a latency
+spike, benchmark on realistic traffic, or check that an optimization leaves
+the scores unchanged.
+
+The file starts with an 8-byte header (b"FDSR", version u8, 3 reserved
+bytes), followed by records, each a 16-byte little-endian header plus data:
+
+    offset  size  field
+    0       8     arrival time (float64, Unix seconds)
+    8       1     record kind (REC_*)
+    9       1     reserved, must be 0
+    10      2     session id length (uint16)
+    12      4     payload length (uint32)
+    16      ...   session id (UTF-8), then payload
+
+REC_OPEN carries the connect-time parameters as JSON, REC_TEXT and
+REC_BINARY the websocket message as received, REC_CLOSE nothing. Records are
+written by a background thread from a bounded queue, so the event loop never
+waits on the disk; when the queue is full or the file reaches max_bytes,
+records are dropped and counted. A reader stops cleanly at a truncated tail.
+
+Each log has exactly one writer. With several uvicorn workers (run.py
+--workers N, settings.session_router == "broker"), every worker records to
+its own file, named after the configured path with the process id inserted
+(logs/sessions.<pid>.rec), so records never interleave. merge_records reads
+several logs back as one stream in arrival order; a session that reconnected
+to another worker appears in both files.
+"""
+
+import base64
+import heapq
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from .audio_codecs import SessionCodec
+from .stream_protocol import FrameError, decode_frame
+from ..app.metrics import registry
+
+try:
+    from ..app.config import settings
+except Exception:
+    # Minimal fallback settings for environments without pydantic
+    class _DummySettings:
+        record_sessions = False
+        record_path = "logs/sessions.rec"
+        record_max_bytes = 1 << 30
+        record_queue_size = 10000
+        session_router = "local"
+    settings = _DummySettings()
+
+logger = logging.getLogger(__name__)
+
+FILE_MAGIC = b"FDSR"
+FILE_VERSION = 1
+FILE_HEADER = FILE_MAGIC + bytes([FILE_VERSION, 0, 0, 0])
+RECORD_HEADER = struct.Struct("<dBBHI")
+
+# Record kinds
+REC_OPEN = 1
+REC_TEXT = 2
+REC_BINARY = 3
+REC_CLOSE = 4
+
+
+class RecordFormatError(ValueError):
+    """Raised for files that are not session logs."""
+
+
+class Record(NamedTuple):
+    timestamp: float
+    kind: int
+    session_id: str
+    payload: bytes
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        """Connect-time parameters of a REC_OPEN record."""
+        return json.loads(self.payload) if self.payload else {}
+
+    @property
+    def message(self) -> Union[str, bytes]:
+        """The websocket message of a REC_TEXT / REC_BINARY record, as received."""
+        return self.payload.decode("utf-8") if self.kind == REC_TEXT else self.payload
+
+
+class SessionRecorder:
+    """
+    Append-only writer of stream session logs.
+
+    Args:
+        path: Log file; appended to if it exists
+        max_bytes: File size at which recording stops
+        queue_size: Records buffered for the writer thread before dropping
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = 1 << 30, queue_size: int = 10000):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(max(1, queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._full = False
+        self._closed = False
+        self.records = 0
+        self.dropped = 0
+        self.bytes_written = 0
+
+    def _ensure_writer(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            if f.tell() == 0:
+                f.write(FILE_HEADER)
+            self.bytes_written = f.tell()
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                if self.bytes_written + len(record) > self.max_bytes:
+                    if not self._full:
+                        logger.warning("Session log %s reached %d bytes; recording stopped",
+                                       self.path, self.max_bytes)
+                    self._full = True
+                    self.dropped += 1
+                    continue
+                f.write(record)
+                self.bytes_written += len(record)
+                self.records += 1
+                if self._queue.empty():
+                    f.flush()
+
+    def _put(self, kind: int, session_id: str, payload: bytes) -> None:
+        if self._closed or self._full:
+            self.dropped += 1
+            return
+        self._ensure_writer()
+        sid = session_id.encode("utf-8")
+        record = RECORD_HEADER.pack(time.time(), kind, 0, len(sid), len(payload)) + sid + payload
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def open_session(self, session_id: str, **params: Any) -> None:
+        """Record a new connection and its parameters (codec, sample_rate, encoding)."""
+        self._put(REC_OPEN, session_id, json.dumps(params).encode("utf-8"))
+
+    def record(self, session_id: str, message: Union[str, bytes]) -> None:
+        """Record an inbound websocket message exactly as received."""
+        if isinstance(message, bytes):
+            self._put(REC_BINARY, session_id, message)
+        else:
+            self._put(REC_TEXT, session_id, message.encode("utf-8"))
+
+    def close_session(self, session_id: str) -> None:
+        self._put(REC_CLOSE, session_id, b"")
+
+    def close(self) -> None:
+        """Write everything queued and stop the writer thread."""
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+def _read_exact(f: BinaryIO, size: int) -> Optional[bytes]:
+    data = f.read(size)
+    return data if len(data) == size else None
+
+
+def read_records(path: Union[str, Path]) -> Iterator[Record]:
+    """
+    Iterate over the records of a session log in arrival order.
+
+    Args:
+        path: Log written by SessionRecorder
+
+    Yields:
+        Record tuples; a record cut short by a crash ends the iteration
+
+    Raises:
+        RecordFormatError: If the file does not start with the log header
+    """
+    with open(path, "rb") as f:
+        header = f.read(len(FILE_HEADER))
+        if header[:4] != FILE_MAGIC:
+            raise RecordFormatError(f"{path} is not a session log")
+        if header[4] != FILE_VERSION:
+            raise RecordFormatError(f"unsupported session log version {header[4]}")
+        while True:
+            head = _read_exact(f, RECORD_HEADER.size)
+            if head is None:
+                return
+            timestamp, kind, _, sid_len, payload_len = RECORD_HEADER.unpack(head)
+            body = _read_exact(f, sid_len + payload_len)
+            if body is None:
+                return
+            yield Record(timestamp, kind, body[:sid_len].decode("utf-8"), body[sid_len:])
+
+
+def merge_records(paths: Iterable[Union[str, Path]]) -> Iterator[Record]:
+    """
+    Iterate over the records of several session logs (e.g. one per worker)
+    as one stream, in arrival order.
+
+    Args:
+        paths: Logs written by SessionRecorder
+
+    Yields:
+        Record tuples from all logs, ordered by timestamp
+    """
+    return heapq.merge(*(read_records(path) for path in paths), key=lambda record: record.timestamp)
+
+
+class SessionReplayer:
+    """
+    Feeds recorded messages through a FraudDetectionService the way the
+    stream handler does, one message at a time.
+
+    Args:
+        service: Analysis service to replay into
+        codec_factory: SessionCodec.from_params-compatible callable
+        max_transcript_length: Longest transcript the handler accepts
+    """
+
+    def __init__(self, service, codec_factory: Callable = SessionCodec.from_params,
+                 max_transcript_length: int = 5000):
+        self.service = service
+        self.codec_factory = codec_factory
+        self.max_transcript_length = max_transcript_length
+        self._codecs: Dict[str, Any] = {}
+
+    def _codec(self, session_id: str, params: Optional[Dict[str, Any]] = None):
+        codec = self._codecs.get(session_id)
+        if codec is None:
+            params = params or {}
+            codec = self._codecs[session_id] = self.codec_factory(
+                params.get("codec"), params.get("sample_rate"), self.service.sample_rate
+            )
+        return codec
+
+    def feed(self, record: Record) -> Optional[Tuple[str, float]]:
+        """
+        Replay one record.
+
+        Args:
+            record: Record from read_records
+
+        Returns:
+            (message kind, risk score) for messages the handler would have
+            analyzed; None for session open/close and rejected messages
+        """
+        sid = record.session_id
+        if record.kind == REC_OPEN:
+            self._codecs.pop(sid, None)
+            try:
+                self._codec(sid, record.params)
+            except ValueError:
+                pass
+            return None
+        if record.kind == REC_CLOSE:
+            self._codecs.pop(sid, None)
+            self.service.release_session(sid)
+            return None
+        try:
+            codec = self._codec(sid)
+        except ValueError:
+            # The handler closed sessions with an unsupported codec
+            return None
+        if record.kind == REC_BINARY:
+            try:
+                audio = codec.decode_frame(decode_frame(record.payload, codec.sample_format))
+            except (FrameError, ValueError):
+                return None
+            return "audio", self.service.analyze_audio_data(audio, None, session_id=sid)["overall_risk_score"]
+        if record.kind != REC_TEXT:
+            return None
+
+        try:
+            data = json.loads(record.message)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(data, dict):
+            return "text", self.service.analyze_audio_transcript(str(data), session_id=sid)["risk_score"]
+        if "transcript" in data:
+            transcript = data["transcript"]
+            if not isinstance(transcript, str) or len(transcript) > self.max_transcript_length:
+                return None
+            return "transcript", self.service.analyze_audio_transcript(transcript, session_id=sid)["risk_score"]
+        if "audio_data" in data:
+            try:
+                audio = codec.decode_bytes(base64.b64decode(data["audio_data"]))
+            except Exception:
+                return None
+            result = self.service.analyze_audio_data(audio, data.get("transcript"), session_id=sid)
+            return "audio", result["overall_risk_score"]
+        return None
+
+
+_recorder: Optional[SessionRecorder] = None
+
+
+def worker_record_path(path: Union[str, Path], pid: Optional[int] = None) -> Path:
+    """The log of one worker process: logs/sessions.rec -> logs/sessions.<pid>.rec."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.{os.getpid() if pid is None else pid}{path.suffix}")
+
+
+def get_session_recorder() -> Optional[SessionRecorder]:
+    """Return the process-wide recorder, or None unless settings.record_sessions is on."""
+    global _recorder
+    if _recorder is None and getattr(settings, "record_sessions", False):
+        path = getattr(settings, "record_path", "logs/sessions.rec")
+        if getattr(settings, "session_router", "local") == "broker":
+            # Several workers: one file each, so records cannot interleave
+            path = worker_record_path(path)
+        _recorder = SessionRecorder(
+            path,
+            max_bytes=getattr(settings, "record_max_bytes", 1 << 30),
+            queue_size=getattr(settings, "record_queue_size", 10000),
+        )
+        logger.info("Recording stream sessions to %s", _recorder.path)
+    return _recorder
+
+
+def shutdown_session_recorder() -> None:
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+
+def _recorder_counts():
+    if _recorder is None:
+        return None
+    return {(("result", "written"),): _recorder.records, (("result", "dropped"),): _recorder.dropped}
+
+
+registry.counter("fraud_session_records_total", "Stream messages recorded to the session log",
+                 _recorder_counts)
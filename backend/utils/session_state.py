@@ -0,0 +1,106 @@
+"""
+Session State Registry for Fraud Detection
+
+Holds per-call analyzer state keyed by session_id in a bounded structure so
+worker memory stays flat no matter how many calls it has served.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SessionState:
+    """Analyzer state owned by one call session."""
+
+    __slots__ = ("session_id", "behavioral", "acoustic", "scheduler", "vad", "created_at", "last_seen")
+
+    def __init__(self, session_id: str, behavioral: Any = None, acoustic: Any = None,
+                 scheduler: Any = None, vad: Any = None):
+        self.session_id = session_id
+        self.behavioral = behavioral
+        self.acoustic = acoustic
+        self.scheduler = scheduler
+        self.vad = vad
+        self.created_at = time.monotonic()
+        self.last_seen = self.created_at
+
+
+class SessionStateRegistry:
+    """
+    LRU + TTL bounded map of session_id -> SessionState.
+
+    Args:
+        factory: Builds a fresh SessionState for an unknown session_id
+        max_sessions: Least recently used sessions are evicted beyond this
+        ttl_seconds: Sessions idle for longer than this are evicted
+        clock: Monotonic time source (overridable for tests)
+    """
+
+    def __init__(self, factory: Callable[[str], SessionState], max_sessions: int = 10000,
+                 ttl_seconds: float = 1800.0, clock: Callable[[], float] = time.monotonic):
+        self.factory = factory
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.evictions = 0
+        self._states: "OrderedDict[str, SessionState]" = OrderedDict()
+        # Analysis may run on several executor threads at once
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._states
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._states))
+
+    def get(self, session_id: str) -> SessionState:
+        """Return the state for session_id, creating it if needed, and mark it used."""
+        now = self.clock()
+        with self._lock:
+            self._evict_expired_locked(now)
+            state = self._states.get(session_id)
+            if state is None:
+                state = self.factory(session_id)
+                self._states[session_id] = state
+                while len(self._states) > self.max_sessions:
+                    evicted, _ = self._states.popitem(last=False)
+                    self.evictions += 1
+                    logger.debug("Evicted least recently used session %s", evicted)
+            else:
+                self._states.move_to_end(session_id)
+            state.last_seen = now
+            return state
+
+    def peek(self, session_id: str) -> Optional[SessionState]:
+        return self._states.get(session_id)
+
+    def release(self, session_id: str) -> bool:
+        """Drop a session explicitly (call ended). Returns True if it existed."""
+        with self._lock:
+            return self._states.pop(session_id, None) is not None
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            return self._evict_expired_locked(self.clock())
+
+    def _evict_expired_locked(self, now: float) -> int:
+        # Entries are kept in last-used order, so expired ones are at the front
+        evicted = 0
+        while self._states:
+            session_id, state = next(iter(self._states.items()))
+            if now - state.last_seen <= self.ttl_seconds:
+                break
+            del self._states[session_id]
+            evicted += 1
+        if evicted:
+            self.evictions += evicted
+            logger.debug("Evicted %d idle sessions", evicted)
+        return evicted
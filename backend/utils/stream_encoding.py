@@ -0,0 +1,202 @@
+"""
+Stream Update Encoding for /call/stream
+
+Analysis results carry full MFCC matrices, nested behavioral dicts and numpy
+scalars. Stream responses instead use a compact, typed summary with
+fixed-precision floats, encoded per connection as JSON (default), msgpack
+or a fixed binary layout.
+"""
+
+import json
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import msgpack
+except Exception:
+    msgpack = None
+
+FLOAT_PRECISION = 4
+MFCC_SUMMARY_SIZE = 13
+
+ENCODINGS = ("json", "msgpack", "binary")
+
+# Binary update layout (little-endian), followed by n_mfcc float32 values and
+# a UTF-8, newline-separated keyword list of keyword_bytes length:
+#   version u8, n_mfcc u8, keyword_bytes u16, seq u32 (0xFFFFFFFF = none),
+#   timestamp f64, risk_score, keyword_risk, behavioral_risk, artifact_score,
+#   rms_energy, pitch_mean, duration (f32 each)
+BINARY_UPDATE_HEADER = struct.Struct("<BBHId7f")
+BINARY_UPDATE_VERSION = 1
+_NO_SEQ = 0xFFFFFFFF
+
+
+def _round(value: Any) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if not np.isfinite(value):
+        return 0.0
+    return round(value, FLOAT_PRECISION)
+
+
+@dataclass
+class AcousticSummary:
+    artifact_score: float = 0.0
+    rms_energy: float = 0.0
+    pitch_mean: float = 0.0
+    duration: float = 0.0
+    mfcc_mean: List[float] = field(default_factory=list)
+
+    @classmethod
+    def from_result(cls, acoustic: Dict[str, Any]) -> "AcousticSummary":
+        mfcc = acoustic.get("mfcc")
+        mfcc_mean: List[float] = []
+        if isinstance(mfcc, np.ndarray) and mfcc.ndim == 2 and mfcc.size:
+            mfcc_mean = [_round(v) for v in mfcc.mean(axis=0)[:MFCC_SUMMARY_SIZE]]
+        return cls(
+            artifact_score=_round(acoustic.get("artifact_score", 0.0)),
+            rms_energy=_round(acoustic.get("rms_energy", 0.0)),
+            pitch_mean=_round(acoustic.get("pitch_mean", 0.0)),
+            duration=_round(acoustic.get("duration", 0.0)),
+            mfcc_mean=mfcc_mean,
+        )
+
+
+@dataclass
+class StreamUpdate:
+    """Compact per-message risk update sent to stream clients."""
+
+    risk_score: float
+    timestamp: float
+    keyword_risk: float = 0.0
+    behavioral_risk: float = 0.0
+    detected_keywords: List[str] = field(default_factory=list)
+    recommendation: Optional[str] = None
+    acoustic: Optional[AcousticSummary] = None
+    seq: Optional[int] = None
+    user: Optional[str] = None
+
+    @classmethod
+    def from_analysis(cls, risk_score: float, analysis: Dict[str, Any], timestamp: float,
+                      seq: Optional[int] = None, user: Optional[str] = None) -> "StreamUpdate":
+        """
+        Summarize an analyze_audio_transcript / analyze_audio_data result.
+
+        Args:
+            risk_score: Overall risk score for the message
+            analysis: Full analysis dictionary from FraudDetectionService
+            timestamp: Unix timestamp of the update
+            seq: Sequence number of the binary frame being answered
+            user: Authenticated username, if any
+
+        Returns:
+            StreamUpdate with fixed-precision floats and no matrices
+        """
+        analysis = analysis or {}
+        semantic = analysis.get("semantic_result") or analysis
+        acoustic = analysis.get("acoustic_result")
+        return cls(
+            risk_score=_round(risk_score),
+            timestamp=round(timestamp, 3),
+            keyword_risk=_round(semantic.get("keyword_risk", 0.0)),
+            behavioral_risk=_round(semantic.get("behavioral_risk", 0.0)),
+            detected_keywords=list(analysis.get("detected_keywords", [])),
+            recommendation=semantic.get("recommendation"),
+            acoustic=AcousticSummary.from_result(acoustic) if acoustic else None,
+            seq=seq,
+            user=user,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "risk_score": self.risk_score,
+            "timestamp": self.timestamp,
+            "analysis": {
+                "keyword_risk": self.keyword_risk,
+                "behavioral_risk": self.behavioral_risk,
+                "detected_keywords": self.detected_keywords,
+            },
+        }
+        if self.recommendation is not None:
+            data["analysis"]["recommendation"] = self.recommendation
+        if self.acoustic is not None:
+            data["analysis"]["acoustic"] = self.acoustic.__dict__
+        if self.seq is not None:
+            data["seq"] = self.seq
+        if self.user is not None:
+            data["user"] = self.user
+        return data
+
+    def to_binary(self) -> bytes:
+        acoustic = self.acoustic or AcousticSummary()
+        keywords = "\n".join(self.detected_keywords).encode("utf-8")
+        mfcc = np.asarray(acoustic.mfcc_mean, dtype="<f4")
+        header = BINARY_UPDATE_HEADER.pack(
+            BINARY_UPDATE_VERSION, len(mfcc), len(keywords),
+            _NO_SEQ if self.seq is None else self.seq, self.timestamp,
+            self.risk_score, self.keyword_risk, self.behavioral_risk,
+            acoustic.artifact_score, acoustic.rms_energy, acoustic.pitch_mean, acoustic.duration,
+        )
+        return header + mfcc.tobytes() + keywords
+
+
+def decode_binary_update(data: bytes) -> Dict[str, Any]:
+    """Parse a binary update (client side / tests)."""
+    (version, n_mfcc, keyword_bytes, seq, timestamp, risk, keyword_risk, behavioral_risk,
+     artifact, rms, pitch, duration) = BINARY_UPDATE_HEADER.unpack_from(data)
+    offset = BINARY_UPDATE_HEADER.size
+    mfcc = np.frombuffer(data, dtype="<f4", count=n_mfcc, offset=offset)
+    offset += 4 * n_mfcc
+    keywords = data[offset:offset + keyword_bytes].decode("utf-8")
+    return {
+        "version": version,
+        "seq": None if seq == _NO_SEQ else seq,
+        "timestamp": timestamp,
+        "risk_score": risk,
+        "keyword_risk": keyword_risk,
+        "behavioral_risk": behavioral_risk,
+        "artifact_score": artifact,
+        "rms_energy": rms,
+        "pitch_mean": pitch,
+        "duration": duration,
+        "mfcc_mean": mfcc.tolist(),
+        "detected_keywords": keywords.split("\n") if keywords else [],
+    }
+
+
+def numpy_default(obj: Any) -> Any:
+    """json/msgpack fallback for numpy scalars and arrays."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def dumps_json(obj: Any) -> str:
+    return json.dumps(obj, default=numpy_default, separators=(",", ":"))
+
+
+class StreamEncoder:
+    """Encoder negotiated for one connection (?encoding=json|msgpack|binary)."""
+
+    def __init__(self, encoding: str = "json"):
+        encoding = (encoding or "json").lower()
+        if encoding not in ENCODINGS:
+            raise ValueError(f"unsupported encoding {encoding!r}")
+        if encoding == "msgpack" and msgpack is None:
+            raise ValueError("msgpack encoding is not available on this server")
+        self.encoding = encoding
+
+    def encode(self, update: StreamUpdate):
+        """Return str for JSON (text frame) or bytes (binary frame)."""
+        if self.encoding == "binary":
+            return update.to_binary()
+        if self.encoding == "msgpack":
+            return msgpack.packb(update.to_dict(), default=numpy_default, use_single_float=True)
+        return dumps_json(update.to_dict())
@@ -0,0 +1,95 @@
+"""
+Binary Stream Protocol for /call/stream
+
+Audio can be sent as binary websocket frames instead of base64 inside JSON.
+Each frame is a fixed 12-byte little-endian header followed by raw PCM:
+
+    offset  size  field
+    0       1     version (FRAME_VERSION)
+    1       1     message type (MSG_AUDIO)
+    2       1     sample format (SAMPLE_*, 0 = negotiated at connect)
+    3       1     reserved, must be 0
+    4       4     sequence number (uint32)
+    8       4     sample rate in Hz (uint32, 0 = negotiated at connect)
+    12      ...   samples
+
+The header size keeps the payload 4-byte aligned, so samples are viewed in
+place with np.frombuffer without copying.
+"""
+
+import struct
+from typing import NamedTuple
+
+import numpy as np
+
+FRAME_HEADER = struct.Struct("<BBBBII")
+FRAME_VERSION = 1
+
+# Message types
+MSG_AUDIO = 1
+
+# Sample formats
+SAMPLE_DEFAULT = 0
+SAMPLE_FLOAT32 = 1
+SAMPLE_INT16 = 2
+SAMPLE_MULAW = 3
+SAMPLE_ALAW = 4
+
+SAMPLE_DTYPES = {
+    SAMPLE_FLOAT32: np.dtype("<f4"),
+    SAMPLE_INT16: np.dtype("<i2"),
+    SAMPLE_MULAW: np.dtype("u1"),
+    SAMPLE_ALAW: np.dtype("u1"),
+}
+
+
+class FrameError(ValueError):
+    """Raised for binary frames that do not follow the protocol."""
+
+
+class AudioFrame(NamedTuple):
+    seq: int
+    sample_format: int
+    sample_rate: int
+    samples: np.ndarray
+
+
+def encode_audio_frame(samples: np.ndarray, seq: int = 0, sample_rate: int = 0,
+                       sample_format: int = SAMPLE_FLOAT32) -> bytes:
+    """Build a binary audio frame (used by clients and tests)."""
+    dtype = SAMPLE_DTYPES.get(sample_format, np.dtype("u1"))
+    body = np.ascontiguousarray(samples, dtype=dtype).tobytes()
+    return FRAME_HEADER.pack(FRAME_VERSION, MSG_AUDIO, sample_format, 0, seq, sample_rate) + body
+
+
+def decode_frame(data: bytes, default_format: int = SAMPLE_FLOAT32) -> AudioFrame:
+    """
+    Parse a binary frame and view its samples without copying.
+
+    Args:
+        data: Raw websocket binary message
+        default_format: Sample format to assume when the header says 0
+
+    Returns:
+        AudioFrame whose samples array is a read-only view into data
+
+    Raises:
+        FrameError: If the header or payload is malformed
+    """
+    if len(data) < FRAME_HEADER.size:
+        raise FrameError("frame shorter than header")
+    version, msg_type, sample_format, _, seq, sample_rate = FRAME_HEADER.unpack_from(data)
+    if version != FRAME_VERSION:
+        raise FrameError(f"unsupported frame version {version}")
+    if msg_type != MSG_AUDIO:
+        raise FrameError(f"unsupported message type {msg_type}")
+
+    if sample_format == SAMPLE_DEFAULT:
+        sample_format = default_format
+    dtype = SAMPLE_DTYPES.get(sample_format)
+    if dtype is None:
+        raise FrameError(f"unsupported sample format {sample_format}")
+    if (len(data) - FRAME_HEADER.size) % dtype.itemsize:
+        raise FrameError("payload is not a whole number of samples")
+    samples = np.frombuffer(data, dtype=dtype, offset=FRAME_HEADER.size)
+    return AudioFrame(seq, sample_format, sample_rate, samples)
@@ -0,0 +1,89 @@
+"""Compare per-chunk latency and allocations of the shared-STFT acoustic
+pipeline against the previous multi-STFT path.
+
+Usage:
+    python scripts/bench_acoustic_pipeline.py [--iterations 50] [--seconds 1.0]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import librosa
+import numpy as np
+
+from backend.ai_ml.acoustic_analysis import AcousticAnalyzer
+
+
+def legacy_analyze_audio_chunk(analyzer: AcousticAnalyzer, audio: np.ndarray) -> dict:
+    """The pre-refactor path: STFT/ISTFT denoise, then one STFT per feature."""
+    sr = analyzer.sample_rate
+    stft = librosa.stft(audio)
+    magnitude, phase = librosa.magphase(stft)
+    noise_frames = min(10, magnitude.shape[1] // 4)
+    noise_profile = np.mean(magnitude[:, :noise_frames], axis=1, keepdims=True)
+    normalized = librosa.istft(np.maximum(magnitude - noise_profile, 0) * phase)
+
+    mfcc = librosa.feature.mfcc(y=normalized, sr=sr, n_mfcc=analyzer.mfcc_features,
+                                n_fft=analyzer.n_fft, hop_length=analyzer.hop_length).T
+    centroid = librosa.feature.spectral_centroid(y=normalized, sr=sr)[0]
+    rolloff = librosa.feature.spectral_rolloff(y=normalized, sr=sr)[0]
+    librosa.feature.zero_crossing_rate(normalized)
+    flatness = librosa.feature.spectral_flatness(y=normalized)[0]
+    rms = librosa.feature.rms(y=normalized)[0]
+    pitch, _ = librosa.piptrack(y=normalized, sr=sr)
+    return {
+        "mfcc": mfcc,
+        "rms_energy": np.mean(rms),
+        "pitch_mean": np.mean(pitch[pitch > 0]) if np.any(pitch > 0) else 0,
+        "centroid_variation": np.std(centroid) / np.mean(centroid),
+        "rolloff_consistency": 1 - np.std(rolloff) / np.mean(rolloff),
+        "flatness_uniformity": np.mean(flatness),
+    }
+
+
+def synthetic_chunk(sample_rate: int, seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    voice = 0.4 * np.sin(2 * np.pi * 180 * t) + 0.2 * np.sin(2 * np.pi * 360 * t)
+    return (voice + 0.05 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def measure(fn, iterations: int):
+    fn()  # warm caches and numba before timing
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    latency_ms = (time.perf_counter() - start) / iterations * 1000
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return latency_ms, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=1.0, help="chunk length in seconds")
+    args = parser.parse_args()
+
+    analyzer = AcousticAnalyzer()
+    audio = synthetic_chunk(analyzer.sample_rate, args.seconds)
+
+    legacy_ms, legacy_kib = measure(lambda: legacy_analyze_audio_chunk(analyzer, audio), args.iterations)
+    shared_ms, shared_kib = measure(lambda: analyzer.analyze_audio_chunk(audio), args.iterations)
+
+    print(f"chunk: {args.seconds:.2f}s @ {analyzer.sample_rate} Hz, {args.iterations} iterations")
+    print(f"{'path':<12}{'latency (ms)':>14}{'peak alloc (KiB)':>18}")
+    print(f"{'legacy':<12}{legacy_ms:>14.2f}{legacy_kib:>18.1f}")
+    print(f"{'shared-stft':<12}{shared_ms:>14.2f}{shared_kib:>18.1f}")
+    print(f"speedup: {legacy_ms / shared_ms:.2f}x, allocation ratio: {shared_kib / legacy_kib:.2f}")
+
+
+if __name__ == "__main__":
+    main()
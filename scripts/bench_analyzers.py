@@ -0,0 +1,266 @@
+"""Micro-benchmarks for the analyzer hot paths, with stored baselines.
+
+Covers AcousticAnalyzer.analyze_audio_chunk on deterministic synthetic audio
+(tone, noise and chirp at 8 and 16 kHz in several chunk sizes),
+BehavioralAnalyzer.analyze_call_behavior and
+FraudDetectionService.analyze_data / analyze_audio_transcript on transcript
+corpora of increasing length.
+
+Each case is warmed up once, then timed in rounds of enough calls to fill
+--min-time; the per-call minimum, median, mean and spread are reported with
+ops/s and a domain throughput (audio seconds or transcript words per second).
+Peak allocation is measured on a separate call under tracemalloc so that
+tracing does not distort the timings.
+
+Results can be saved as a baseline (--save) and later runs compared against
+it (--compare): a case whose best per-call time or peak allocation grew by
+more than --tolerance fails the run. The minimum is compared rather than the
+median because interference from other processes only ever adds time. Timings only compare on the machine that recorded
+the baseline; peak allocations are portable.
+
+Usage:
+    python scripts/bench_analyzers.py [-k acoustic] [--rounds 5] [--min-time 0.2]
+                                      [--save] [--compare] [--json results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+
+from backend.ai_ml.acoustic_analysis import AcousticAnalyzer
+from backend.ai_ml.behavioral_analysis import BehavioralAnalyzer
+from backend.utils.fraud_detection import FraudDetectionService
+
+# 0.1 s chunks are shorter than n_fft; librosa pads them and warns on every call
+warnings.filterwarnings("ignore", message="n_fft=.* is too large")
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "bench_analyzers.json"
+
+SAMPLE_RATES = (8000, 16000)
+CHUNK_SECONDS = (0.1, 0.5, 1.0)
+SIGNALS = ("tone", "noise", "chirp")
+TRANSCRIPT_WORDS = (10, 100, 1000)
+
+VOCABULARY = (
+    "hello this is your bank calling about the recent activity on your account we noticed "
+    "a payment that you may not recognise please stay on the line while I check the details "
+    "thank you for your patience can you confirm your name and date of birth for security"
+).split()
+FRAUD_PHRASES = ("urgent", "verify your account", "gift card", "wire transfer",
+                 "immediate action", "confidential", "social security")
+
+
+class Case(NamedTuple):
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    # Units of work per call and their name, for the throughput column
+    units: float
+    unit: str
+
+
+def synthetic_audio(kind: str, sample_rate: int, seconds: float) -> np.ndarray:
+    """Deterministic test signal: a voiced tone, white noise or a 100 Hz - 4 kHz chirp."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    if kind == "tone":
+        signal = 0.4 * np.sin(2 * np.pi * 180 * t) + 0.2 * np.sin(2 * np.pi * 360 * t)
+        signal += 0.02 * rng.standard_normal(t.size)
+    elif kind == "noise":
+        signal = 0.3 * rng.standard_normal(t.size)
+    elif kind == "chirp":
+        f0, f1 = 100.0, min(4000.0, sample_rate / 2 - 100)
+        signal = 0.4 * np.sin(2 * np.pi * (f0 * t + (f1 - f0) * t ** 2 / (2 * max(seconds, 1e-9))))
+    else:
+        raise ValueError(f"unknown signal {kind!r}")
+    return signal.astype(np.float32)
+
+
+def synthetic_transcript(words: int, seed: int = 0) -> str:
+    """Deterministic call text of the given length with a few fraud phrases mixed in."""
+    rng = np.random.default_rng(seed)
+    out = list(rng.choice(VOCABULARY, size=words))
+    for position in range(7, words, 23):
+        out[position] = FRAUD_PHRASES[position % len(FRAUD_PHRASES)]
+    return " ".join(out)
+
+
+def _acoustic_case(kind: str, sample_rate: int, seconds: float) -> Case:
+    def setup():
+        analyzer = AcousticAnalyzer(sample_rate=sample_rate)
+        audio = synthetic_audio(kind, sample_rate, seconds)
+        return lambda: analyzer.analyze_audio_chunk(audio)
+    return Case(f"acoustic.analyze_audio_chunk[{kind}-{sample_rate // 1000}k-{seconds:g}s]",
+                setup, seconds, "audio s")
+
+
+def _behavioral_case(words: int) -> Case:
+    def setup():
+        analyzer = BehavioralAnalyzer()
+        text = synthetic_transcript(words).split()
+        # Transcript arrives in ~10 word chunks, as from a streaming recognizer
+        call_data = {
+            "text_chunks": [" ".join(text[i:i + 10]) for i in range(0, len(text), 10)],
+            "pauses": [0.4, 1.2, 0.3, 2.5, 0.8],
+            "speaking_duration": words * 0.4,
+            "total_duration": words * 0.5,
+        }
+        return lambda: analyzer.analyze_call_behavior(call_data)
+    return Case(f"behavioral.analyze_call_behavior[{words}w]", setup, words, "words")
+
+
+def _fraud_case(method: str, words: int) -> Case:
+    def setup():
+        service = FraudDetectionService()
+        text = synthetic_transcript(words)
+        return lambda: getattr(service, method)(text)
+    return Case(f"fraud.{method}[{words}w]", setup, words, "words")
+
+
+def all_cases() -> List[Case]:
+    cases = [_acoustic_case(kind, rate, seconds)
+             for kind in SIGNALS for rate in SAMPLE_RATES for seconds in CHUNK_SECONDS]
+    cases += [_behavioral_case(words) for words in TRANSCRIPT_WORDS]
+    cases += [_fraud_case(method, words)
+              for method in ("analyze_data", "analyze_audio_transcript") for words in TRANSCRIPT_WORDS]
+    return cases
+
+
+def _calibrate(fn: Callable[[], object], min_time: float) -> int:
+    """Calls per round so that one round takes at least min_time."""
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or calls >= 1 << 20:
+            return calls
+        calls = max(calls * 2, int(calls * min_time / max(elapsed, 1e-9)))
+
+
+def run_case(case: Case, rounds: int, min_time: float) -> Dict[str, float]:
+    fn = case.setup()
+    fn()  # warm caches (mel basis, numba, keyword automaton) before timing
+
+    calls = _calibrate(fn, min_time)
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        per_call.append((time.perf_counter() - start) / calls)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(per_call)
+    return {
+        "calls_per_round": calls,
+        "rounds": rounds,
+        "min_us": round(min(per_call) * 1e6, 2),
+        "median_us": round(median * 1e6, 2),
+        "mean_us": round(statistics.fmean(per_call) * 1e6, 2),
+        "stddev_us": round(statistics.stdev(per_call) * 1e6, 2) if rounds > 1 else 0.0,
+        "ops_per_s": round(1 / median, 2),
+        "throughput": round(case.units / median, 2),
+        "unit": f"{case.unit}/s",
+        "peak_alloc_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Cases whose minimum time or peak allocation regressed beyond tolerance."""
+    regressions = []
+    print(f"\n{'case':<58}{'time':>10}{'alloc':>10}")
+    for name, current in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<58}{'new':>10}")
+            continue
+        time_change = current["min_us"] / old["min_us"] - 1
+        alloc_change = (current["peak_alloc_kib"] / old["peak_alloc_kib"] - 1) if old["peak_alloc_kib"] else 0.0
+        print(f"{name:<58}{time_change:>+10.1%}{alloc_change:>+10.1%}")
+        if time_change > tolerance:
+            regressions.append(f"{name}: min {old['min_us']} -> {current['min_us']} us")
+        # Small buffers jitter by a few KiB between runs; ignore changes below 16 KiB
+        if alloc_change > tolerance and current["peak_alloc_kib"] - old["peak_alloc_kib"] > 16:
+            regressions.append(f"{name}: peak alloc {old['peak_alloc_kib']} -> {current['peak_alloc_kib']} KiB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="keyword", help="only run cases whose name contains this")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per round")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save", action="store_true", help="store results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="fail on regressions against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed fractional regression")
+    args = parser.parse_args()
+
+    cases = [case for case in all_cases() if not args.keyword or args.keyword in case.name]
+    if not cases:
+        parser.error(f"no case matches {args.keyword!r}")
+
+    results: Dict[str, dict] = {}
+    print(f"{'case':<58}{'median us':>12}{'ops/s':>12}{'throughput':>22}{'peak KiB':>10}")
+    for case in cases:
+        result = results[case.name] = run_case(case, args.rounds, args.min_time)
+        throughput = f"{result['throughput']:.1f} {result['unit']}"
+        print(f"{case.name:<58}{result['median_us']:>12.1f}{result['ops_per_s']:>12.1f}"
+              f"{throughput:>22}{result['peak_alloc_kib']:>10.1f}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n")
+
+    baseline_path = Path(args.baseline)
+    if args.compare:
+        if not baseline_path.exists():
+            sys.exit(f"no baseline at {baseline_path}; record one with --save")
+        baseline = json.loads(baseline_path.read_text())
+        if baseline["meta"].get("platform") != report["meta"]["platform"]:
+            print("warning: baseline was recorded on a different platform; timings may not compare")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print("regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("no regressions")
+
+    if args.save:
+        if args.keyword and baseline_path.exists():
+            # Partial run: update only the cases that ran
+            stored = json.loads(baseline_path.read_text())
+            report["results"] = {**stored["results"], **results}
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline written to {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Compare send-path latency of the lock-free ConnectionManager against the
+previous single-lock implementation with thousands of simulated sessions.
+
+Usage:
+    python scripts/bench_connection_manager.py [--sessions 5000] [--messages 20] [--churn 0.05]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from backend.routes.connections import SEND_QUEUE_MAXSIZE, SEND_TIMEOUT, ConnectionManager
+
+
+class FakeWebSocket:
+    """Accepts everything and yields once per send, like a fast client."""
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        await asyncio.sleep(0)
+
+    async def send_bytes(self, message):
+        await asyncio.sleep(0)
+
+
+class LegacyConnectionManager:
+    """The previous implementation: one asyncio.Lock around every operation."""
+
+    def __init__(self):
+        self._conns = {}
+        self._lock = asyncio.Lock()
+        # The loop only keeps weak references to tasks: without this, replaced
+        # senders still finishing their cancel would be garbage collected
+        self._tasks = set()
+
+    async def connect(self, session_id, websocket):
+        await websocket.accept()
+        async with self._lock:
+            existing = self._conns.get(session_id)
+            if existing:
+                existing["task"].cancel()
+            queue = asyncio.Queue(maxsize=SEND_QUEUE_MAXSIZE)
+            task = asyncio.create_task(self._sender(session_id, websocket, queue))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            self._conns[session_id] = {"websocket": websocket, "queue": queue, "task": task}
+
+    async def _sender(self, session_id, websocket, queue):
+        try:
+            while True:
+                message = await queue.get()
+                try:
+                    await asyncio.wait_for(websocket.send_text(message), timeout=SEND_TIMEOUT)
+                except Exception:
+                    break
+                finally:
+                    queue.task_done()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            async with self._lock:
+                current = self._conns.get(session_id)
+                if current and current.get("queue") is queue:
+                    self._conns.pop(session_id, None)
+
+    async def send(self, session_id, message):
+        async with self._lock:
+            conn = self._conns.get(session_id)
+            if not conn:
+                return
+            try:
+                conn["queue"].put_nowait(message)
+            except asyncio.QueueFull:
+                pass
+
+    async def disconnect(self, session_id, websocket=None):
+        async with self._lock:
+            conn = self._conns.pop(session_id, None)
+            if conn:
+                conn["task"].cancel()
+
+
+async def run_sessions(manager, sessions: int, messages: int, churn: float):
+    """Connect all sessions, then have each send messages while a fraction reconnects.
+
+    Returns send latencies in microseconds and the number of sender tasks
+    that had not exited one second after every session disconnected.
+    """
+    ids = [f"session-{i}" for i in range(sessions)]
+    for session_id in ids:
+        await manager.connect(session_id, FakeWebSocket())
+
+    latencies = []
+    reconnect_every = max(1, int(1 / churn)) if churn > 0 else 0
+
+    async def client(index: int, session_id: str):
+        for n in range(messages):
+            if reconnect_every and (index + n) % reconnect_every == 0:
+                await manager.connect(session_id, FakeWebSocket())
+            start = time.perf_counter()
+            await manager.send(session_id, '{"risk_score":0.1}')
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(client(i, s) for i, s in enumerate(ids)))
+    for session_id in ids:
+        await manager.disconnect(session_id)
+    senders = asyncio.all_tasks() - {asyncio.current_task()}
+    stuck = set()
+    if senders:
+        _, stuck = await asyncio.wait(senders, timeout=1.0)
+    return np.asarray(latencies) * 1e6, stuck
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=20, help="messages per session")
+    parser.add_argument("--churn", type=float, default=0.05, help="fraction of sends preceded by a reconnect")
+    args = parser.parse_args()
+    # Queue-full drops are expected with a yield-only fake client; keep output readable
+    logging.getLogger("fraud_detection").setLevel(logging.ERROR)
+
+    print(f"{args.sessions} sessions x {args.messages} messages, churn {args.churn:.2f}")
+    print(f"{'manager':<12}{'total (s)':>11}{'p50 (us)':>11}{'p99 (us)':>11}{'max (us)':>11}{'stuck':>8}")
+    for name, factory in (("legacy-lock", LegacyConnectionManager), ("lock-free", ConnectionManager)):
+        # A manual loop rather than asyncio.run: senders stuck on the legacy
+        # lock during cleanup would make asyncio.run's final cancel hang.
+        loop = asyncio.new_event_loop()
+        start = time.perf_counter()
+        lat, stuck = loop.run_until_complete(run_sessions(factory(), args.sessions, args.messages, args.churn))
+        total = time.perf_counter() - start
+        # Cancel and drain the senders before closing the loop; destroying them
+        # pending logs "Task was destroyed but it is pending!" once per task.
+        # A legacy sender whose send completes as it is cancelled has the
+        # cancel swallowed by wait_for and goes back to its queue, so repeat.
+        pending = stuck
+        for _ in range(10):
+            if not pending:
+                break
+            for task in pending:
+                task.cancel()
+            _, pending = loop.run_until_complete(asyncio.wait(pending, timeout=1.0))
+        if pending:
+            print(f"warning: {len(pending)} {name} senders ignored cancellation")
+            logging.getLogger("asyncio").setLevel(logging.CRITICAL)
+        loop.close()
+        p50, p99 = np.percentile(lat, [50, 99])
+        print(f"{name:<12}{total:>11.2f}{p50:>11.2f}{p99:>11.2f}{lat.max():>11.1f}{len(stuck):>8}")
+
+
+if __name__ == "__main__":
+    main()
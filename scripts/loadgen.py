@@ -0,0 +1,498 @@
+"""Drive concurrent /call/stream sessions at a target rate and record latency,
+throughput, drops and server CPU/RSS as JSON.
+
+Each session sends on a fixed schedule (open loop): latency is measured from
+the time a message was due, not from when it was actually sent, so a stalled
+server shows up as latency instead of a lower send rate. Audio goes out as
+binary frames whose seq is echoed in the update, which lets replies be matched
+exactly; transcript replies carry no seq and are matched in order, so a
+coalesced transcript update makes the next reply count against the older
+message (an upper bound on latency).
+
+Without --url a server is started on a free local port (uvicorn, the app's
+default settings) and stopped afterwards. It runs in a temporary directory,
+so its SQLite database and log files do not land in the checkout; its CPU and
+RSS are sampled from
+/proc. Drop counts come from the client (unanswered or rejected messages) and
+from the server's /metrics counters.
+
+Usage:
+    python scripts/loadgen.py [--sessions 50] [--rate 4] [--duration 20] [--mix mixed]
+                              [--output loadgen.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+import websockets
+
+from backend.utils.stream_encoding import decode_binary_update
+from backend.utils.stream_protocol import SAMPLE_FLOAT32, encode_audio_frame
+
+SAMPLE_RATE = 16000
+MIXES = ("transcript", "audio", "mixed")
+TRANSCRIPTS = (
+    "hello, I am calling about your recent order",
+    "this is urgent, your account will be suspended today",
+    "please confirm the verification code we just sent",
+    "we can transfer the refund once you share your bank details",
+    "thank you for your time, have a nice day",
+)
+
+# Server-side counters reported as deltas over the run
+SERVER_COUNTERS = ("fraud_ws_messages_total", "fraud_analysis_rejected_total",
+                   "fraud_analysis_batches_total", "fraud_analysis_batched_items_total",
+                   "fraud_log_records_lost_total")
+
+# Metrics compared by --compare: (path in the results, higher is worse)
+COMPARED = (
+    (("latency_ms", "p50"), True),
+    (("latency_ms", "p95"), True),
+    (("latency_ms", "p99"), True),
+    (("throughput_per_s",), False),
+    (("dropped",), True),
+    (("server", "cpu_percent"), True),
+    (("server", "rss_peak_mb"), True),
+)
+
+
+class SessionStats:
+    """Send times and replies of one session."""
+
+    def __init__(self):
+        # (index, due time, kind) of messages awaiting a reply, in send order
+        self.outstanding: Deque[Tuple[int, float, str]] = deque()
+        self.latencies: Dict[str, List[float]] = {"transcript": [], "audio": [], "warmup": []}
+        self.sent = 0
+        self.answered = 0
+        self.errors: Dict[str, int] = {}
+        self.alerts = 0
+        self.unanswered = 0
+        self.connect_failed = False
+        self.disconnected = False
+
+    def answer(self, now: float, seq: Optional[int] = None) -> None:
+        """Match a reply: by seq for audio, else the oldest outstanding message."""
+        if seq is None:
+            if self.outstanding:
+                _, due, kind = self.outstanding.popleft()
+                self.latencies[kind].append(now - due)
+                self.answered += kind != "warmup"
+            return
+        while self.outstanding:
+            index, due, kind = self.outstanding.popleft()
+            if index == seq:
+                self.latencies[kind].append(now - due)
+                self.answered += kind != "warmup"
+                return
+            # Sent before the answered frame but superseded (coalesced update)
+            self.unanswered += kind != "warmup"
+
+    def error(self, name: str, now: float, seq: Optional[int] = None) -> None:
+        self.errors[name] = self.errors.get(name, 0) + 1
+        if seq is None:
+            if self.outstanding:
+                self.outstanding.popleft()
+            return
+        while self.outstanding:
+            index, _, kind = self.outstanding.popleft()
+            if index == seq:
+                return
+            self.unanswered += kind != "warmup"
+
+
+def synthetic_chunk(rng: np.random.Generator, seconds: float) -> np.ndarray:
+    """Voiced-sounding test audio: a wobbling tone plus noise."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    f0 = rng.uniform(110, 220)
+    tone = 0.3 * np.sin(2 * np.pi * f0 * t * (1 + 0.02 * np.sin(2 * np.pi * 3 * t)))
+    return (tone + 0.02 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def decode_reply(message, encoding: str) -> dict:
+    if isinstance(message, bytes):
+        if encoding == "msgpack":
+            import msgpack
+            return msgpack.unpackb(message)
+        return decode_binary_update(message)
+    return json.loads(message)
+
+
+async def run_session(index: int, args, start_at: float, stop_at: float, measure_from: float,
+                      stats: SessionStats) -> None:
+    url = (f"{args.ws_url}/call/stream?session_id=loadgen-{args.seed}-{index}"
+           f"&create_if_missing=true&encoding={args.encoding}")
+    rng = np.random.default_rng(args.seed * 100003 + index)
+    chunks = [synthetic_chunk(rng, args.chunk_seconds) for _ in range(8)]
+    interval = 1.0 / args.rate
+    loop = asyncio.get_running_loop()
+
+    try:
+        # permessage-deflate costs ~8 ms per 1 s float32 frame on the client,
+        # which would then be measuring itself; opt in with --deflate
+        websocket = await websockets.connect(url, max_size=None, open_timeout=args.connect_timeout,
+                                             compression="deflate" if args.deflate else None)
+    except Exception:
+        stats.connect_failed = True
+        return
+
+    async def receive():
+        async for message in websocket:
+            now = loop.time()
+            reply = decode_reply(message, args.encoding)
+            if "alert" in reply:
+                stats.alerts += 1
+            elif "error" in reply:
+                stats.error(reply["error"], now, reply.get("seq"))
+            else:
+                stats.answer(now, reply.get("seq"))
+
+    receiver = asyncio.create_task(receive())
+    try:
+        # Spread session start times over one interval so sends are not in lockstep
+        due = start_at + interval * rng.random()
+        message_index = 0
+        while due < stop_at:
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if args.mix == "audio" or (args.mix == "mixed" and rng.random() < args.audio_ratio):
+                kind = "audio"
+                payload = encode_audio_frame(chunks[message_index % len(chunks)], seq=message_index,
+                                             sample_format=SAMPLE_FLOAT32)
+            else:
+                kind = "transcript"
+                payload = json.dumps({"transcript": TRANSCRIPTS[message_index % len(TRANSCRIPTS)]})
+            if due >= measure_from:
+                stats.outstanding.append((message_index, due, kind))
+                stats.sent += 1
+            else:
+                # Warm-up traffic: answered like the rest, never counted
+                stats.outstanding.append((message_index, due, "warmup"))
+            await websocket.send(payload)
+            message_index += 1
+            due += interval
+
+        # Wait for the last replies
+        drain_until = loop.time() + args.drain
+        while stats.outstanding and loop.time() < drain_until:
+            await asyncio.sleep(0.05)
+    except (websockets.ConnectionClosed, OSError):
+        # Closed by the server mid-run (e.g. overloaded); the rest is unanswered
+        stats.disconnected = True
+    finally:
+        receiver.cancel()
+        try:
+            await websocket.close()
+        except (websockets.ConnectionClosed, OSError):
+            pass
+    stats.unanswered += sum(1 for _, _, kind in stats.outstanding if kind != "warmup")
+    stats.outstanding.clear()
+
+
+def _drop_warmup(stats: SessionStats) -> None:
+    stats.latencies.pop("warmup", None)
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    ms = np.asarray(values) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"count": len(values), "mean": round(float(ms.mean()), 3), "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3), "p99": round(float(p99), 3), "max": round(float(ms.max()), 3)}
+
+
+def parse_prometheus(text: str) -> Dict[str, float]:
+    """Sample lines of a Prometheus text exposition as {"name{labels}": value}."""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        name, _, value = line.rpartition(" ")
+        try:
+            samples[name] = float(value)
+        except ValueError:
+            continue
+    return samples
+
+
+def scrape(http_url: str) -> Dict[str, float]:
+    try:
+        with urllib.request.urlopen(f"{http_url}/metrics", timeout=5) as response:
+            return parse_prometheus(response.read().decode())
+    except (urllib.error.URLError, OSError):
+        return {}
+
+
+def server_counter_deltas(before: Dict[str, float], after: Dict[str, float]) -> Dict[str, float]:
+    return {name: after[name] - before.get(name, 0.0) for name in sorted(after)
+            if name.split("{")[0] in SERVER_COUNTERS}
+
+
+class ProcessSampler:
+    """Samples CPU time and RSS of a process from /proc (Linux only)."""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.rss_peak = 0
+        self.rss_samples: List[int] = []
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._page = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._start: Optional[Tuple[float, float]] = None
+        self._end: Optional[Tuple[float, float]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def available(self) -> bool:
+        return self.pid is not None and Path(f"/proc/{self.pid}/stat").exists()
+
+    def _read(self) -> Tuple[float, int]:
+        """(CPU seconds, RSS bytes)."""
+        fields = Path(f"/proc/{self.pid}/stat").read_text().rsplit(")", 1)[1].split()
+        # utime and stime are fields 14 and 15 of stat; rss (pages) is field 24
+        cpu = (int(fields[11]) + int(fields[12])) / self._ticks
+        return cpu, int(fields[21]) * self._page
+
+    async def _run(self) -> None:
+        while True:
+            _, rss = self._read()
+            self.rss_samples.append(rss)
+            self.rss_peak = max(self.rss_peak, rss)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.available:
+            self._start = (time.monotonic(), self._read()[0])
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._end = (time.monotonic(), self._read()[0])
+
+    def summary(self) -> Optional[dict]:
+        if self._start is None or self._end is None:
+            return None
+        wall = self._end[0] - self._start[0]
+        cpu = self._end[1] - self._start[1]
+        return {
+            "pid": self.pid,
+            "cpu_seconds": round(cpu, 3),
+            "cpu_percent": round(100 * cpu / wall, 1) if wall > 0 else None,
+            "rss_peak_mb": round(self.rss_peak / 2 ** 20, 1),
+            "rss_mean_mb": round(float(np.mean(self.rss_samples)) / 2 ** 20, 1) if self.rss_samples else None,
+        }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(http_url: str, timeout: float) -> None:
+    """Poll /ready until the server has finished its warm-up."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{http_url}/ready", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {http_url} not ready after {timeout:.0f}s")
+
+
+def start_server(port: int, workdir: str) -> subprocess.Popen:
+    # The app writes ./fraud_detection.db and ./logs relative to its cwd
+    pythonpath = os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")]))
+    env = {**os.environ, "PYTHONPATH": pythonpath}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_load(args, server_pid: Optional[int]) -> dict:
+    sampler = ProcessSampler(server_pid)
+    before = scrape(args.http_url)
+    loop = asyncio.get_running_loop()
+    start_at = loop.time() + 0.5
+    measure_from = start_at + args.warmup
+    stop_at = measure_from + args.duration
+
+    sampler.start()
+    sessions = [SessionStats() for _ in range(args.sessions)]
+    await asyncio.gather(*(run_session(i, args, start_at, stop_at, measure_from, stats)
+                           for i, stats in enumerate(sessions)))
+    sampler.stop()
+    after = scrape(args.http_url)
+
+    latencies = {"transcript": [], "audio": []}
+    errors: Dict[str, int] = {}
+    for stats in sessions:
+        _drop_warmup(stats)
+        for kind, values in stats.latencies.items():
+            latencies[kind].extend(values)
+        for name, count in stats.errors.items():
+            errors[name] = errors.get(name, 0) + count
+    answered = sum(stats.answered for stats in sessions)
+    sent = sum(stats.sent for stats in sessions)
+    all_latencies = latencies["transcript"] + latencies["audio"]
+
+    return {
+        "sessions": args.sessions,
+        "connect_failures": sum(stats.connect_failed for stats in sessions),
+        "disconnects": sum(stats.disconnected for stats in sessions),
+        "sent": sent,
+        "answered": answered,
+        "dropped": sent - answered,
+        "unanswered": sum(stats.unanswered for stats in sessions),
+        "errors": errors,
+        "alerts": sum(stats.alerts for stats in sessions),
+        "offered_rate_per_s": round(args.sessions * args.rate, 2),
+        "throughput_per_s": round(answered / args.duration, 2),
+        "latency_ms": percentiles(all_latencies),
+        "latency_ms_by_kind": {kind: percentiles(values) for kind, values in latencies.items() if values},
+        "server": sampler.summary(),
+        "server_counters": server_counter_deltas(before, after),
+    }
+
+
+def _lookup(results: dict, path: Tuple[str, ...]):
+    for key in path:
+        if not isinstance(results, dict):
+            return None
+        results = results.get(key)
+    return results
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions beyond tolerance (a fraction) of current results against a baseline."""
+    regressions = []
+    print(f"{'metric':<28}{'baseline':>12}{'current':>12}{'change':>10}")
+    for path, higher_is_worse in COMPARED:
+        old, new = _lookup(baseline["results"], path), _lookup(current["results"], path)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+        name = ".".join(path)
+        print(f"{name:<28}{old:>12}{new:>12}{change:>+10.1%}")
+        worse = change if higher_is_worse else -change
+        # Absolute floor so that e.g. 0 -> 1 dropped message is not a regression
+        if worse > tolerance and abs(new - old) > (1 if name == "dropped" else 0):
+            regressions.append(f"{name}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="server base URL (default: start a local server)")
+    parser.add_argument("--server-pid", type=int, help="pid of a --url server to sample CPU/RSS from")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=4.0, help="messages per second per session")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before that")
+    parser.add_argument("--drain", type=float, default=5.0, help="seconds to wait for final replies")
+    parser.add_argument("--mix", choices=MIXES, default="mixed")
+    parser.add_argument("--audio-ratio", type=float, default=0.5, help="share of audio messages in the mixed mix")
+    parser.add_argument("--chunk-seconds", type=float, default=0.25, help="audio per message")
+    parser.add_argument("--encoding", choices=("json", "msgpack", "binary"), default="json")
+    parser.add_argument("--deflate", action="store_true", help="negotiate permessage-deflate")
+    parser.add_argument("--connect-timeout", type=float, default=10.0)
+    parser.add_argument("--ready-timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="loadgen.json", help="results file")
+    parser.add_argument("--compare", help="baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed regression for --compare")
+    args = parser.parse_args()
+
+    server = None
+    workdir = None
+    server_pid = args.server_pid
+    if args.url:
+        args.http_url = args.url.rstrip("/")
+    else:
+        port = free_port()
+        args.http_url = f"http://127.0.0.1:{port}"
+        workdir = tempfile.TemporaryDirectory(prefix="loadgen-")
+        server = start_server(port, workdir.name)
+        server_pid = server.pid
+    args.ws_url = "ws" + args.http_url[len("http"):]
+
+    try:
+        wait_ready(args.http_url, args.ready_timeout)
+        results = asyncio.run(run_load(args, server_pid))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        if workdir is not None:
+            workdir.cleanup()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "server": args.url or "local",
+        },
+        "config": {name: getattr(args, name) for name in (
+            "sessions", "rate", "duration", "warmup", "mix", "audio_ratio", "chunk_seconds", "encoding",
+            "deflate", "seed")},
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+
+    latency = results["latency_ms"]
+    print(f"{results['sessions']} sessions x {args.rate:g} msg/s ({args.mix}), {args.duration:g}s measured")
+    print(f"sent {results['sent']}, answered {results['answered']}, dropped {results['dropped']}, "
+          f"errors {sum(results['errors'].values())}")
+    print(f"throughput {results['throughput_per_s']}/s, latency ms p50 {latency['p50']} "
+          f"p95 {latency['p95']} p99 {latency['p99']}")
+    if results["server"]:
+        print(f"server cpu {results['server']['cpu_percent']}%, rss peak {results['server']['rss_peak_mb']} MB")
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if baseline.get("config") != report["config"]:
+            print("warning: baseline was recorded with a different configuration")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
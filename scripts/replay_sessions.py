@@ -0,0 +1,138 @@
+"""Replay a recorded /call/stream session log through FraudDetectionService.
+
+Sessions recorded with settings.record_sessions are fed back message by
+message, interleaved as they arrived, either at their original pace or as
+fast as possible. The run reports per-message analysis latency and
+throughput; the risk score of every analyzed message can be written out and
+compared against an earlier replay to check that a change leaves the scores
+unchanged.
+
+Logs recorded by several workers (logs/sessions.<pid>.rec) can be passed
+together; their records are merged in arrival order.
+
+Usage:
+    python scripts/replay_sessions.py logs/sessions.rec [more logs ...] [--pace max|original]
+        [--session ID ...] [--scores scores.json] [--compare-scores reference.json]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from backend.utils.fraud_detection import FraudDetectionService
+from backend.utils.session_recorder import REC_BINARY, REC_TEXT, SessionReplayer, merge_records
+
+
+def percentiles_ms(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ms = np.asarray(values) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3),
+            "max": round(float(ms.max()), 3), "mean": round(float(ms.mean()), 3)}
+
+
+def compare_scores(scores: Dict[str, List[float]], reference: Dict[str, List[float]], tolerance: float) -> List[str]:
+    """Differences between two replays' per-message scores."""
+    mismatches = []
+    for session_id in sorted(set(scores) | set(reference)):
+        ours, theirs = scores.get(session_id), reference.get(session_id)
+        if ours is None or theirs is None:
+            mismatches.append(f"{session_id}: only in {'reference' if ours is None else 'this replay'}")
+        elif len(ours) != len(theirs):
+            mismatches.append(f"{session_id}: {len(ours)} scores, reference has {len(theirs)}")
+        else:
+            diff = np.abs(np.asarray(ours) - np.asarray(theirs))
+            if diff.size and diff.max() > tolerance:
+                index = int(diff.argmax())
+                mismatches.append(f"{session_id}: message {index} scored {ours[index]} vs {theirs[index]} "
+                                  f"({int((diff > tolerance).sum())} messages differ)")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("logs", nargs="+", help="session logs written by the stream recorder")
+    parser.add_argument("--pace", choices=("max", "original"), default="max",
+                        help="replay as fast as possible or keep the recorded inter-arrival times")
+    parser.add_argument("--session", action="append", help="replay only this session id (repeatable)")
+    parser.add_argument("--scores", help="write per-message risk scores to this file")
+    parser.add_argument("--compare-scores", help="scores file of a reference replay")
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="allowed score difference")
+    parser.add_argument("--json", help="write the timing report to this file")
+    args = parser.parse_args()
+
+    service = FraudDetectionService()
+    service.warm_up()
+    replayer = SessionReplayer(service)
+    wanted = set(args.session) if args.session else None
+
+    latencies: Dict[str, List[float]] = {}
+    scores: Dict[str, List[float]] = {}
+    lag: List[float] = []
+    first_timestamp = None
+    replay_start = time.perf_counter()
+    for record in merge_records(args.logs):
+        if wanted is not None and record.session_id not in wanted:
+            continue
+        if first_timestamp is None:
+            first_timestamp = record.timestamp
+        if args.pace == "original":
+            due = replay_start + (record.timestamp - first_timestamp)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif record.kind in (REC_TEXT, REC_BINARY):
+                # Behind schedule: the analysis could not keep up with the recorded rate
+                lag.append(-delay)
+
+        start = time.perf_counter()
+        outcome = replayer.feed(record)
+        elapsed = time.perf_counter() - start
+        if outcome is not None:
+            kind, score = outcome
+            latencies.setdefault(kind, []).append(elapsed)
+            scores.setdefault(record.session_id, []).append(float(score))
+    wall = time.perf_counter() - replay_start
+
+    analyzed = sum(len(values) for values in latencies.values())
+    report = {
+        "logs": args.logs,
+        "pace": args.pace,
+        "sessions": len(scores),
+        "messages": analyzed,
+        "wall_seconds": round(wall, 3),
+        "throughput_per_s": round(analyzed / wall, 2) if wall > 0 else None,
+        "latency_ms": percentiles_ms([v for values in latencies.values() for v in values]),
+        "latency_ms_by_kind": {kind: percentiles_ms(values) for kind, values in latencies.items()},
+    }
+    if args.pace == "original":
+        report["late_messages"] = len(lag)
+        report["lag_ms"] = percentiles_ms(lag)
+
+    print(f"{report['sessions']} sessions, {analyzed} messages in {wall:.2f}s "
+          f"({report['throughput_per_s']}/s, pace {args.pace})")
+    for kind, stats in report["latency_ms_by_kind"].items():
+        print(f"  {kind:<11} p50 {stats['p50']} ms  p95 {stats['p95']} ms  p99 {stats['p99']} ms")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n")
+    if args.scores:
+        Path(args.scores).write_text(json.dumps(scores) + "\n")
+
+    if args.compare_scores:
+        reference = json.loads(Path(args.compare_scores).read_text())
+        mismatches = compare_scores(scores, reference, args.tolerance)
+        if mismatches:
+            print("score mismatches:\n  " + "\n  ".join(mismatches))
+            sys.exit(1)
+        print("scores match the reference")
+
+
+if __name__ == "__main__":
+    main()